@@ -1,5 +1,7 @@
 """應用程式配置設定。"""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +12,68 @@ class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./attendance.db"
     debug: bool = True
 
+    # 資料庫引擎設定
+    database_echo: bool = False  # 輸出所有 SQL，僅供除錯
+    database_write_pool_size: int = 1  # SQLite 同時只允許一個寫入者
+    database_read_pool_size: int = 5
+    # 等待連線池連線的上限；刷卡在逾時後回 503 + Retry-After 讓讀卡機重送
+    database_pool_timeout_seconds: float = 10.0
+    database_busy_retry_after_seconds: int = 2
+
+    # SQLite PRAGMA（僅於 SQLite 檔案資料庫套用）
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size: int = 268435456
+
+    # 刷卡寫入模式：direct 每次請求各自提交；group_commit 交由背景寫入者批次提交
+    scan_ingest_mode: Literal["direct", "group_commit"] = "direct"
+    scan_group_commit_max_events: int = 100
+    scan_group_commit_max_delay_ms: int = 10
+    scan_group_commit_queue_size: int = 5000
+    scan_queue_retry_after_seconds: int = 1
+    scan_lock_stripes: int = 256  # 同卡刷卡依序寫入的分段鎖數量
+    scan_debounce_ms: int = 1000  # 同卡在此視窗內的重複刷卡不寫入，0 表示停用
+    scan_debounce_max_entries: int = 100000
+
+    # 已知 RFID 卡號的 Bloom filter，未知卡號不查詢資料庫直接拒絕
+    rfid_filter_enabled: bool = True
+    rfid_filter_capacity: int = 100000
+    rfid_filter_error_rate: float = 0.001
+    rfid_filter_recheck_per_second: float = 20.0  # filter 外的卡號每秒仍查詢的次數
+    rfid_filter_reload_seconds: int = 3600  # 背景重建間隔，0 表示不重建
+
+    # 刷卡規則快取：輪詢其他行程發佈的規則版本與員工異動，0 表示不輪詢（須重啟才生效）
+    rule_cache_poll_seconds: int = 30
+
+    # 看板統計快取：刷卡後最多 ttl 秒反映；期間沒有刷卡時最多保留 max_age 秒
+    dashboard_cache_ttl_seconds: float = 3.0
+    dashboard_cache_max_age_seconds: float = 60.0
+
+    # 日結：DayCutoff 過後補上缺勤記錄並標記 ExceptionFlags，每次重做最近 N 天
+    day_close_enabled: bool = True
+    day_close_interval_seconds: int = 600
+    day_close_lookback_days: int = 7
+
+    # 刷卡事件保留：超過 N 個月的事件封存為每月欄式區段檔後自線上資料表刪除
+    scan_retention_months: int = 12
+    scan_archive_dir: str = "./archive/scan_events"
+    scan_archive_row_group_size: int = 65536
+    scan_archive_delete_batch_size: int = 500  # 每次刪除的員工數
+
+    # 參考資料（部門、員工、班表、彈性設定）GET 的 ETag 與回應本文快取
+    http_cache_enabled: bool = True
+    http_cache_max_entries: int = 1024
+    # 輪詢資料表異動標記，發現其他行程的寫入；0 表示不輪詢（只認得本行程的寫入）
+    http_cache_poll_seconds: int = 5
+
+    # 考勤與員工列表只選取回應欄位並以 orjson 編碼，略過逐筆 Pydantic 驗證
+    fast_list_responses: bool = False
+
+    # 員工批次匯入：單一檔案的筆數上限
+    employee_import_max_rows: int = 50000
+
     class Config:
         env_file = ".env"
 
@@ -1,14 +1,89 @@
 """資料庫連線配置。"""
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.config import settings
+from app.utils.metrics import instrument_engine
+
+
+def _is_sqlite_file(url: str) -> bool:
+    """判斷是否為 SQLite 檔案資料庫（記憶體資料庫無法分離讀寫連線池）。"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def _create_engine(pool_size: int, read_only: bool) -> AsyncEngine:
+    """建立引擎，SQLite 檔案資料庫會在每條新連線套用 PRAGMA。"""
+    if not _is_sqlite_file(settings.database_url):
+        return create_async_engine(settings.database_url, echo=settings.database_echo)
+
+    new_engine = create_async_engine(
+        settings.database_url,
+        echo=settings.database_echo,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=settings.database_pool_timeout_seconds,
+    )
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """套用 SQLite PRAGMA。"""
+        cursor = dbapi_connection.cursor()
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        else:
+            cursor.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}")
+        cursor.execute(f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}")
+        cursor.execute(f"PRAGMA mmap_size = {settings.sqlite_mmap_size}")
+        cursor.close()
 
-engine = create_async_engine(settings.database_url, echo=settings.debug)
+    return new_engine
+
+
+# 寫入引擎：SQLite 下為單一寫入者連線池
+engine = _create_engine(settings.database_write_pool_size, read_only=False)
+
+# 唯讀引擎：報表與查詢使用獨立連線池，WAL 模式下不會等待寫入者
+read_engine = (
+    _create_engine(settings.database_read_pool_size, read_only=True)
+    if _is_sqlite_file(settings.database_url)
+    else engine
+)
+
+instrument_engine(engine, "write")
+if read_engine is not engine:
+    instrument_engine(read_engine, "read")
 
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+read_session = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+def is_database_busy(exc: BaseException) -> bool:
+    """是否為暫時無法寫入：連線池等待逾時，或 SQLite 寫入鎖等待逾時。
+
+    兩者都代表另一個寫入者占用資料庫，稍後重試即可成功。
+    """
+    if isinstance(exc, PoolTimeoutError):
+        return True
+    return isinstance(exc, OperationalError) and "database is locked" in str(exc.orig)
+
 
 class Base(DeclarativeBase):
     """SQLAlchemy 基礎模型類別。"""
@@ -25,7 +100,45 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db() -> AsyncSession:
+    """取得唯讀資料庫 session（查詢與報表用）。"""
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """以單一交易執行多個 Repository 寫入。
+
+    期間 Repository 的 create/update/delete 只 flush，離開區塊時統一 commit，
+    發生例外則 rollback；巢狀使用時由最外層負責提交。
+    """
+    if db.info.get(UNIT_OF_WORK_KEY):
+        yield db
+        return
+
+    db.info[UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+
+
 async def init_db() -> None:
     """初始化資料庫，建立所有資料表。"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+async def close_db() -> None:
+    """關閉所有連線池。"""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
@@ -2,19 +2,33 @@
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.database import init_db
+from app.database import close_db, init_db, read_session
 from app.routers import (
+    attendance_monthly_router,
     attendance_router,
+    dashboard_router,
     departments_router,
     employees_router,
     flex_settings_router,
+    rule_simulation_router,
     scan_router,
     schedules_router,
 )
+from app.services.dashboard import dashboard_cache
+from app.services.day_close import day_close_scheduler
+from app.services.rfid_filter import known_rfids
+from app.services.rule_cache import rule_cache
+from app.services.scan import scan_locks
+from app.services.scan_debounce import scan_debouncer
+from app.services.scan_writer import scan_writer
+from app.utils.http_cache import response_cache
+from app.utils.metrics import RequestMetricsMiddleware, metrics
+from app.utils.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
 
 
 @asynccontextmanager
@@ -22,8 +36,24 @@ async def lifespan(app: FastAPI):
     """應用程式生命週期管理。"""
     # 啟動時初始化資料庫
     await init_db()
+    if settings.rfid_filter_enabled:
+        async with read_session() as db:
+            await known_rfids.load(db)
+        await known_rfids.start()
+    await rule_cache.start()
+    await response_cache.start()
+    if settings.scan_ingest_mode == "group_commit":
+        await scan_writer.start()
+    if settings.day_close_enabled:
+        await day_close_scheduler.start()
     yield
-    # 關閉時的清理工作（如有需要）
+    # 關閉時停止日結、寫完佇列中的刷卡，再釋放連線池
+    await day_close_scheduler.stop()
+    await known_rfids.stop()
+    await rule_cache.stop()
+    await response_cache.stop()
+    await scan_writer.stop()
+    await close_db()
 
 
 app = FastAPI(
@@ -40,15 +70,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# 請求次數與處理時間指標
+app.add_middleware(RequestMetricsMiddleware)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(
+    request: Request, exc: InvalidCursorError
+) -> JSONResponse:
+    """分頁 cursor 無效時回傳 400。"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 # 註冊路由
 app.include_router(departments_router)
 app.include_router(employees_router)
 app.include_router(schedules_router)
 app.include_router(flex_settings_router)
 app.include_router(attendance_router)
+app.include_router(attendance_monthly_router)
 app.include_router(scan_router)
+app.include_router(dashboard_router)
+app.include_router(rule_simulation_router)
 
 
 @app.get("/")
@@ -66,3 +112,22 @@ async def root():
 async def health_check():
     """健康檢查端點。"""
     return {"status": "healthy"}
+
+
+metrics.add_collector("rule_cache", rule_cache.stats)
+metrics.add_collector("scan_writer", scan_writer.stats)
+metrics.add_collector("scan_locks", scan_locks.stats)
+metrics.add_collector("scan_debounce", scan_debouncer.stats)
+metrics.add_collector("rfid_filter", known_rfids.stats)
+metrics.add_collector("dashboard_cache", dashboard_cache.stats)
+metrics.add_collector("day_close", day_close_scheduler.stats)
+metrics.add_collector("http_cache", response_cache.stats)
+
+
+@app.get("/metrics")
+async def get_metrics() -> Response:
+    """Prometheus 格式的指標端點。"""
+    return Response(
+        content=metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
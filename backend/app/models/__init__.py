@@ -1,6 +1,7 @@
 """SQLAlchemy 資料庫模型。"""
 
 from app.models.attendance import AttendanceDaily
+from app.models.attendance_monthly import AttendanceMonthly
 from app.models.department import Department
 from app.models.employee import Employee
 from app.models.flex_setting import FlexSetting
@@ -16,4 +17,5 @@ __all__ = [
     "RequiredConfig",
     "ScanEvent",
     "AttendanceDaily",
+    "AttendanceMonthly",
 ]
@@ -3,7 +3,7 @@
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Date, ForeignKey, Integer, String
+from sqlalchemy import Date, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -13,6 +13,15 @@ class AttendanceDaily(Base):
     """每日考勤結果資料表。"""
 
     __tablename__ = "AttendanceDaily"
+    __table_args__ = (
+        Index(
+            "UQ_AttendanceDaily_RFID_WorkDate",
+            "RFID_ID",
+            "WorkDate",
+            unique=True,
+        ),
+        Index("IX_AttendanceDaily_WorkDate", "WorkDate"),
+    )
 
     GUID: Mapped[str] = mapped_column(
         String, primary_key=True, default=lambda: str(uuid.uuid4())
@@ -0,0 +1,40 @@
+"""每月考勤彙總資料模型。"""
+
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class AttendanceMonthly(Base):
+    """每月考勤彙總資料表（由 AttendanceDaily 維護的物化彙總）。"""
+
+    __tablename__ = "AttendanceMonthly"
+    __table_args__ = (
+        Index(
+            "UQ_AttendanceMonthly_YearMonth_RFID",
+            "YearMonth",
+            "RFID_ID",
+            unique=True,
+        ),
+    )
+
+    RFID_ID: Mapped[str] = mapped_column(
+        String, ForeignKey("Employees.RFID_ID"), primary_key=True
+    )
+    YearMonth: Mapped[str] = mapped_column(String, primary_key=True)  # YYYY-MM
+    WorkedDays: Mapped[int] = mapped_column(Integer, default=0)
+    # 遷移前的彙總寫入時不含此欄位
+    AbsentDays: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    NormalInCount: Mapped[int] = mapped_column(Integer, default=0)
+    FlexInCount: Mapped[int] = mapped_column(Integer, default=0)
+    LateInCount: Mapped[int] = mapped_column(Integer, default=0)
+    NormalOutCount: Mapped[int] = mapped_column(Integer, default=0)
+    EarlyOutCount: Mapped[int] = mapped_column(Integer, default=0)
+    MissingOutCount: Mapped[int] = mapped_column(Integer, default=0)
+    WorkedMinutes: Mapped[int] = mapped_column(Integer, default=0)
+    UpdateTime: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -13,6 +13,7 @@ class Department(Base):
     """部門資料表。"""
 
     __tablename__ = "Departments"
+    __table_args__ = (Index("IX_Departments_DeptCode_GUID", "DeptCode", "GUID"),)
 
     GUID: Mapped[str] = mapped_column(
         String, primary_key=True, default=lambda: str(uuid.uuid4())
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, ForeignKey, String
+from sqlalchemy import Boolean, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -12,6 +12,7 @@ class Employee(Base):
     """員工資料表。"""
 
     __tablename__ = "Employees"
+    __table_args__ = (Index("IX_Employees_Dept_GUID", "Dept_GUID"),)
 
     RFID_ID: Mapped[str] = mapped_column(String, primary_key=True)
     EmpCode: Mapped[str] = mapped_column(String, nullable=False)
@@ -20,6 +20,7 @@ class FlexSetting(Base):
             unique=True,                # 強制唯一限制
             sqlite_where=text("IsDeleted = 0") # 關鍵：排除已軟刪除的資料
         ),
+        Index("IX_FlexSettings_Dept_GUID_GUID", "Dept_GUID", "GUID"),
     )
 
     GUID: Mapped[str] = mapped_column(
@@ -3,7 +3,7 @@
 import uuid
 from datetime import date, datetime, time
 
-from sqlalchemy import Date, ForeignKey, Integer, String, Time
+from sqlalchemy import Date, ForeignKey, Index, Integer, String, Time
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -13,6 +13,14 @@ class RequiredConfig(Base):
     """規則版本快照資料表（不可變）。"""
 
     __tablename__ = "RequiredConfigs"
+    __table_args__ = (
+        Index(
+            "IX_RequiredConfigs_Dept_ActiveDay_EffectiveFrom",
+            "Dept_GUID",
+            "ActiveDay",
+            "EffectiveFrom",
+        ),
+    )
 
     GUID: Mapped[str] = mapped_column(
         String, primary_key=True, default=lambda: str(uuid.uuid4())
@@ -23,8 +31,9 @@ class RequiredConfig(Base):
     Schedule_GUID: Mapped[str] = mapped_column(
         String, ForeignKey("Schedules.GUID"), nullable=False
     )
-    FlexSetting_GUID: Mapped[str] = mapped_column(
-        String, ForeignKey("FlexSettings.GUID"), nullable=False
+    # 部門沒有彈性設定時為 NULL（FlexMinutes = 0）
+    FlexSetting_GUID: Mapped[str | None] = mapped_column(
+        String, ForeignKey("FlexSettings.GUID"), nullable=True
     )
     ActiveDay: Mapped[int] = mapped_column(Integer, nullable=False)
     RequiredIn: Mapped[time] = mapped_column(Time, nullable=False)
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -13,6 +13,7 @@ class ScanEvent(Base):
     """原始刷卡事件資料表。"""
 
     __tablename__ = "ScanEvents"
+    __table_args__ = (Index("IX_ScanEvents_RFID_EventTime", "RFID_ID", "EventTime"),)
 
     GUID: Mapped[str] = mapped_column(
         String, primary_key=True, default=lambda: str(uuid.uuid4())
@@ -21,6 +21,7 @@ class Schedule(Base):
             unique=True,
             sqlite_where=text("IsDeleted = 0")
         ),
+        Index("IX_Schedules_Dept_ActiveDay_GUID", "Dept_GUID", "ActiveDay", "GUID"),
     )
 
     GUID: Mapped[str] = mapped_column(
@@ -1,10 +1,12 @@
 """資料存取層。"""
 
 from app.repositories.attendance import AttendanceRepository
+from app.repositories.attendance_monthly import AttendanceMonthlyRepository
 from app.repositories.department import DepartmentRepository
 from app.repositories.employee import EmployeeRepository
 from app.repositories.flex_setting import FlexSettingRepository
 from app.repositories.required_config import RequiredConfigRepository
+from app.repositories.scan_archive import ScanArchive
 from app.repositories.scan_event import ScanEventRepository
 from app.repositories.schedule import ScheduleRepository
 
@@ -15,5 +17,7 @@ __all__ = [
     "FlexSettingRepository",
     "RequiredConfigRepository",
     "ScanEventRepository",
+    "ScanArchive",
     "AttendanceRepository",
+    "AttendanceMonthlyRepository",
 ]
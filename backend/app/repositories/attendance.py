@@ -1,17 +1,118 @@
 """考勤資料存取層。"""
 
-from datetime import date
+import uuid
+from collections.abc import AsyncIterator, Collection, Mapping, Sequence
+from datetime import date, datetime, time, timedelta
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    Executable,
+    Integer,
+    Row,
+    String,
+    and_,
+    bindparam,
+    case,
+    cast,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.attendance import AttendanceDaily
+from app.models.department import Department
+from app.models.employee import Employee
 from app.repositories.base import BaseRepository
+from app.utils.metrics import timed_operation
+
+# 日結寫入的 ExceptionFlags，多個標記以逗號分隔
+FLAG_ABSENT = "ABSENT"  # 排班日沒有任何刷卡（缺勤記錄）
+FLAG_SINGLE_SCAN = "SINGLE_SCAN"  # 只有一筆刷卡，沒有 LastOutTime
+FLAG_MISSING_CHECKOUT = "MISSING_CHECKOUT"  # CheckOutStatus = MISSING
+FLAG_LATE_AND_EARLY = "LATE_AND_EARLY"  # 遲到且早退
+
+# SQLite 沒有產生 UUID 的函式，以 randomblob 組成 UUID4 格式的字串
+_SQLITE_UUID4 = (
+    "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || "
+    "substr(hex(randomblob(2)), 2) || '-' || "
+    "substr('89AB', 1 + (abs(random()) % 4), 1) || "
+    "substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))"
+)
+
+# 方言 → 刷卡 upsert 陳述式
+_upsert_cache: dict[str, Executable] = {}
+
+# get_scan_times_by_department 每天串接的欄位（依序）
+SCAN_TIME_FIELDS = (
+    "WorkDate",
+    "FirstInTime",
+    "LastOutTime",
+    "CheckInStatus",
+    "CheckOutStatus",
+)
+
+
+def _random_uuid(dialect_name: str) -> ColumnElement[str]:
+    """在 SQL 中產生 UUID 字串（依資料庫方言）。"""
+    if dialect_name == "postgresql":
+        return cast(func.gen_random_uuid(), String)
+    return literal_column(_SQLITE_UUID4, String)
+
+
+def _concat(
+    dialect_name: str, value: ColumnElement[str], separator: str
+) -> ColumnElement[str]:
+    """把群組內各列的字串串接起來（依資料庫方言）。
+
+    PostgreSQL 依 WorkDate 排序；SQLite 不保證順序，同一查詢內多個串接的
+    順序也不保證一致，需要對齊的欄位須先串成單一值再串接。
+    """
+    if dialect_name == "postgresql":
+        return func.string_agg(
+            value, aggregate_order_by(literal(separator), AttendanceDaily.WorkDate)
+        )
+    return func.group_concat(value, separator)
+
+
+def exception_flags() -> ColumnElement[str | None]:
+    """由考勤欄位推導 ExceptionFlags 的 SQL 運算式（沒有例外時為 NULL）。
+
+    單次刷卡必然也沒有下班卡，因此同時帶有 SINGLE_SCAN 與 MISSING_CHECKOUT；
+    只有 MISSING_CHECKOUT 表示下班卡狀態曾被手動改為 MISSING。
+    """
+    daily = AttendanceDaily
+
+    def flag(condition: ColumnElement[bool], name: str) -> ColumnElement[str]:
+        return case((condition, literal(f"{name},")), else_=literal(""))
+
+    flags = (
+        flag(daily.LastOutTime.is_(None), FLAG_SINGLE_SCAN)
+        + flag(daily.CheckOutStatus == 2, FLAG_MISSING_CHECKOUT)
+        + flag(
+            (daily.CheckInStatus == 2) & (daily.CheckOutStatus == 1),
+            FLAG_LATE_AND_EARLY,
+        )
+    )
+    return case(
+        (daily.FirstInTime.is_(None), literal(FLAG_ABSENT)),
+        else_=func.nullif(func.rtrim(flags, ","), ""),
+    )
 
 
 class AttendanceRepository(BaseRepository[AttendanceDaily]):
     """考勤 Repository。"""
 
+    # 走 (RFID_ID, WorkDate) 唯一索引；GUID 為隨機 UUID，依其分頁順序沒有意義
+    cursor_columns = ("RFID_ID", "WorkDate")
+
     def __init__(self, db: AsyncSession):
         """初始化 Repository。"""
         super().__init__(AttendanceDaily, db)
@@ -30,15 +131,109 @@ class AttendanceRepository(BaseRepository[AttendanceDaily]):
         )
         return result.scalar_one_or_none()
 
+    @timed_operation
+    async def upsert_scan(
+        self,
+        rfid_id: str,
+        work_date: date,
+        event_time: datetime,
+        required_config_guid: str | None,
+        check_in_status: int,
+        check_out_status: int,
+    ) -> Row:
+        """以單一 INSERT ... ON CONFLICT DO UPDATE 寫入刷卡結果。
+
+        新增時寫入 FirstInTime / RequiredConfigGUID（鎖定規則）與 CheckInStatus；
+        (RFID_ID, WorkDate) 已存在時只更新 LastOutTime / CheckOutStatus。
+        已存在的是日結補上的缺勤記錄（沒有 FirstInTime）時，本次視為上班卡並
+        清除缺勤標記，規則沿用日結時鎖定的版本。
+        回傳寫入後的 LastOutTime、CheckInStatus、CheckOutStatus 與 Inserted，
+        LastOutTime 為 None 表示本次為上班卡；Inserted 表示本次新增了記錄
+        （不是補到日結的缺勤記錄），月彙總可直接以增量計入。
+        """
+        now = datetime.utcnow()
+        result = await self.db.execute(
+            self._upsert_statement(),
+            {
+                "guid": str(uuid.uuid4()),
+                "rfid_id": rfid_id,
+                "work_date": work_date,
+                "event_time": event_time,
+                "required_config_guid": required_config_guid,
+                "check_in_status": check_in_status,
+                "check_out_status": check_out_status,
+                "now": now,
+            },
+        )
+        return result.one()
+
+    def _upsert_statement(self) -> Executable:
+        """取得（並快取）刷卡 upsert 陳述式。
+
+        刷卡熱路徑每筆都會呼叫，陳述式建構成本高於執行，因此依方言只建構
+        一次，之後只綁定參數。
+        """
+        dialect_name = self.db.get_bind().dialect.name
+        stmt = _upsert_cache.get(dialect_name)
+        if stmt is not None:
+            return stmt
+
+        # 以 Core 資料表建構：ORM 的 insert 帶參數執行時會被視為批次新增
+        daily = AttendanceDaily.__table__.c
+        now = bindparam("now", type_=DateTime)
+        event_time = bindparam("event_time", type_=DateTime)
+        absent = daily.FirstInTime.is_(None)
+        stmt = self._dialect_insert()(AttendanceDaily.__table__).values(
+            GUID=bindparam("guid", type_=String),
+            RFID_ID=bindparam("rfid_id", type_=String),
+            WorkDate=bindparam("work_date", type_=Date),
+            RequiredConfigGUID=bindparam("required_config_guid", type_=String),
+            FirstInTime=event_time,
+            CheckInStatus=bindparam("check_in_status", type_=Integer),
+            CheckOutStatus=2,  # MISSING
+            CreateTime=now,
+            UpdateTime=now,
+        )
+        stmt = _upsert_cache[dialect_name] = stmt.on_conflict_do_update(
+            index_elements=[daily.RFID_ID, daily.WorkDate],
+            set_={
+                "FirstInTime": func.coalesce(
+                    daily.FirstInTime, stmt.excluded.FirstInTime
+                ),
+                "LastOutTime": case((absent, None), else_=event_time),
+                "CheckInStatus": case(
+                    (absent, stmt.excluded.CheckInStatus),
+                    else_=daily.CheckInStatus,
+                ),
+                "CheckOutStatus": case(
+                    (absent, 2),
+                    else_=bindparam("check_out_status", type_=Integer),
+                ),
+                "RequiredConfigGUID": func.coalesce(
+                    daily.RequiredConfigGUID, stmt.excluded.RequiredConfigGUID
+                ),
+                "ExceptionFlags": case((absent, None), else_=daily.ExceptionFlags),
+                "UpdateTime": now,
+            },
+        ).returning(
+            daily.LastOutTime,
+            daily.CheckInStatus,
+            daily.CheckOutStatus,
+            # 新增時 CreateTime 即為本次的 now，更新既有記錄時不變
+            (daily.CreateTime == now).label("Inserted"),
+        )
+        return stmt
+
     async def get_by_employee_date_range(
         self,
         rfid_id: str,
         start_date: date,
         end_date: date,
-    ) -> list[AttendanceDaily]:
-        """取得員工在指定日期範圍內的考勤記錄。"""
-        result = await self.db.execute(
-            select(AttendanceDaily)
+        fields: Sequence[str] | None = None,
+    ) -> list[AttendanceDaily] | list[Row]:
+        """取得員工在指定日期範圍內的考勤記錄（指定 fields 時回傳欄位值列）。"""
+        return await self._fetch(
+            self._select(fields)
             .where(
                 and_(
                     AttendanceDaily.RFID_ID == rfid_id,
@@ -46,16 +241,260 @@ class AttendanceRepository(BaseRepository[AttendanceDaily]):
                     AttendanceDaily.WorkDate <= end_date,
                 )
             )
-            .order_by(AttendanceDaily.WorkDate)
+            .order_by(AttendanceDaily.WorkDate),
+            fields,
         )
+
+    async def get_snapshot_by_date_range(
+        self,
+        start_date: date,
+        end_date: date,
+        rfid_ids: Collection[str] | None = None,
+    ) -> list[Row]:
+        """取得日期範圍內考勤記錄的比對欄位（重算用，不載入 ORM 物件）。"""
+        stmt = select(
+            AttendanceDaily.GUID,
+            AttendanceDaily.RFID_ID,
+            AttendanceDaily.WorkDate,
+            AttendanceDaily.RequiredConfigGUID,
+            AttendanceDaily.FirstInTime,
+            AttendanceDaily.LastOutTime,
+            AttendanceDaily.CheckInStatus,
+            AttendanceDaily.CheckOutStatus,
+        ).where(
+            AttendanceDaily.WorkDate >= start_date,
+            AttendanceDaily.WorkDate <= end_date,
+        )
+        if rfid_ids is not None:
+            stmt = stmt.where(AttendanceDaily.RFID_ID.in_(rfid_ids))
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    async def stream_export(
+        self,
+        start_date: date,
+        end_date: date,
+        dept_guid: str | None = None,
+        batch_size: int = 2000,
+    ) -> AsyncIterator[list[Row]]:
+        """依 (WorkDate, RFID_ID) 分批串流日期範圍內的考勤記錄（匯出用）。
+
+        員工與部門名稱在 SQL 中 JOIN 取得，只取匯出欄位、不建立 ORM 物件；
+        以伺服器端游標每次讀取 batch_size 筆，記憶體用量與區間大小無關。
+        """
+        stmt = (
+            select(
+                AttendanceDaily.WorkDate,
+                AttendanceDaily.RFID_ID,
+                Employee.EmpCode,
+                Employee.Name,
+                Department.DeptCode,
+                Department.DeptName,
+                AttendanceDaily.FirstInTime,
+                AttendanceDaily.LastOutTime,
+                AttendanceDaily.CheckInStatus,
+                AttendanceDaily.CheckOutStatus,
+                AttendanceDaily.ExceptionFlags,
+            )
+            .join(Employee, Employee.RFID_ID == AttendanceDaily.RFID_ID)
+            .join(Department, Department.GUID == Employee.Dept_GUID)
+            .where(
+                AttendanceDaily.WorkDate >= start_date,
+                AttendanceDaily.WorkDate <= end_date,
+            )
+            .order_by(AttendanceDaily.WorkDate, AttendanceDaily.RFID_ID)
+            .execution_options(yield_per=batch_size)
+        )
+        if dept_guid is not None:
+            stmt = stmt.where(Employee.Dept_GUID == dept_guid)
+        result = await self.db.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_scan_times_by_department(
+        self, dept_guid: str, start_date: date, end_date: date
+    ) -> list[Row]:
+        """取得部門員工日期範圍內有上班卡的刷卡時間與狀態（規則模擬用）。
+
+        依 (RFID_ID, RequiredConfigGUID) 分組，每組一列：COUNT 與 Records。
+        每天的 SCAN_TIME_FIELDS（LastOutTime 沒有時為 'NaT'）先以分號串成一筆，
+        再以分號串接該組所有天；只用一個聚合，各欄位必然對齊，不依賴資料庫
+        處理群組內各列的順序（SQLite 的 group_concat 不保證順序）。
+        一季上萬人的考勤只需傳回上萬列，由呼叫端整批切開解析。
+        沒有鎖定規則版本的記錄 RequiredConfigGUID 為 None，自成一組。
+        """
+        dialect_name = self.db.get_bind().dialect.name
+        daily = AttendanceDaily
+        record = (
+            cast(daily.WorkDate, String)
+            + ";"
+            + cast(daily.FirstInTime, String)
+            + ";"
+            + func.coalesce(cast(daily.LastOutTime, String), "NaT")
+            + ";"
+            + cast(daily.CheckInStatus, String)
+            + ";"
+            + cast(daily.CheckOutStatus, String)
+        )
+        stmt = (
+            select(
+                daily.RFID_ID,
+                daily.RequiredConfigGUID,
+                func.count().label("days"),
+                _concat(dialect_name, record, ";").label("Records"),
+            )
+            .join(Employee, Employee.RFID_ID == daily.RFID_ID)
+            .where(
+                Employee.Dept_GUID == dept_guid,
+                daily.WorkDate >= start_date,
+                daily.WorkDate <= end_date,
+                daily.FirstInTime.is_not(None),
+            )
+            .group_by(daily.RFID_ID, daily.RequiredConfigGUID)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    async def get_by_date(
+        self, work_date: date, fields: Sequence[str] | None = None
+    ) -> list[AttendanceDaily] | list[Row]:
+        """取得指定日期所有員工的考勤記錄（指定 fields 時回傳欄位值列）。"""
+        return await self._fetch(
+            self._select(fields).where(AttendanceDaily.WorkDate == work_date),
+            fields,
+        )
+
+    async def get_dashboard_counts(
+        self, work_date: date, dept_guid: str | None = None
+    ) -> list[Row]:
+        """以 GROUP BY 統計各部門在職員工當日的出勤狀態人數。
+
+        以在職員工 LEFT JOIN 當日考勤（走 (RFID_ID, WorkDate) 唯一索引），
+        上班卡狀態只計入有 FirstInTime 的記錄。
+        """
+        present = AttendanceDaily.FirstInTime.is_not(None)
+
+        def count(condition) -> ColumnElement[int]:
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        stmt = (
+            select(
+                Department.GUID.label("Dept_GUID"),
+                Department.DeptName,
+                func.count(Employee.RFID_ID).label("employees"),
+                count(present).label("present"),
+                count(present & (AttendanceDaily.CheckInStatus == 0)).label("normal"),
+                count(present & (AttendanceDaily.CheckInStatus == 1)).label("flex"),
+                count(present & (AttendanceDaily.CheckInStatus == 2)).label("late"),
+                count(present & (AttendanceDaily.CheckOutStatus == 1)).label("early"),
+                count(present & (AttendanceDaily.CheckOutStatus == 2)).label("missing"),
+            )
+            .join(Employee, Employee.Dept_GUID == Department.GUID)
+            .outerjoin(
+                AttendanceDaily,
+                and_(
+                    AttendanceDaily.RFID_ID == Employee.RFID_ID,
+                    AttendanceDaily.WorkDate == work_date,
+                ),
+            )
+            .where(Employee.Active == True)  # noqa: E712
+            .group_by(Department.GUID, Department.DeptName)
+            .order_by(Department.GUID)
+        )
+        if dept_guid is not None:
+            stmt = stmt.where(Department.GUID == dept_guid)
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    @timed_operation
+    async def insert_absences(
+        self, work_date: date, dept_configs: Mapping[str, str], now: datetime
+    ) -> list[str]:
+        """以單一 INSERT ... SELECT 為當日沒有考勤記錄的在職員工新增缺勤記錄。
+
+        dept_configs 為當日排班部門 → 鎖定的規則版本；work_date 之後才建立的
+        員工不計缺勤。缺勤記錄沒有 FirstInTime / LastOutTime，CheckOutStatus
+        為 MISSING，ExceptionFlags 由 update_exception_flags 寫入。
+        回傳新增記錄的卡號（不提交交易）。
+        """
+        if not dept_configs:
+            return []
+        next_day = datetime.combine(work_date + timedelta(days=1), time.min)
+        absentees = select(
+            _random_uuid(self.db.get_bind().dialect.name),
+            Employee.RFID_ID,
+            literal(work_date, Date),
+            case(dict(dept_configs), value=Employee.Dept_GUID),
+            literal(0),
+            literal(2),  # MISSING
+            literal(now, DateTime),
+            literal(now, DateTime),
+        ).where(
+            Employee.Dept_GUID.in_(list(dept_configs)),
+            Employee.Active == True,  # noqa: E712
+            Employee.CreateTime < next_day,
+            ~exists().where(
+                AttendanceDaily.RFID_ID == Employee.RFID_ID,
+                AttendanceDaily.WorkDate == work_date,
+            ),
+        )
+        stmt = (
+            insert(AttendanceDaily)
+            .from_select(
+                [
+                    "GUID",
+                    "RFID_ID",
+                    "WorkDate",
+                    "RequiredConfigGUID",
+                    "CheckInStatus",
+                    "CheckOutStatus",
+                    "CreateTime",
+                    "UpdateTime",
+                ],
+                absentees,
+            )
+            .returning(AttendanceDaily.RFID_ID)
+        )
+        result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
-    async def get_by_date(self, work_date: date) -> list[AttendanceDaily]:
-        """取得指定日期所有員工的考勤記錄。"""
+    @timed_operation
+    async def update_exception_flags(
+        self, work_date: date, dept_guids: Collection[str], now: datetime
+    ) -> int:
+        """以單一 UPDATE 重新推導指定部門員工當日的 ExceptionFlags。
+
+        只寫入標記有變動的記錄，重複執行不會產生多餘的寫入；
+        回傳更新筆數（不提交交易）。
+        """
+        if not dept_guids:
+            return 0
+        flags = exception_flags()
+        stmt = (
+            update(AttendanceDaily)
+            .where(
+                AttendanceDaily.WorkDate == work_date,
+                AttendanceDaily.RFID_ID.in_(
+                    select(Employee.RFID_ID).where(
+                        Employee.Dept_GUID.in_(list(dept_guids))
+                    )
+                ),
+                AttendanceDaily.ExceptionFlags.is_distinct_from(flags),
+            )
+            .values(ExceptionFlags=flags, UpdateTime=now)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        return result.rowcount
+
+    async def get_work_date_range(self) -> tuple[date | None, date | None]:
+        """取得所有考勤記錄最早與最晚的 WorkDate（沒有記錄時為 None）。"""
         result = await self.db.execute(
-            select(AttendanceDaily).where(AttendanceDaily.WorkDate == work_date)
+            select(
+                func.min(AttendanceDaily.WorkDate), func.max(AttendanceDaily.WorkDate)
+            )
         )
-        return list(result.scalars().all())
+        return tuple(result.one())
 
     async def count_active(self) -> int:
         """取得考勤記錄總數。"""
@@ -0,0 +1,287 @@
+"""每月考勤彙總資料存取層。"""
+
+from collections.abc import Collection, Iterable
+from datetime import date, datetime
+
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    Executable,
+    Integer,
+    String,
+    bindparam,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import AttendanceDaily
+from app.models.attendance_monthly import AttendanceMonthly
+from app.repositories.base import BaseRepository
+from app.utils.metrics import timed_operation
+
+YEAR_MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+_SUMMARY_COLUMNS = (
+    "WorkedDays",
+    "AbsentDays",
+    "NormalInCount",
+    "FlexInCount",
+    "LateInCount",
+    "NormalOutCount",
+    "EarlyOutCount",
+    "MissingOutCount",
+    "WorkedMinutes",
+    "UpdateTime",
+)
+
+# (方言, 是否指定員工) → (upsert, 刪除) 陳述式
+_refresh_cache: dict[tuple[str, bool], tuple[Executable, Executable]] = {}
+# 方言 → 上班卡增量 upsert 陳述式
+_clock_in_cache: dict[str, Executable] = {}
+
+
+def year_month_of(work_date: date) -> str:
+    """取得 WorkDate 所屬的年月（YYYY-MM）。"""
+    return f"{work_date.year:04d}-{work_date.month:02d}"
+
+
+def month_bounds(year_month: str) -> tuple[date, date]:
+    """取得年月的起日（含）與下個月起日（不含）。"""
+    year, month = (int(part) for part in year_month.split("-"))
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _minutes_between(
+    dialect_name: str, start: ColumnElement[datetime], end: ColumnElement[datetime]
+) -> ColumnElement[int]:
+    """兩個時間點相差的分鐘數（依資料庫方言產生 SQL）。"""
+    if dialect_name == "postgresql":
+        return cast(func.extract("epoch", end - start) / 60, Integer)
+    return cast(
+        func.round((func.julianday(end) - func.julianday(start)) * 1440), Integer
+    )
+
+
+def _count(condition: ColumnElement[bool]) -> ColumnElement[int]:
+    """計算符合條件的列數。"""
+    return func.sum(case((condition, 1), else_=0))
+
+
+class AttendanceMonthlyRepository(BaseRepository[AttendanceMonthly]):
+    """每月考勤彙總 Repository。"""
+
+    # 依月份列出時走 (YearMonth, RFID_ID) 唯一索引
+    cursor_columns = ("YearMonth", "RFID_ID")
+
+    def __init__(self, db: AsyncSession):
+        """初始化 Repository。"""
+        super().__init__(AttendanceMonthly, db)
+
+    async def get_by_employee_and_month(
+        self, rfid_id: str, year_month: str
+    ) -> AttendanceMonthly | None:
+        """取得員工指定月份的彙總（主鍵查詢）。"""
+        return await self.db.get(AttendanceMonthly, (rfid_id, year_month))
+
+    async def get_by_month(
+        self,
+        year_month: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> list[AttendanceMonthly]:
+        """取得指定月份所有員工的彙總。"""
+        result = await self.db.execute(
+            self._paginate(
+                select(AttendanceMonthly).where(
+                    AttendanceMonthly.YearMonth == year_month
+                ),
+                skip,
+                limit,
+                cursor,
+            )
+        )
+        return list(result.scalars().all())
+
+    @timed_operation
+    async def refresh(
+        self,
+        year_month: str,
+        rfid_ids: Collection[str] | None = None,
+        prune: bool = True,
+    ) -> None:
+        """由 AttendanceDaily 重新彙總指定月份（與員工）的記錄（不提交交易）。
+
+        以單一 INSERT ... SELECT ... ON CONFLICT DO UPDATE 寫入，每位員工只讀取
+        當月最多 31 筆每日記錄（走 (RFID_ID, WorkDate) 唯一索引）。
+        日結補上的缺勤記錄（沒有 FirstInTime）只計入 AbsentDays。
+        prune 時一併刪除已沒有每日記錄的彙總；只會新增或更新每日記錄的
+        呼叫端（刷卡）可傳入 False 省略。
+        """
+        start, end = month_bounds(year_month)
+        params = {"year_month": year_month, "start": start, "end": end}
+        if rfid_ids is not None:
+            params["rfid_ids"] = list(rfid_ids)
+        upsert, stale = self._refresh_statements(rfid_ids is not None)
+        await self.db.execute(upsert, {**params, "now": datetime.utcnow()})
+        if prune:
+            await self.db.execute(stale, params)
+
+    @timed_operation
+    async def add_clock_ins(self, clock_ins: Iterable[tuple[str, str, int]]) -> None:
+        """把新增的上班卡記錄以增量計入月彙總（不提交交易）。
+
+        clock_ins 為 (RFID_ID, YearMonth, CheckInStatus)。刷卡新增的每日記錄
+        只有上班卡：WorkedDays 與 MissingOutCount 各加一、工時為 0，因此不必
+        重新讀取當月的每日記錄；同員工同月多筆先合併成一次 upsert。
+        """
+        deltas: dict[tuple[str, str], list[int]] = {}
+        for rfid_id, year_month, check_in_status in clock_ins:
+            counts = deltas.setdefault((rfid_id, year_month), [0, 0, 0])
+            counts[check_in_status] += 1
+        if not deltas:
+            return
+        now = datetime.utcnow()
+        await self.db.execute(
+            self._clock_in_statement(),
+            [
+                {
+                    "rfid_id": rfid_id,
+                    "year_month": year_month,
+                    "worked": sum(counts),
+                    "normal": counts[0],
+                    "flex": counts[1],
+                    "late": counts[2],
+                    "now": now,
+                }
+                for (rfid_id, year_month), counts in deltas.items()
+            ],
+        )
+
+    def _clock_in_statement(self) -> Executable:
+        """取得（並快取）上班卡增量 upsert 陳述式。"""
+        dialect_name = self.db.get_bind().dialect.name
+        stmt = _clock_in_cache.get(dialect_name)
+        if stmt is not None:
+            return stmt
+
+        monthly = AttendanceMonthly.__table__.c
+        worked = bindparam("worked", type_=Integer)
+        stmt = self._dialect_insert()(AttendanceMonthly.__table__).values(
+            RFID_ID=bindparam("rfid_id", type_=String),
+            YearMonth=bindparam("year_month", type_=String),
+            WorkedDays=worked,
+            AbsentDays=0,
+            NormalInCount=bindparam("normal", type_=Integer),
+            FlexInCount=bindparam("flex", type_=Integer),
+            LateInCount=bindparam("late", type_=Integer),
+            NormalOutCount=0,
+            EarlyOutCount=0,
+            MissingOutCount=worked,
+            WorkedMinutes=0,
+            UpdateTime=bindparam("now", type_=DateTime),
+        )
+        stmt = _clock_in_cache[dialect_name] = stmt.on_conflict_do_update(
+            index_elements=[monthly.RFID_ID, monthly.YearMonth],
+            set_={
+                column: monthly[column] + stmt.excluded[column]
+                for column in (
+                    "WorkedDays",
+                    "NormalInCount",
+                    "FlexInCount",
+                    "LateInCount",
+                    "MissingOutCount",
+                )
+            }
+            | {"UpdateTime": stmt.excluded.UpdateTime},
+        )
+        return stmt
+
+    def _refresh_statements(self, filtered: bool) -> tuple[Executable, Executable]:
+        """取得（並快取）彙總用的 upsert 與刪除陳述式。
+
+        刷卡熱路徑每批都會呼叫，陳述式建構成本高於執行，因此依方言與是否
+        指定員工只建構一次，之後只綁定參數。
+        """
+        dialect_name = self.db.get_bind().dialect.name
+        key = (dialect_name, filtered)
+        statements = _refresh_cache.get(key)
+        if statements is not None:
+            return statements
+
+        # 以 Core 資料表建構：ORM 的 insert 帶參數執行時會被視為批次新增
+        daily = AttendanceDaily
+        monthly = AttendanceMonthly.__table__.c
+        in_month = [
+            daily.WorkDate >= bindparam("start", type_=Date),
+            daily.WorkDate < bindparam("end", type_=Date),
+        ]
+        if filtered:
+            in_month.append(daily.RFID_ID.in_(bindparam("rfid_ids", expanding=True)))
+
+        present = daily.FirstInTime.is_not(None)
+        summary = (
+            select(
+                daily.RFID_ID,
+                bindparam("year_month", type_=String),
+                func.count(daily.FirstInTime),
+                _count(daily.FirstInTime.is_(None)),
+                _count(present & (daily.CheckInStatus == 0)),
+                _count(present & (daily.CheckInStatus == 1)),
+                _count(present & (daily.CheckInStatus == 2)),
+                _count(present & (daily.CheckOutStatus == 0)),
+                _count(present & (daily.CheckOutStatus == 1)),
+                _count(present & (daily.CheckOutStatus == 2)),
+                func.coalesce(
+                    func.sum(
+                        _minutes_between(
+                            dialect_name, daily.FirstInTime, daily.LastOutTime
+                        )
+                    ),
+                    0,
+                ),
+                bindparam("now", type_=DateTime),
+            )
+            .where(*in_month)
+            .group_by(daily.RFID_ID)
+        )
+        upsert = self._dialect_insert()(AttendanceMonthly.__table__).from_select(
+            ["RFID_ID", "YearMonth", *_SUMMARY_COLUMNS], summary
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[monthly.RFID_ID, monthly.YearMonth],
+            set_={column: upsert.excluded[column] for column in _SUMMARY_COLUMNS},
+        )
+
+        stale = delete(AttendanceMonthly.__table__).where(
+            monthly.YearMonth == bindparam("year_month", type_=String),
+            ~exists().where(daily.RFID_ID == monthly.RFID_ID, *in_month[:2]),
+        )
+        if filtered:
+            stale = stale.where(
+                monthly.RFID_ID.in_(bindparam("rfid_ids", expanding=True))
+            )
+
+        statements = _refresh_cache[key] = (upsert, stale)
+        return statements
+
+    async def delete_all(self) -> None:
+        """刪除所有彙總（重建用，不提交交易）。"""
+        await self.db.execute(delete(AttendanceMonthly))
+
+    async def delete_outside(self, first_month: str, last_month: str) -> None:
+        """刪除年月不在 first_month～last_month 之間的彙總（重建用，不提交交易）。"""
+        await self.db.execute(
+            delete(AttendanceMonthly).where(
+                (AttendanceMonthly.YearMonth < first_month)
+                | (AttendanceMonthly.YearMonth > last_month)
+            )
+        )
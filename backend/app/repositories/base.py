@@ -1,28 +1,106 @@
 """基礎 Repository 類別。"""
 
+from collections.abc import Sequence
 from typing import Generic, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import Column, Row, Select, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import Base
+from app.database import UNIT_OF_WORK_KEY, Base
+from app.utils.metrics import timed_operation
+from app.utils.pagination import decode_cursor, encode_cursor
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 
 class BaseRepository(Generic[ModelType]):
-    """基礎 Repository，提供通用 CRUD 操作。"""
+    """基礎 Repository，提供通用 CRUD 操作。
+
+    公開操作以 @timed_operation 記錄耗時；子類別在刷卡熱路徑上的查詢也應加上。
+    列表查詢一律依 cursor_columns（預設為主鍵）排序，可用 skip 或 cursor 分頁。
+    """
+
+    # 分頁排序鍵，須唯一且有索引；空值代表使用主鍵（主鍵為隨機 UUID 時應另外指定）
+    cursor_columns: tuple[str, ...] = ()
 
     def __init__(self, model: type[ModelType], db: AsyncSession):
         """初始化 Repository。"""
         self.model = model
         self.db = db
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[ModelType]:
-        """取得所有記錄。"""
-        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
-        return list(result.scalars().all())
+    @timed_operation
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list[ModelType] | list[Row]:
+        """取得所有記錄（指定 fields 時回傳欄位值列，見 _select）。"""
+        return await self._fetch(
+            self._paginate(self._select(fields), skip, limit, cursor), fields
+        )
+
+    async def get_change_marker(self) -> tuple:
+        """取得資料表的異動標記：(總數, 最後更新時間)。
+
+        新增、刪除與經 ORM 的修改（UpdateTime 隨之更新）都會改變標記，供其他
+        行程的快取判斷資料是否異動；沒有 UpdateTime 的資料表須覆寫。
+        """
+        result = await self.db.execute(
+            select(func.count(), func.max(self.model.UpdateTime)).select_from(
+                self.model
+            )
+        )
+        return tuple(result.one())
+
+    def _select(self, fields: Sequence[str] | None = None) -> Select:
+        """建立查詢：未指定 fields 時載入 ORM 物件，否則只選取這些欄位。
+
+        欄位列不經過 ORM 的 identity map 與屬性追蹤，供大量唯讀列表直接序列化。
+        """
+        if fields is None:
+            return select(self.model)
+        table = self.model.__table__
+        return select(*(table.c[name] for name in fields))
+
+    async def _fetch(self, stmt: Select, fields: Sequence[str] | None) -> list:
+        """執行 _select 建立的查詢，回傳 ORM 物件或欄位值列。"""
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all() if fields is None else result.all())
 
+    def _sort_key(self) -> Sequence[Column]:
+        """取得分頁排序鍵欄位。"""
+        table = self.model.__table__
+        if self.cursor_columns:
+            return [table.c[name] for name in self.cursor_columns]
+        return list(table.primary_key.columns)
+
+    def _paginate(
+        self, stmt: Select, skip: int, limit: int, cursor: str | None
+    ) -> Select:
+        """依排序鍵排序並套用分頁；有 cursor 時從 cursor 之後開始（keyset）。"""
+        columns = self._sort_key()
+        if cursor is not None:
+            values = decode_cursor(
+                cursor, [column.type.python_type for column in columns]
+            )
+            if len(columns) == 1:
+                stmt = stmt.where(columns[0] > values[0])
+            else:
+                stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+        return stmt.order_by(*columns).offset(skip).limit(limit)
+
+    def next_cursor(self, items: Sequence[ModelType], limit: int) -> str | None:
+        """取得下一頁的 cursor；本頁未滿 limit 筆代表沒有下一頁。"""
+        if not items or len(items) < limit:
+            return None
+        last = items[-1]
+        return encode_cursor([getattr(last, column.key) for column in self._sort_key()])
+
+    @timed_operation
     async def get_by_id(
         self, id_value: str, id_field: str = "GUID"
     ) -> ModelType | None:
@@ -32,24 +110,62 @@ class BaseRepository(Generic[ModelType]):
         )
         return result.scalar_one_or_none()
 
-    async def create(self, obj: ModelType) -> ModelType:
-        """建立新記錄。"""
+    @timed_operation
+    async def create(self, obj: ModelType, refresh: bool = True) -> ModelType:
+        """建立新記錄。
+
+        呼叫端已持有所有欄位值時可傳入 refresh=False 省略回讀查詢。
+        """
         self.db.add(obj)
-        await self.db.commit()
-        await self.db.refresh(obj)
+        await self._save(obj, refresh)
         return obj
 
-    async def update(self, obj: ModelType) -> ModelType:
+    @timed_operation
+    async def bulk_insert(self, rows: list[dict]) -> None:
+        """批次新增記錄（executemany，不提交交易）。"""
+        if rows:
+            await self.db.execute(insert(self.model), rows)
+
+    @timed_operation
+    async def bulk_update(self, rows: list[dict]) -> None:
+        """依主鍵批次更新記錄（executemany，不提交交易）。
+
+        每筆 dict 需包含主鍵欄位，其餘欄位為要更新的值。
+        """
+        if rows:
+            await self.db.execute(update(self.model), rows)
+
+    @timed_operation
+    async def update(self, obj: ModelType, refresh: bool = True) -> ModelType:
         """更新記錄。"""
-        await self.db.commit()
-        await self.db.refresh(obj)
+        await self._save(obj, refresh)
         return obj
 
+    @timed_operation
     async def delete(self, obj: ModelType) -> None:
         """刪除記錄。"""
         await self.db.delete(obj)
-        await self.db.commit()
+        await self._save(obj, refresh=False)
+
+    def _dialect_insert(self):
+        """取得目前資料庫方言支援 ON CONFLICT 的 insert 建構函式。"""
+        dialect_name = self.db.get_bind().dialect.name
+        if dialect_name == "sqlite":
+            return sqlite_insert
+        if dialect_name == "postgresql":
+            return postgresql_insert
+        raise NotImplementedError(f"不支援的資料庫方言：{dialect_name}")
+
+    async def _save(self, obj: ModelType, refresh: bool) -> None:
+        """寫入變更：unit of work 期間只 flush，否則立即 commit。"""
+        if self.db.info.get(UNIT_OF_WORK_KEY):
+            await self.db.flush()
+        else:
+            await self.db.commit()
+        if refresh:
+            await self.db.refresh(obj)
 
+    @timed_operation
     async def count(self) -> int:
         """取得總記錄數。"""
         from sqlalchemy import func
@@ -1,5 +1,7 @@
 """部門資料存取層。"""
 
+from collections.abc import Collection
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,6 +12,9 @@ from app.repositories.base import BaseRepository
 class DepartmentRepository(BaseRepository[Department]):
     """部門 Repository。"""
 
+    # 依部門代碼排列，GUID 讓重複代碼也有穩定順序（IX_Departments_DeptCode_GUID）
+    cursor_columns = ("DeptCode", "GUID")
+
     def __init__(self, db: AsyncSession):
         """初始化 Repository。"""
         super().__init__(Department, db)
@@ -20,3 +25,17 @@ class DepartmentRepository(BaseRepository[Department]):
             select(Department).where(Department.DeptCode == dept_code)
         )
         return result.scalar_one_or_none()
+
+    async def get_all_guids(self) -> list[str]:
+        """取得所有部門的 GUID。"""
+        result = await self.db.execute(select(Department.GUID))
+        return list(result.scalars().all())
+
+    async def get_existing_guids(self, guids: Collection[str]) -> set[str]:
+        """取得其中已存在的部門 GUID。"""
+        if not guids:
+            return set()
+        result = await self.db.execute(
+            select(Department.GUID).where(Department.GUID.in_(guids))
+        )
+        return set(result.scalars().all())
@@ -1,10 +1,13 @@
 """員工資料存取層。"""
 
-from sqlalchemy import select
+from collections.abc import Collection, Sequence
+
+from sqlalchemy import Row, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.employee import Employee
 from app.repositories.base import BaseRepository
+from app.utils.metrics import timed_operation
 
 
 class EmployeeRepository(BaseRepository[Employee]):
@@ -18,26 +21,87 @@ class EmployeeRepository(BaseRepository[Employee]):
         """根據 RFID ID 取得員工。"""
         return await self.get_by_id(rfid_id, "RFID_ID")
 
-    async def get_active_employees(
-        self, skip: int = 0, limit: int = 100
-    ) -> list[Employee]:
-        """取得所有在職員工。"""
+    @timed_operation
+    async def get_by_rfids(self, rfid_ids: Collection[str]) -> list[Employee]:
+        """根據多個 RFID ID 一次取得員工。"""
+        if not rfid_ids:
+            return []
+        result = await self.db.execute(
+            select(Employee).where(Employee.RFID_ID.in_(rfid_ids))
+        )
+        return list(result.scalars().all())
+
+    async def get_existing_rfids(self, rfid_ids: Collection[str]) -> set[str]:
+        """取得其中已被員工使用的 RFID ID（只讀主鍵，不載入員工）。"""
+        if not rfid_ids:
+            return set()
         result = await self.db.execute(
-            select(Employee)
-            .where(Employee.Active == True)  # noqa: E712
-            .offset(skip)
-            .limit(limit)
+            select(Employee.RFID_ID).where(Employee.RFID_ID.in_(rfid_ids))
         )
+        return set(result.scalars().all())
+
+    async def get_all_rfids(self) -> list[str]:
+        """取得所有員工的 RFID ID。"""
+        result = await self.db.execute(select(Employee.RFID_ID))
         return list(result.scalars().all())
 
+    async def get_change_marker(self) -> tuple:
+        """取得員工資料的異動標記：(總數, 在職數, 最後更新時間)。
+
+        新增、刪除、停用與經 ORM 的修改（UpdateTime 隨之更新）都會改變標記；
+        直接以 SQL 修改部門時須一併更新 UpdateTime。
+        """
+        result = await self.db.execute(
+            select(
+                func.count(),
+                func.count(case((Employee.Active == True, 1))),  # noqa: E712
+                func.max(Employee.UpdateTime),
+            ).select_from(Employee)
+        )
+        return tuple(result.one())
+
+    async def get_department_map(
+        self, rfid_ids: Collection[str] | None = None
+    ) -> dict[str, str]:
+        """取得 RFID ID 對應部門 GUID 的對照表。"""
+        stmt = select(Employee.RFID_ID, Employee.Dept_GUID)
+        if rfid_ids is not None:
+            stmt = stmt.where(Employee.RFID_ID.in_(rfid_ids))
+        result = await self.db.execute(stmt)
+        return dict(result.tuples().all())
+
+    async def get_active_employees(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list[Employee] | list[Row]:
+        """取得所有在職員工（指定 fields 時回傳欄位值列）。"""
+        return await self._fetch(
+            self._paginate(
+                self._select(fields).where(Employee.Active == True),  # noqa: E712
+                skip,
+                limit,
+                cursor,
+            ),
+            fields,
+        )
+
     async def get_by_department(
-        self, dept_guid: str, skip: int = 0, limit: int = 100
+        self,
+        dept_guid: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
     ) -> list[Employee]:
         """根據部門取得員工列表。"""
         result = await self.db.execute(
-            select(Employee)
-            .where(Employee.Dept_GUID == dept_guid)
-            .offset(skip)
-            .limit(limit)
+            self._paginate(
+                select(Employee).where(Employee.Dept_GUID == dept_guid),
+                skip,
+                limit,
+                cursor,
+            )
         )
         return list(result.scalars().all())
@@ -1,28 +1,36 @@
 """彈性設定資料存取層。"""
 
+from collections.abc import Collection
+
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.flex_setting import FlexSetting
 from app.repositories.base import BaseRepository
+from app.utils.metrics import timed_operation
 
 
 class FlexSettingRepository(BaseRepository[FlexSetting]):
     """彈性設定 Repository。"""
 
+    # 依部門排列（IX_FlexSettings_Dept_GUID_GUID）；GUID 區分已刪除的舊設定
+    cursor_columns = ("Dept_GUID", "GUID")
+
     def __init__(self, db: AsyncSession):
         """初始化 Repository。"""
         super().__init__(FlexSetting, db)
 
     async def get_all_active(
-        self, skip: int = 0, limit: int = 100
+        self, skip: int = 0, limit: int = 100, cursor: str | None = None
     ) -> list[FlexSetting]:
         """取得所有未刪除的彈性設定。"""
         result = await self.db.execute(
-            select(FlexSetting)
-            .where(FlexSetting.IsDeleted == False)  # noqa: E712
-            .offset(skip)
-            .limit(limit)
+            self._paginate(
+                select(FlexSetting).where(FlexSetting.IsDeleted == False),  # noqa: E712
+                skip,
+                limit,
+                cursor,
+            )
         )
         return list(result.scalars().all())
 
@@ -38,6 +46,23 @@ class FlexSettingRepository(BaseRepository[FlexSetting]):
         )
         return result.scalar_one_or_none()
 
+    @timed_operation
+    async def get_by_departments(
+        self, dept_guids: Collection[str]
+    ) -> list[FlexSetting]:
+        """一次取得多個部門的彈性設定。"""
+        if not dept_guids:
+            return []
+        result = await self.db.execute(
+            select(FlexSetting).where(
+                and_(
+                    FlexSetting.Dept_GUID.in_(dept_guids),
+                    FlexSetting.IsDeleted == False,  # noqa: E712
+                )
+            )
+        )
+        return list(result.scalars().all())
+
     async def soft_delete(
         self, flex_setting: FlexSetting, deleted_by: str
     ) -> FlexSetting:
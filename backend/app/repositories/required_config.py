@@ -1,12 +1,14 @@
 """規則配置快照資料存取層。"""
 
+from collections.abc import Collection
 from datetime import date
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.required_config import RequiredConfig
 from app.repositories.base import BaseRepository
+from app.utils.metrics import timed_operation
 
 
 class RequiredConfigRepository(BaseRepository[RequiredConfig]):
@@ -35,6 +37,65 @@ class RequiredConfigRepository(BaseRepository[RequiredConfig]):
         )
         return result.scalar_one_or_none()
 
+    @timed_operation
+    async def get_by_departments(
+        self, dept_guids: Collection[str]
+    ) -> list[RequiredConfig]:
+        """一次取得多個部門的所有規則版本。"""
+        if not dept_guids:
+            return []
+        result = await self.db.execute(
+            select(RequiredConfig).where(RequiredConfig.Dept_GUID.in_(dept_guids))
+        )
+        return list(result.scalars().all())
+
+    async def get_change_marker(self) -> tuple:
+        """取得規則版本的異動標記：(總數, 已失效數, 最後建立時間)。
+
+        發佈只會新增版本並關閉（寫入 EffectiveTo）舊版本，任一發佈都會改變標記。
+        """
+        result = await self.db.execute(
+            select(
+                func.count(),
+                func.count(RequiredConfig.EffectiveTo),
+                func.max(RequiredConfig.CreateTime),
+            ).select_from(RequiredConfig)
+        )
+        return tuple(result.one())
+
+    async def get_open_by_department(self, dept_guid: str) -> list[RequiredConfig]:
+        """取得部門尚未失效（EffectiveTo 為 NULL）的規則版本。"""
+        result = await self.db.execute(
+            select(RequiredConfig).where(
+                RequiredConfig.Dept_GUID == dept_guid,
+                RequiredConfig.EffectiveTo == None,  # noqa: E711
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_by_ids(self, guids: Collection[str]) -> list[RequiredConfig]:
+        """一次取得多個規則版本。"""
+        if not guids:
+            return []
+        result = await self.db.execute(
+            select(RequiredConfig).where(RequiredConfig.GUID.in_(guids))
+        )
+        return list(result.scalars().all())
+
+    async def get_effective_by_date(self, target_date: date) -> list[RequiredConfig]:
+        """取得所有部門在指定日期有效的規則版本（當天星期與全年）。"""
+        result = await self.db.execute(
+            select(RequiredConfig).where(
+                RequiredConfig.ActiveDay.in_((target_date.weekday() + 1, 8)),
+                RequiredConfig.EffectiveFrom <= target_date,
+                (
+                    (RequiredConfig.EffectiveTo == None)  # noqa: E711
+                    | (RequiredConfig.EffectiveTo >= target_date)
+                ),
+            )
+        )
+        return list(result.scalars().all())
+
     async def get_current_config_for_department(
         self, dept_guid: str, weekday: int, target_date: date
     ) -> RequiredConfig | None:
@@ -0,0 +1,308 @@
+"""已封存刷卡事件的存取層（本機的每月欄式區段檔）。
+
+每個月份一個 zip 檔（{YYYY-MM}.scans.zip），列依 (RFID_ID, EventTime, GUID)
+排序並切成固定列數的 row group，每個 row group 的每個欄位各自是一個
+壓縮成員，查詢單一員工時只解壓縮涵蓋該員工的 row group：
+
+- meta.json：列數、位元組順序、RFID_ID／Device_ID 字典與各 row group 的
+  第一筆與最後一筆排序鍵 [RFID_ID, EventTime 微秒]
+- {row group}/GUID：以換行分隔的 UTF-8 字串
+- {row group}/RFID_ID、Device_ID：字典索引（int32）
+- {row group}/EventTime、CreateTime：自 1970-01-01 起的微秒數，差分後存成 int64
+"""
+
+import asyncio
+import json
+import os
+import sys
+import zipfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import NamedTuple
+
+from app.models.scan_event import ScanEvent
+
+SEGMENT_SUFFIX = ".scans.zip"
+FORMAT_VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# 區段檔路徑 → (修改時間, 已解析的區段)
+_segment_cache: dict[Path, tuple[int, "_Segment"]] = {}
+
+
+class ArchivedScan(NamedTuple):
+    """封存的刷卡事件。"""
+
+    GUID: str
+    RFID_ID: str
+    Device_ID: str
+    EventTime: datetime
+    CreateTime: datetime
+
+
+def _to_micros(value: datetime) -> int:
+    """時間轉成自 1970-01-01 起的微秒數。"""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value: int) -> datetime:
+    """微秒數轉回時間。"""
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _pack(typecode: str, values: list[int], delta: bool = False) -> bytes:
+    """整數欄位轉成位元組（可先差分）。"""
+    if delta and values:
+        values = [values[0]] + [b - a for a, b in zip(values, values[1:])]
+    return array(typecode, values).tobytes()
+
+
+def _unpack(typecode: str, data: bytes, byteorder: str, delta: bool = False):
+    """位元組還原成整數欄位。"""
+    values = array(typecode)
+    values.frombytes(data)
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return list(accumulate(values)) if delta else values
+
+
+def _month_starts(start: datetime, end: datetime) -> Iterator[date]:
+    """列出時間範圍（含頭尾）涵蓋的每個月份的第一天。"""
+    current = date(start.year, start.month, 1)
+    while current <= end.date():
+        yield current
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+
+
+class _Segment:
+    """已解析 meta 的月份區段檔。"""
+
+    def __init__(self, path: Path) -> None:
+        """讀取 meta.json。"""
+        self.path = path
+        with zipfile.ZipFile(path) as archive:
+            meta = json.loads(archive.read("meta.json"))
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"不支援的區段檔版本：{meta['version']}")
+        self.rows: int = meta["rows"]
+        self.byteorder: str = meta["byteorder"]
+        self.rfids: list[str] = meta["rfids"]
+        self.devices: list[str] = meta["devices"]
+        self.rfid_codes = {rfid_id: code for code, rfid_id in enumerate(self.rfids)}
+        self.firsts = [tuple(group["first"]) for group in meta["row_groups"]]
+        self.lasts = [tuple(group["last"]) for group in meta["row_groups"]]
+
+    def _read_group(self, archive: zipfile.ZipFile, group: int) -> Iterator[tuple]:
+        """解壓縮一個 row group 的所有欄位，逐列產生編碼後的值。"""
+        prefix = f"{group:05d}/"
+        return zip(
+            archive.read(prefix + "GUID").decode().split("\n"),
+            _unpack("i", archive.read(prefix + "RFID_ID"), self.byteorder),
+            _unpack("i", archive.read(prefix + "Device_ID"), self.byteorder),
+            _unpack("q", archive.read(prefix + "EventTime"), self.byteorder, True),
+            _unpack("q", archive.read(prefix + "CreateTime"), self.byteorder, True),
+        )
+
+    def _decode(self, row: tuple) -> ArchivedScan:
+        """把編碼後的列還原。"""
+        guid, rfid_code, device_code, event_time, create_time = row
+        return ArchivedScan(
+            guid,
+            self.rfids[rfid_code],
+            self.devices[device_code],
+            _from_micros(event_time),
+            _from_micros(create_time),
+        )
+
+    def read_employee(
+        self, rfid_id: str, start_time: datetime, end_time: datetime
+    ) -> list[ArchivedScan]:
+        """讀取員工在時間範圍內（含頭尾）的刷卡，只解壓縮涵蓋的 row group。"""
+        code = self.rfid_codes.get(rfid_id)
+        if code is None:
+            return []
+        start, end = _to_micros(start_time), _to_micros(end_time)
+        group = bisect_left(self.lasts, (rfid_id, start))
+        found = []
+        with zipfile.ZipFile(self.path) as archive:
+            while group < len(self.firsts) and self.firsts[group] <= (rfid_id, end):
+                found.extend(
+                    self._decode(row)
+                    for row in self._read_group(archive, group)
+                    if row[1] == code and start <= row[3] <= end
+                )
+                group += 1
+        return found
+
+    def __iter__(self) -> Iterator[ArchivedScan]:
+        """依排序鍵逐列讀取整個區段。"""
+        with zipfile.ZipFile(self.path) as archive:
+            for group in range(len(self.firsts)):
+                for row in self._read_group(archive, group):
+                    yield self._decode(row)
+
+
+class SegmentWriter:
+    """依 (RFID_ID, EventTime, GUID) 順序寫入月份區段檔。
+
+    先寫入暫存檔，close() 時才以 os.replace 原子地取代正式檔，
+    中途失敗不會留下不完整的區段。
+    """
+
+    def __init__(self, path: Path, row_group_size: int) -> None:
+        """開啟暫存檔。"""
+        self.path = path
+        self.row_group_size = row_group_size
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._archive = zipfile.ZipFile(
+            self._tmp_path, "w", compression=zipfile.ZIP_DEFLATED
+        )
+        self.rfids: list[str] = []
+        self._devices: dict[str, int] = {}
+        self._groups: list[dict] = []
+        self._pending: list[tuple] = []
+        self._last_key: tuple | None = None
+        self.rows = 0
+
+    def append(self, scan: ArchivedScan) -> None:
+        """加入一列，必須依排序鍵遞增。"""
+        event_time = _to_micros(scan.EventTime)
+        key = (scan.RFID_ID, event_time, scan.GUID)
+        if self._last_key is not None and key < self._last_key:
+            raise ValueError("刷卡事件必須依 (RFID_ID, EventTime, GUID) 排序")
+        self._last_key = key
+        if not self.rfids or self.rfids[-1] != scan.RFID_ID:
+            self.rfids.append(scan.RFID_ID)
+        device = self._devices.setdefault(scan.Device_ID, len(self._devices))
+        self._pending.append(
+            (
+                scan.GUID,
+                len(self.rfids) - 1,
+                device,
+                event_time,
+                _to_micros(scan.CreateTime),
+            )
+        )
+        self.rows += 1
+        if len(self._pending) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        """把累積的列寫成一個 row group。"""
+        if not self._pending:
+            return
+        guids, rfids, devices, event_times, create_times = zip(*self._pending)
+        prefix = f"{len(self._groups):05d}/"
+        self._archive.writestr(prefix + "GUID", "\n".join(guids).encode())
+        self._archive.writestr(prefix + "RFID_ID", _pack("i", rfids))
+        self._archive.writestr(prefix + "Device_ID", _pack("i", devices))
+        self._archive.writestr(prefix + "EventTime", _pack("q", event_times, True))
+        self._archive.writestr(prefix + "CreateTime", _pack("q", create_times, True))
+        self._groups.append(
+            {
+                "rows": len(guids),
+                "first": [self.rfids[rfids[0]], event_times[0]],
+                "last": [self.rfids[rfids[-1]], event_times[-1]],
+            }
+        )
+        self._pending = []
+
+    def close(self) -> int:
+        """寫入 meta 並取代正式檔，回傳檔案大小。"""
+        self._flush()
+        meta = {
+            "version": FORMAT_VERSION,
+            "rows": self.rows,
+            "byteorder": sys.byteorder,
+            "rfids": self.rfids,
+            "devices": list(self._devices),
+            "row_groups": self._groups,
+        }
+        self._archive.writestr("meta.json", json.dumps(meta, ensure_ascii=False))
+        self._archive.close()
+        with open(self._tmp_path, "rb") as file:
+            os.fsync(file.fileno())
+        os.replace(self._tmp_path, self.path)
+        return self.path.stat().st_size
+
+    def abort(self) -> None:
+        """放棄寫入並刪除暫存檔。"""
+        self._archive.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class ScanArchive:
+    """封存刷卡事件的月份區段檔目錄。"""
+
+    def __init__(self, directory: str | Path) -> None:
+        """初始化（目錄在第一次寫入時才建立）。"""
+        self.directory = Path(directory)
+
+    def segment_path(self, year_month: str) -> Path:
+        """取得月份區段檔的路徑。"""
+        return self.directory / f"{year_month}{SEGMENT_SUFFIX}"
+
+    def months(self) -> list[str]:
+        """列出已封存的年月。"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            path.name.removesuffix(SEGMENT_SUFFIX)
+            for path in self.directory.glob(f"*{SEGMENT_SUFFIX}")
+        )
+
+    def _segment(self, year_month: str) -> _Segment | None:
+        """取得（並快取）月份區段，尚未封存時為 None。"""
+        path = self.segment_path(year_month)
+        try:
+            modified = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = _segment_cache.get(path)
+        if cached is None or cached[0] != modified:
+            cached = _segment_cache[path] = (modified, _Segment(path))
+        return cached[1]
+
+    def iter_month(self, year_month: str) -> Iterator[ArchivedScan]:
+        """依排序鍵逐列讀取月份區段（尚未封存時沒有資料）。"""
+        segment = self._segment(year_month)
+        return iter(segment) if segment is not None else iter(())
+
+    def writer(self, year_month: str, row_group_size: int) -> SegmentWriter:
+        """開啟月份區段的寫入者（完成後取代既有的區段）。"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return SegmentWriter(self.segment_path(year_month), row_group_size)
+
+    def _read_employee(
+        self, rfid_id: str, start_time: datetime, end_time: datetime
+    ) -> list[ArchivedScan]:
+        """同步讀取員工在時間範圍內涵蓋的所有月份區段。"""
+        found = []
+        for month_start in _month_starts(start_time, end_time):
+            segment = self._segment(f"{month_start:%Y-%m}")
+            if segment is not None:
+                found.extend(segment.read_employee(rfid_id, start_time, end_time))
+        return found
+
+    async def get_by_employee_and_time_range(
+        self, rfid_id: str, start_time: datetime, end_time: datetime
+    ) -> list[ScanEvent]:
+        """取得員工在時間範圍內（含頭尾）已封存的刷卡（未綁定 session 的物件）。
+
+        範圍內沒有任何區段檔時不離開事件迴圈；有區段時在執行緒中解壓縮。
+        """
+        if not any(
+            self.segment_path(f"{month_start:%Y-%m}").exists()
+            for month_start in _month_starts(start_time, end_time)
+        ):
+            return []
+        scans = await asyncio.to_thread(
+            self._read_employee, rfid_id, start_time, end_time
+        )
+        return [ScanEvent(**scan._asdict()) for scan in scans]
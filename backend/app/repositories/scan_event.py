@@ -1,12 +1,15 @@
 """刷卡事件資料存取層。"""
 
+from collections.abc import AsyncIterator, Collection
 from datetime import datetime
 
-from sqlalchemy import and_, select
+from sqlalchemy import Row, and_, delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.scan_event import ScanEvent
 from app.repositories.base import BaseRepository
+from app.repositories.scan_archive import ScanArchive
 
 
 class ScanEventRepository(BaseRepository[ScanEvent]):
@@ -15,6 +18,7 @@ class ScanEventRepository(BaseRepository[ScanEvent]):
     def __init__(self, db: AsyncSession):
         """初始化 Repository。"""
         super().__init__(ScanEvent, db)
+        self.archive = ScanArchive(settings.scan_archive_dir)
 
     async def get_by_employee_and_date_range(
         self,
@@ -22,7 +26,10 @@ class ScanEventRepository(BaseRepository[ScanEvent]):
         start_time: datetime,
         end_time: datetime,
     ) -> list[ScanEvent]:
-        """取得員工在指定時間範圍內的刷卡記錄。"""
+        """取得員工在指定時間範圍內的刷卡記錄（含已封存的月份）。
+
+        封存後、刪除線上資料前中斷時，兩邊可能有同一筆事件，以 GUID 去除重複。
+        """
         result = await self.db.execute(
             select(ScanEvent)
             .where(
@@ -34,4 +41,91 @@ class ScanEventRepository(BaseRepository[ScanEvent]):
             )
             .order_by(ScanEvent.EventTime)
         )
-        return list(result.scalars().all())
+        events = list(result.scalars().all())
+        archived = await self.archive.get_by_employee_and_time_range(
+            rfid_id, start_time, end_time
+        )
+        if not archived:
+            return events
+        live_guids = {event.GUID for event in events}
+        events.extend(event for event in archived if event.GUID not in live_guids)
+        events.sort(key=lambda event: event.EventTime)
+        return events
+
+    async def stream_by_time_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        rfid_ids: Collection[str] | None = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[list[Row]]:
+        """依 (RFID_ID, EventTime) 排序分批串流時間範圍內的刷卡（不含 end_time）。
+
+        只取 RFID_ID 與 EventTime，以伺服器端游標每次讀取 batch_size 筆，
+        不一次載入記憶體；逐批而非逐筆 await，避免每列一次 greenlet 切換。
+        """
+        stmt = (
+            select(ScanEvent.RFID_ID, ScanEvent.EventTime)
+            .where(
+                ScanEvent.EventTime >= start_time,
+                ScanEvent.EventTime < end_time,
+            )
+            .order_by(ScanEvent.RFID_ID, ScanEvent.EventTime)
+            .execution_options(yield_per=batch_size)
+        )
+        if rfid_ids is not None:
+            stmt = stmt.where(ScanEvent.RFID_ID.in_(rfid_ids))
+        result = await self.db.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def stream_for_archive(
+        self, start_time: datetime, end_time: datetime, batch_size: int = 5000
+    ) -> AsyncIterator[list[Row]]:
+        """依 (RFID_ID, EventTime, GUID) 排序分批串流時間範圍內的刷卡（封存用）。"""
+        stmt = (
+            select(
+                ScanEvent.GUID,
+                ScanEvent.RFID_ID,
+                ScanEvent.Device_ID,
+                ScanEvent.EventTime,
+                ScanEvent.CreateTime,
+            )
+            .where(ScanEvent.EventTime >= start_time, ScanEvent.EventTime < end_time)
+            .order_by(ScanEvent.RFID_ID, ScanEvent.EventTime, ScanEvent.GUID)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def delete_archived(
+        self,
+        rfid_ids: Collection[str],
+        start_time: datetime,
+        end_time: datetime,
+        created_before: datetime,
+    ) -> int:
+        """刪除已封存的刷卡（不提交交易），回傳刪除筆數。
+
+        依 RFID_ID 走 (RFID_ID, EventTime) 索引；只刪除 created_before 之前
+        寫入的事件，封存期間才寫入的晚到事件留待下次封存。
+        """
+        result = await self.db.execute(
+            delete(ScanEvent)
+            .where(
+                ScanEvent.RFID_ID.in_(list(rfid_ids)),
+                ScanEvent.EventTime >= start_time,
+                ScanEvent.EventTime < end_time,
+                ScanEvent.CreateTime < created_before,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def get_oldest_event_time(self, before: datetime) -> datetime | None:
+        """取得 before 之前最早的刷卡時間（沒有時為 None）。"""
+        result = await self.db.execute(
+            select(func.min(ScanEvent.EventTime)).where(ScanEvent.EventTime < before)
+        )
+        return result.scalar_one()
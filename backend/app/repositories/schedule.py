@@ -1,26 +1,36 @@
 """班表資料存取層。"""
 
+from collections.abc import Collection
+
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.schedule import Schedule
 from app.repositories.base import BaseRepository
+from app.utils.metrics import timed_operation
 
 
 class ScheduleRepository(BaseRepository[Schedule]):
     """班表 Repository。"""
 
+    # 依部門、星期排列（IX_Schedules_Dept_ActiveDay_GUID）；GUID 區分已刪除的舊班表
+    cursor_columns = ("Dept_GUID", "ActiveDay", "GUID")
+
     def __init__(self, db: AsyncSession):
         """初始化 Repository。"""
         super().__init__(Schedule, db)
 
-    async def get_all_active(self, skip: int = 0, limit: int = 100) -> list[Schedule]:
+    async def get_all_active(
+        self, skip: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[Schedule]:
         """取得所有未刪除的班表。"""
         result = await self.db.execute(
-            select(Schedule)
-            .where(Schedule.IsDeleted == False)  # noqa: E712
-            .offset(skip)
-            .limit(limit)
+            self._paginate(
+                select(Schedule).where(Schedule.IsDeleted == False),  # noqa: E712
+                skip,
+                limit,
+                cursor,
+            )
         )
         return list(result.scalars().all())
 
@@ -35,6 +45,23 @@ class ScheduleRepository(BaseRepository[Schedule]):
         result = await self.db.execute(select(Schedule).where(and_(*conditions)))
         return list(result.scalars().all())
 
+    @timed_operation
+    async def get_active_by_departments(
+        self, dept_guids: Collection[str]
+    ) -> list[Schedule]:
+        """一次取得多個部門所有未刪除的班表。"""
+        if not dept_guids:
+            return []
+        result = await self.db.execute(
+            select(Schedule).where(
+                and_(
+                    Schedule.Dept_GUID.in_(dept_guids),
+                    Schedule.IsDeleted == False,  # noqa: E712
+                )
+            )
+        )
+        return list(result.scalars().all())
+
     async def get_by_department_and_day(
         self, dept_guid: str, active_day: int
     ) -> Schedule | None:
@@ -1,9 +1,12 @@
 """API 路由。"""
 
 from app.routers.attendance import router as attendance_router
+from app.routers.attendance_monthly import router as attendance_monthly_router
+from app.routers.dashboard import router as dashboard_router
 from app.routers.departments import router as departments_router
 from app.routers.employees import router as employees_router
 from app.routers.flex_settings import router as flex_settings_router
+from app.routers.rule_simulation import router as rule_simulation_router
 from app.routers.scan import router as scan_router
 from app.routers.schedules import router as schedules_router
 
@@ -13,5 +16,8 @@ __all__ = [
     "schedules_router",
     "flex_settings_router",
     "attendance_router",
+    "attendance_monthly_router",
     "scan_router",
+    "dashboard_router",
+    "rule_simulation_router",
 ]
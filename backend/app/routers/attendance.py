@@ -3,26 +3,54 @@
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db, unit_of_work
 from app.models.attendance import AttendanceDaily
 from app.repositories.attendance import AttendanceRepository
-from app.schemas.attendance import AttendanceDailyResponse, AttendanceDailyUpdate
+from app.repositories.attendance_monthly import (
+    AttendanceMonthlyRepository,
+    year_month_of,
+)
+from app.schemas.attendance import (
+    AttendanceDailyResponse,
+    AttendanceDailyUpdate,
+    AttendanceRecomputeRequest,
+    AttendanceRecomputeResponse,
+)
+from app.services.attendance_export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    stream_attendance_export,
+)
+from app.services.attendance_recompute import (
+    AttendanceRecomputeService,
+    RecomputeResult,
+)
+from app.services.dashboard import dashboard_cache
+from app.utils.fast_json import fast_list_fields, list_response
+from app.utils.pagination import set_next_cursor
 
 router = APIRouter(prefix="/api/attendance-daily", tags=["attendance"])
 
 
 @router.get("", response_model=list[AttendanceDailyResponse])
 async def get_attendance_records(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="上一頁的 X-Next-Cursor 標頭值"),
     work_date: date | None = Query(None, description="篩選指定日期的考勤記錄"),
     rfid_id: str | None = Query(None, description="篩選指定員工的考勤記錄"),
-    db: AsyncSession = Depends(get_db),
-) -> list[AttendanceDaily]:
-    """取得考勤記錄列表。"""
+    db: AsyncSession = Depends(get_read_db),
+) -> list[AttendanceDaily] | Response:
+    """取得考勤記錄列表。
+
+    依日期或員工篩選時回傳完整結果；未篩選時分頁，可用 skip 或 cursor。
+    """
     repo = AttendanceRepository(db)
+    fields = fast_list_fields(AttendanceDailyResponse)
 
     if work_date and rfid_id:
         # 取得特定員工特定日期的記錄
@@ -30,23 +58,64 @@ async def get_attendance_records(
         return [record] if record else []
     elif work_date:
         # 取得特定日期所有記錄
-        return await repo.get_by_date(work_date)
+        records = await repo.get_by_date(work_date, fields)
+        return list_response(response, records, fields)
     elif rfid_id:
         # 取得特定員工所有記錄
         from datetime import timedelta
 
         today = date.today()
         start_date = today - timedelta(days=30)  # 預設最近 30 天
-        return await repo.get_by_employee_date_range(rfid_id, start_date, today)
+        records = await repo.get_by_employee_date_range(
+            rfid_id, start_date, today, fields
+        )
+        return list_response(response, records, fields)
 
     # 取得所有記錄
-    return await repo.get_all(skip=skip, limit=limit)
+    records = await repo.get_all(skip=skip, limit=limit, cursor=cursor, fields=fields)
+    set_next_cursor(response, repo.next_cursor(records, limit))
+    return list_response(response, records, fields)
+
+
+@router.get("/export")
+async def export_attendance_records(
+    start_date: date = Query(..., description="匯出起始日期（含）"),
+    end_date: date = Query(..., description="匯出結束日期（含）"),
+    format: ExportFormat = Query("csv", description="匯出格式：csv 或 ndjson"),
+    dept_guid: str | None = Query(None, description="只匯出指定部門"),
+) -> StreamingResponse:
+    """串流匯出日期區間內的考勤記錄（含員工與部門名稱，供薪資結算）。"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="結束日期不可早於起始日期")
+
+    filename = f"attendance_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream_attendance_export(start_date, end_date, format, dept_guid),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/recompute", response_model=AttendanceRecomputeResponse)
+async def recompute_attendance(
+    request: AttendanceRecomputeRequest,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+) -> RecomputeResult:
+    """由 ScanEvents 重算日期區間內的考勤記錄（只寫入有差異的記錄）。"""
+    service = AttendanceRecomputeService(db, read_db)
+    result = await service.recompute(
+        request.start_date, request.end_date, request.rfid_ids
+    )
+    if result.inserted or result.updated:
+        dashboard_cache.clear()
+    return result
 
 
 @router.get("/{guid}", response_model=AttendanceDailyResponse)
 async def get_attendance_record(
     guid: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> AttendanceDaily:
     """取得單一考勤記錄。"""
     repo = AttendanceRepository(db)
@@ -72,7 +141,14 @@ async def update_attendance_record(
     for key, value in update_data.items():
         setattr(record, key, value)
 
-    return await repo.update(record)
+    # 每日記錄與月彙總在同一交易內更新
+    async with unit_of_work(db):
+        record = await repo.update(record)
+        await AttendanceMonthlyRepository(db).refresh(
+            year_month_of(record.WorkDate), [record.RFID_ID]
+        )
+    dashboard_cache.invalidate_date(record.WorkDate)
+    return record
 
 
 @router.delete("/{guid}", status_code=status.HTTP_204_NO_CONTENT)
@@ -86,5 +162,10 @@ async def delete_attendance_record(
     if not record:
         raise HTTPException(status_code=404, detail="考勤記錄不存在")
 
-    await repo.delete(record)
+    async with unit_of_work(db):
+        await repo.delete(record)
+        await AttendanceMonthlyRepository(db).refresh(
+            year_month_of(record.WorkDate), [record.RFID_ID]
+        )
+    dashboard_cache.invalidate_date(record.WorkDate)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,47 @@
+"""每月考勤彙總 API 路由。"""
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.models.attendance_monthly import AttendanceMonthly
+from app.repositories.attendance_monthly import (
+    YEAR_MONTH_PATTERN,
+    AttendanceMonthlyRepository,
+)
+from app.schemas.attendance_monthly import AttendanceMonthlyResponse
+from app.utils.pagination import set_next_cursor
+
+router = APIRouter(prefix="/api/attendance-monthly", tags=["attendance"])
+
+
+@router.get("", response_model=list[AttendanceMonthlyResponse])
+async def get_monthly_summaries(
+    response: Response,
+    year_month: str = Query(..., pattern=YEAR_MONTH_PATTERN, description="YYYY-MM"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = Query(None, description="上一頁的 X-Next-Cursor 標頭值"),
+    db: AsyncSession = Depends(get_read_db),
+) -> list[AttendanceMonthly]:
+    """取得指定月份所有員工的考勤彙總。"""
+    repo = AttendanceMonthlyRepository(db)
+    summaries = await repo.get_by_month(
+        year_month, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, repo.next_cursor(summaries, limit))
+    return summaries
+
+
+@router.get("/{rfid_id}/{year_month}", response_model=AttendanceMonthlyResponse)
+async def get_monthly_summary(
+    rfid_id: str,
+    year_month: str = Path(..., pattern=YEAR_MONTH_PATTERN, description="YYYY-MM"),
+    db: AsyncSession = Depends(get_read_db),
+) -> AttendanceMonthly:
+    """取得員工指定月份的考勤彙總。"""
+    repo = AttendanceMonthlyRepository(db)
+    summary = await repo.get_by_employee_and_month(rfid_id, year_month)
+    if not summary:
+        raise HTTPException(status_code=404, detail="考勤彙總不存在")
+    return summary
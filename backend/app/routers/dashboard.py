@@ -0,0 +1,38 @@
+"""出勤看板 API 路由。"""
+
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.schemas.dashboard import DashboardResponse
+from app.services.dashboard import Dashboard, dashboard_cache
+
+router = APIRouter(tags=["dashboard"])
+
+
+@router.get("/api/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    work_date: date | None = Query(
+        None, alias="date", description="預設為目前的工作日（UTC，依 DayCutoff）"
+    ),
+) -> Dashboard:
+    """取得全公司當日出勤看板（各部門人數與合計）。"""
+    if work_date is None:
+        work_date = await dashboard_cache.current_work_date(None)
+    return await dashboard_cache.get(work_date, None)
+
+
+@router.get("/api/departments/{guid}/dashboard", response_model=DashboardResponse)
+async def get_department_dashboard(
+    guid: str,
+    work_date: date | None = Query(
+        None, alias="date", description="預設為目前的工作日（UTC，依 DayCutoff）"
+    ),
+) -> Dashboard:
+    """取得部門當日出勤看板。"""
+    if work_date is None:
+        work_date = await dashboard_cache.current_work_date(guid)
+    dashboard = await dashboard_cache.get(work_date, guid)
+    if dashboard is None:
+        raise HTTPException(status_code=404, detail="部門不存在")
+    return dashboard
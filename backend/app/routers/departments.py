@@ -1,9 +1,9 @@
 """部門 API 路由。"""
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.department import Department
 from app.repositories.department import DepartmentRepository
 from app.schemas.department import (
@@ -11,26 +11,36 @@ from app.schemas.department import (
     DepartmentResponse,
     DepartmentUpdate,
 )
-
-router = APIRouter(prefix="/api/departments", tags=["departments"])
+from app.services.rule_cache import rule_cache
+from app.utils.http_cache import cached_route, response_cache
+from app.utils.pagination import set_next_cursor
+
+router = APIRouter(
+    prefix="/api/departments",
+    tags=["departments"],
+    route_class=cached_route(Department.__tablename__, DepartmentRepository),
+)
 
 
 @router.get("", response_model=list[DepartmentResponse])
 async def get_departments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None, description="上一頁的 X-Next-Cursor 標頭值"),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[Department]:
     """取得部門列表。"""
     repo = DepartmentRepository(db)
-    departments = await repo.get_all(skip=skip, limit=limit)
+    departments = await repo.get_all(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, repo.next_cursor(departments, limit))
     return departments
 
 
 @router.get("/{guid}", response_model=DepartmentResponse)
 async def get_department(
     guid: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Department:
     """取得單一部門。"""
     repo = DepartmentRepository(db)
@@ -54,7 +64,9 @@ async def create_department(
         raise HTTPException(status_code=409, detail="部門代碼已存在")
 
     department = Department(**data.model_dump())
-    return await repo.create(department)
+    department = await repo.create(department)
+    response_cache.bump(Department.__tablename__)
+    return department
 
 
 @router.put("/{guid}", response_model=DepartmentResponse)
@@ -73,7 +85,9 @@ async def update_department(
     for key, value in update_data.items():
         setattr(department, key, value)
 
-    return await repo.update(department)
+    department = await repo.update(department)
+    response_cache.bump(Department.__tablename__)
+    return department
 
 
 @router.delete("/{guid}", status_code=status.HTTP_204_NO_CONTENT)
@@ -88,4 +102,6 @@ async def delete_department(
         raise HTTPException(status_code=404, detail="部門不存在")
 
     await repo.delete(department)
+    rule_cache.invalidate_department(guid)
+    response_cache.bump(Department.__tablename__)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
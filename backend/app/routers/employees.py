@@ -1,37 +1,76 @@
 """員工 API 路由。"""
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.employee import Employee
 from app.repositories.department import DepartmentRepository
 from app.repositories.employee import EmployeeRepository
-from app.schemas.employee import EmployeeCreate, EmployeeResponse, EmployeeUpdate
-
-router = APIRouter(prefix="/api/employees", tags=["employees"])
+from app.schemas.employee import (
+    EmployeeCreate,
+    EmployeeImportResponse,
+    EmployeeResponse,
+    EmployeeUpdate,
+)
+from app.services.employee_import import (
+    EmployeeImportError,
+    EmployeeImportService,
+    ImportResult,
+    parse_import_file,
+)
+from app.services.rfid_filter import known_rfids
+from app.services.rule_cache import rule_cache
+from app.utils.fast_json import fast_list_fields, list_response
+from app.utils.http_cache import cached_route, response_cache
+from app.utils.pagination import set_next_cursor
+
+router = APIRouter(
+    prefix="/api/employees",
+    tags=["employees"],
+    route_class=cached_route(Employee.__tablename__, EmployeeRepository),
+)
+
+IMPORT_CONTENT_TYPES = {"text/csv": "csv", "application/json": "json"}
 
 
 @router.get("", response_model=list[EmployeeResponse])
 async def get_employees(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="上一頁的 X-Next-Cursor 標頭值"),
     active_only: bool = False,
-    db: AsyncSession = Depends(get_db),
-) -> list[Employee]:
+    db: AsyncSession = Depends(get_read_db),
+) -> list[Employee] | Response:
     """取得員工列表。"""
     repo = EmployeeRepository(db)
+    fields = fast_list_fields(EmployeeResponse)
     if active_only:
-        employees = await repo.get_active_employees(skip=skip, limit=limit)
+        employees = await repo.get_active_employees(
+            skip=skip, limit=limit, cursor=cursor, fields=fields
+        )
     else:
-        employees = await repo.get_all(skip=skip, limit=limit)
-    return employees
+        employees = await repo.get_all(
+            skip=skip, limit=limit, cursor=cursor, fields=fields
+        )
+    set_next_cursor(response, repo.next_cursor(employees, limit))
+    return list_response(response, employees, fields)
 
 
 @router.get("/{rfid_id}", response_model=EmployeeResponse)
 async def get_employee(
     rfid_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Employee:
     """取得單一員工。"""
     repo = EmployeeRepository(db)
@@ -61,7 +100,67 @@ async def create_employee(
         raise HTTPException(status_code=400, detail="部門不存在")
 
     employee = Employee(**data.model_dump())
-    return await emp_repo.create(employee)
+    employee = await emp_repo.create(employee)
+    rule_cache.invalidate_employee(employee.RFID_ID)
+    response_cache.bump(Employee.__tablename__)
+    known_rfids.add(employee.RFID_ID)
+    return employee
+
+
+@router.post(
+    "/import",
+    response_model=EmployeeImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        200: {"description": "dry_run 驗證結果"},
+        422: {"description": "有資料驗證失敗，未寫入任何員工"},
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/json": {
+                    "schema": {"type": "array", "items": {"type": "object"}}
+                },
+            },
+        }
+    },
+)
+async def import_employees(
+    request: Request,
+    response: Response,
+    dry_run: bool = Query(False, description="只驗證、不寫入"),
+    db: AsyncSession = Depends(get_db),
+) -> ImportResult:
+    """批次匯入員工（CSV 需含標題列，JSON 為員工物件陣列）。
+
+    任一筆驗證失敗時不寫入任何資料，回傳 422 與每筆的錯誤。
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    import_format = IMPORT_CONTENT_TYPES.get(content_type.lower())
+    if import_format is None:
+        raise HTTPException(
+            status_code=415, detail="僅支援 text/csv 或 application/json"
+        )
+    try:
+        rows = parse_import_file(await request.body(), import_format)
+    except EmployeeImportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    try:
+        result = await EmployeeImportService(db).import_rows(rows, dry_run)
+    except IntegrityError as exc:
+        raise HTTPException(
+            status_code=409, detail="匯入期間有 RFID ID 已被建立，請重新匯入"
+        ) from exc
+    if result.imported:
+        response_cache.bump(Employee.__tablename__)
+    if result.errors:
+        response.status_code = 422
+    elif dry_run:
+        response.status_code = status.HTTP_200_OK
+    return result
 
 
 @router.put("/{rfid_id}", response_model=EmployeeResponse)
@@ -89,7 +188,10 @@ async def update_employee(
     for key, value in update_data.items():
         setattr(employee, key, value)
 
-    return await emp_repo.update(employee)
+    employee = await emp_repo.update(employee)
+    rule_cache.invalidate_employee(rfid_id)
+    response_cache.bump(Employee.__tablename__)
+    return employee
 
 
 @router.delete("/{rfid_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -104,4 +206,7 @@ async def delete_employee(
         raise HTTPException(status_code=404, detail="員工不存在")
 
     await repo.delete(employee)
+    rule_cache.invalidate_employee(rfid_id)
+    response_cache.bump(Employee.__tablename__)
+    known_rfids.discard(rfid_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
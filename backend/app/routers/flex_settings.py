@@ -1,9 +1,9 @@
 """彈性設定 API 路由。"""
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db, unit_of_work
 from app.models.flex_setting import FlexSetting
 from app.repositories.department import DepartmentRepository
 from app.repositories.flex_setting import FlexSettingRepository
@@ -12,30 +12,41 @@ from app.schemas.flex_setting import (
     FlexSettingResponse,
     FlexSettingUpdate,
 )
-
-router = APIRouter(prefix="/api/flex-settings", tags=["flex-settings"])
+from app.services.config_publisher import RequiredConfigPublisher
+from app.services.rule_cache import rule_cache
+from app.utils.http_cache import cached_route, response_cache
+from app.utils.pagination import set_next_cursor
+
+router = APIRouter(
+    prefix="/api/flex-settings",
+    tags=["flex-settings"],
+    route_class=cached_route(FlexSetting.__tablename__, FlexSettingRepository),
+)
 
 
 @router.get("", response_model=list[FlexSettingResponse])
 async def get_flex_settings(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="上一頁的 X-Next-Cursor 標頭值"),
     include_deleted: bool = False,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[FlexSetting]:
     """取得彈性設定列表。"""
     repo = FlexSettingRepository(db)
     if include_deleted:
-        flex_settings = await repo.get_all(skip=skip, limit=limit)
+        flex_settings = await repo.get_all(skip=skip, limit=limit, cursor=cursor)
     else:
-        flex_settings = await repo.get_all_active(skip=skip, limit=limit)
+        flex_settings = await repo.get_all_active(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, repo.next_cursor(flex_settings, limit))
     return flex_settings
 
 
 @router.get("/{guid}", response_model=FlexSettingResponse)
 async def get_flex_setting(
     guid: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> FlexSetting:
     """取得單一彈性設定。"""
     repo = FlexSettingRepository(db)
@@ -70,7 +81,12 @@ async def create_flex_setting(
         )
 
     flex_setting = FlexSetting(**data.model_dump())
-    return await flex_repo.create(flex_setting)
+    async with unit_of_work(db):
+        flex_setting = await flex_repo.create(flex_setting)
+        await RequiredConfigPublisher(db).publish(flex_setting.Dept_GUID)
+    rule_cache.invalidate_department(flex_setting.Dept_GUID)
+    response_cache.bump(FlexSetting.__tablename__)
+    return flex_setting
 
 
 @router.put("/{guid}", response_model=FlexSettingResponse)
@@ -92,7 +108,12 @@ async def update_flex_setting(
     for key, value in update_data.items():
         setattr(flex_setting, key, value)
 
-    return await repo.update(flex_setting)
+    async with unit_of_work(db):
+        flex_setting = await repo.update(flex_setting)
+        await RequiredConfigPublisher(db).publish(flex_setting.Dept_GUID)
+    rule_cache.invalidate_department(flex_setting.Dept_GUID)
+    response_cache.bump(FlexSetting.__tablename__)
+    return flex_setting
 
 
 @router.delete("/{guid}", status_code=status.HTTP_204_NO_CONTENT)
@@ -110,5 +131,9 @@ async def delete_flex_setting(
     if flex_setting.IsDeleted:
         raise HTTPException(status_code=400, detail="彈性設定已被刪除")
 
-    await repo.soft_delete(flex_setting, deleted_by)
+    async with unit_of_work(db):
+        await repo.soft_delete(flex_setting, deleted_by)
+        await RequiredConfigPublisher(db).publish(flex_setting.Dept_GUID)
+    rule_cache.invalidate_department(flex_setting.Dept_GUID)
+    response_cache.bump(FlexSetting.__tablename__)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
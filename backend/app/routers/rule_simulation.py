@@ -0,0 +1,28 @@
+"""考勤規則模擬 API 路由。"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.repositories.department import DepartmentRepository
+from app.schemas.rule_simulation import RuleSimulationRequest, RuleSimulationResponse
+from app.services.rule_simulation import RuleSimulationService, SimulationResult
+
+router = APIRouter(tags=["rule-simulation"])
+
+
+@router.post(
+    "/api/departments/{guid}/rule-simulation",
+    response_model=RuleSimulationResponse,
+)
+async def simulate_rules(
+    guid: str,
+    request: RuleSimulationRequest,
+    db: AsyncSession = Depends(get_read_db),
+) -> SimulationResult:
+    """以部門歷史考勤試算候選規則的狀態分布與每位員工的差異（不寫入資料）。"""
+    if await DepartmentRepository(db).get_by_id(guid) is None:
+        raise HTTPException(status_code=404, detail="部門不存在")
+    return await RuleSimulationService(db).simulate(
+        guid, request.start_date, request.end_date, request.candidates
+    )
@@ -1,20 +1,73 @@
 """刷卡 API 路由。"""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.schemas.scan import ScanRequest, ScanResponse
-from app.services.scan import ScanService
+from app.config import settings
+from app.database import get_db, is_database_busy
+from app.schemas.scan import ScanBatchRequest, ScanRequest, ScanResponse
+from app.services.rfid_filter import known_rfids
+from app.services.rule_cache import rule_cache
+from app.services.scan import ScanService, scan_locks
+from app.services.scan_debounce import scan_debouncer
+from app.services.scan_writer import ScanQueueFullError, scan_writer
 
 router = APIRouter(prefix="/api", tags=["scan"])
 
 
+def _database_busy() -> HTTPException:
+    """寫入連線忙碌（長時間作業占用中）時的 503 回應。"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="資料庫忙碌中，請稍後重試",
+        headers={"Retry-After": str(settings.database_busy_retry_after_seconds)},
+    )
+
+
 @router.post("/scan", response_model=ScanResponse)
 async def process_scan(
     request: ScanRequest,
     db: AsyncSession = Depends(get_db),
 ) -> ScanResponse:
     """處理 RFID 刷卡事件（核心打卡 API）。"""
+    service = ScanService(db, writer=scan_writer)
+    try:
+        return await service.process_scan(request)
+    except ScanQueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="刷卡寫入佇列已滿，請稍後重試",
+            headers={"Retry-After": str(settings.scan_queue_retry_after_seconds)},
+        ) from None
+    except SQLAlchemyError as exc:
+        if not is_database_busy(exc):
+            raise
+        raise _database_busy() from None
+
+
+@router.post("/scan/batch", response_model=list[ScanResponse])
+async def process_scan_batch(
+    request: ScanBatchRequest,
+    db: AsyncSession = Depends(get_db),
+) -> list[ScanResponse]:
+    """批次處理讀卡機緩衝的刷卡事件，回應順序與請求相同。"""
     service = ScanService(db)
-    return await service.process_scan(request)
+    try:
+        return await service.process_batch(request.scans)
+    except SQLAlchemyError as exc:
+        if not is_database_busy(exc):
+            raise
+        raise _database_busy() from None
+
+
+@router.get("/scan/stats")
+async def get_scan_stats() -> dict:
+    """取得刷卡熱路徑的快取、群組提交、鎖與去彈跳統計。"""
+    return {
+        "rule_cache": rule_cache.stats(),
+        "writer": scan_writer.stats(),
+        "locks": scan_locks.stats(),
+        "debounce": scan_debouncer.stats(),
+        "rfid_filter": known_rfids.stats(),
+    }
@@ -1,37 +1,48 @@
 """班表 API 路由。"""
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db, unit_of_work
 from app.models.schedule import Schedule
 from app.repositories.department import DepartmentRepository
 from app.repositories.schedule import ScheduleRepository
 from app.schemas.schedule import ScheduleCreate, ScheduleResponse, ScheduleUpdate
+from app.services.config_publisher import RequiredConfigPublisher
+from app.services.rule_cache import rule_cache
+from app.utils.http_cache import cached_route, response_cache
+from app.utils.pagination import set_next_cursor
 
-router = APIRouter(prefix="/api/schedules", tags=["schedules"])
+router = APIRouter(
+    prefix="/api/schedules",
+    tags=["schedules"],
+    route_class=cached_route(Schedule.__tablename__, ScheduleRepository),
+)
 
 
 @router.get("", response_model=list[ScheduleResponse])
 async def get_schedules(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="上一頁的 X-Next-Cursor 標頭值"),
     include_deleted: bool = False,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[Schedule]:
     """取得班表列表。"""
     repo = ScheduleRepository(db)
     if include_deleted:
-        schedules = await repo.get_all(skip=skip, limit=limit)
+        schedules = await repo.get_all(skip=skip, limit=limit, cursor=cursor)
     else:
-        schedules = await repo.get_all_active(skip=skip, limit=limit)
+        schedules = await repo.get_all_active(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, repo.next_cursor(schedules, limit))
     return schedules
 
 
 @router.get("/{guid}", response_model=ScheduleResponse)
 async def get_schedule(
     guid: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Schedule:
     """取得單一班表。"""
     repo = ScheduleRepository(db)
@@ -66,7 +77,12 @@ async def create_schedule(
         )
 
     schedule = Schedule(**data.model_dump())
-    return await schedule_repo.create(schedule)
+    async with unit_of_work(db):
+        schedule = await schedule_repo.create(schedule)
+        await RequiredConfigPublisher(db).publish(schedule.Dept_GUID)
+    rule_cache.invalidate_department(schedule.Dept_GUID)
+    response_cache.bump(Schedule.__tablename__)
+    return schedule
 
 
 @router.put("/{guid}", response_model=ScheduleResponse)
@@ -100,7 +116,12 @@ async def update_schedule(
     for key, value in update_data.items():
         setattr(schedule, key, value)
 
-    return await repo.update(schedule)
+    async with unit_of_work(db):
+        schedule = await repo.update(schedule)
+        await RequiredConfigPublisher(db).publish(schedule.Dept_GUID)
+    rule_cache.invalidate_department(schedule.Dept_GUID)
+    response_cache.bump(Schedule.__tablename__)
+    return schedule
 
 
 @router.delete("/{guid}", status_code=status.HTTP_204_NO_CONTENT)
@@ -118,5 +139,9 @@ async def delete_schedule(
     if schedule.IsDeleted:
         raise HTTPException(status_code=400, detail="班表已被刪除")
 
-    await repo.soft_delete(schedule, deleted_by)
+    async with unit_of_work(db):
+        await repo.soft_delete(schedule, deleted_by)
+        await RequiredConfigPublisher(db).publish(schedule.Dept_GUID)
+    rule_cache.invalidate_department(schedule.Dept_GUID)
+    response_cache.bump(Schedule.__tablename__)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -4,19 +4,41 @@ from app.schemas.attendance import (
     AttendanceDailyCreate,
     AttendanceDailyResponse,
     AttendanceDailyUpdate,
+    AttendanceRecomputeRequest,
+    AttendanceRecomputeResponse,
+)
+from app.schemas.attendance_monthly import AttendanceMonthlyResponse
+from app.schemas.dashboard import (
+    AttendanceCountsResponse,
+    DashboardResponse,
+    DepartmentCountsResponse,
 )
 from app.schemas.department import (
     DepartmentCreate,
     DepartmentResponse,
     DepartmentUpdate,
 )
-from app.schemas.employee import EmployeeCreate, EmployeeResponse, EmployeeUpdate
+from app.schemas.employee import (
+    EmployeeCreate,
+    EmployeeImportResponse,
+    EmployeeImportRowError,
+    EmployeeResponse,
+    EmployeeUpdate,
+)
 from app.schemas.flex_setting import (
     FlexSettingCreate,
     FlexSettingResponse,
     FlexSettingUpdate,
 )
-from app.schemas.scan import ScanRequest, ScanResponse
+from app.schemas.rule_simulation import (
+    CandidateResultResponse,
+    EmployeeDeltaResponse,
+    RuleCandidate,
+    RuleSimulationRequest,
+    RuleSimulationResponse,
+    StatusCountsResponse,
+)
+from app.schemas.scan import ScanBatchRequest, ScanRequest, ScanResponse
 from app.schemas.schedule import ScheduleCreate, ScheduleResponse, ScheduleUpdate
 
 __all__ = [
@@ -26,6 +48,8 @@ __all__ = [
     "EmployeeCreate",
     "EmployeeUpdate",
     "EmployeeResponse",
+    "EmployeeImportRowError",
+    "EmployeeImportResponse",
     "ScheduleCreate",
     "ScheduleUpdate",
     "ScheduleResponse",
@@ -35,6 +59,19 @@ __all__ = [
     "AttendanceDailyCreate",
     "AttendanceDailyUpdate",
     "AttendanceDailyResponse",
+    "AttendanceRecomputeRequest",
+    "AttendanceRecomputeResponse",
+    "AttendanceMonthlyResponse",
+    "AttendanceCountsResponse",
+    "DepartmentCountsResponse",
+    "DashboardResponse",
+    "RuleCandidate",
+    "RuleSimulationRequest",
+    "RuleSimulationResponse",
+    "StatusCountsResponse",
+    "EmployeeDeltaResponse",
+    "CandidateResultResponse",
     "ScanRequest",
+    "ScanBatchRequest",
     "ScanResponse",
 ]
@@ -2,7 +2,7 @@
 
 from datetime import date, datetime
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 
 
 class AttendanceDailyBase(BaseModel):
@@ -58,3 +58,36 @@ class AttendanceDailyResponse(AttendanceDailyBase):
     ExceptionFlags: str | None = None
     CreateTime: datetime
     UpdateTime: datetime
+
+
+class AttendanceRecomputeRequest(BaseModel):
+    """考勤重算請求 schema。"""
+
+    start_date: date
+    end_date: date
+    rfid_ids: list[str] | None = None  # 未指定時重算所有員工
+
+    @model_validator(mode="after")
+    def validate_date_range(self) -> "AttendanceRecomputeRequest":
+        """驗證日期區間必須在 1-366 天之間。"""
+        days = (self.end_date - self.start_date).days + 1
+        if not 1 <= days <= 366:
+            raise ValueError("date range must span between 1 and 366 days")
+        return self
+
+
+class AttendanceRecomputeResponse(BaseModel):
+    """考勤重算結果 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    start_date: date
+    end_date: date
+    scanned_events: int
+    attendance_days: int
+    updated: int
+    inserted: int
+    unchanged: int
+    live_rule_days: int
+    unresolved: int
+    elapsed_ms: float
@@ -0,0 +1,24 @@
+"""每月考勤彙總 Pydantic schemas。"""
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AttendanceMonthlyResponse(BaseModel):
+    """每月考勤彙總回應 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    RFID_ID: str
+    YearMonth: str
+    WorkedDays: int
+    AbsentDays: int
+    NormalInCount: int
+    FlexInCount: int
+    LateInCount: int
+    NormalOutCount: int
+    EarlyOutCount: int
+    MissingOutCount: int
+    WorkedMinutes: int
+    UpdateTime: datetime
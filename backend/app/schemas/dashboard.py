@@ -0,0 +1,39 @@
+"""出勤看板 Pydantic schemas。"""
+
+from datetime import date, datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AttendanceCountsResponse(BaseModel):
+    """當日出勤人數 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    employees: int  # 在職員工
+    present: int  # 已打上班卡
+    absent: int  # 尚未打上班卡
+    normal: int
+    flex: int
+    late: int
+    early: int
+    missing: int  # 已上班、尚無下班卡
+
+
+class DepartmentCountsResponse(AttendanceCountsResponse):
+    """部門當日出勤人數 schema。"""
+
+    Dept_GUID: str
+    DeptName: str
+
+
+class DashboardResponse(BaseModel):
+    """出勤看板回應 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    work_date: date
+    dept_guid: str | None = None
+    generated_at: datetime
+    totals: AttendanceCountsResponse
+    departments: list[DepartmentCountsResponse]
@@ -37,3 +37,26 @@ class EmployeeResponse(EmployeeBase):
 
     CreateTime: datetime
     UpdateTime: datetime
+
+
+class EmployeeImportRowError(BaseModel):
+    """批次匯入單列錯誤 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    row: int  # 第幾筆資料（從 1 起算，CSV 不含標題列）
+    RFID_ID: str | None = None
+    errors: list[str]
+
+
+class EmployeeImportResponse(BaseModel):
+    """批次匯入結果 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    dry_run: bool
+    total: int
+    valid: int
+    imported: int
+    errors: list[EmployeeImportRowError]
+    elapsed_ms: float
@@ -0,0 +1,89 @@
+"""考勤規則模擬 Pydantic schemas。"""
+
+from datetime import date, time
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+class RuleCandidate(BaseModel):
+    """候選規則 schema，未指定的欄位沿用每筆記錄鎖定的規則版本。"""
+
+    name: str | None = None
+    CheckInNeedBefore: time | None = None
+    FlexMinutes: int | None = None
+    CheckNeedOutAfter: time | None = None
+
+    @field_validator("FlexMinutes")
+    @classmethod
+    def validate_flex_minutes(cls, v: int | None) -> int | None:
+        """驗證 FlexMinutes 必須為非負數。"""
+        if v is not None and v < 0:
+            raise ValueError("FlexMinutes must be non-negative")
+        return v
+
+
+class RuleSimulationRequest(BaseModel):
+    """規則模擬請求 schema。"""
+
+    start_date: date
+    end_date: date
+    candidates: list[RuleCandidate] = Field(min_length=1, max_length=10)
+
+    @model_validator(mode="after")
+    def validate_date_range(self) -> "RuleSimulationRequest":
+        """驗證日期區間必須在 1-366 天之間。"""
+        days = (self.end_date - self.start_date).days + 1
+        if not 1 <= days <= 366:
+            raise ValueError("date range must span between 1 and 366 days")
+        return self
+
+
+class StatusCountsResponse(BaseModel):
+    """狀態分布 schema（天數）。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    normal: int
+    flex: int
+    late: int
+    early: int
+    missing: int  # 沒有下班卡
+
+
+class EmployeeDeltaResponse(BaseModel):
+    """員工狀態天數差異 schema（候選規則減目前）。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    RFID_ID: str
+    flex: int
+    late: int
+    early: int
+
+
+class CandidateResultResponse(BaseModel):
+    """候選規則模擬結果 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    counts: StatusCountsResponse
+    changed_days: int  # 上班或下班狀態改變的天數
+    employees: list[EmployeeDeltaResponse]  # 只列出有差異的員工
+
+
+class RuleSimulationResponse(BaseModel):
+    """規則模擬回應 schema。"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    dept_guid: str
+    start_date: date
+    end_date: date
+    attendance_days: int
+    live_rule_days: int  # 沒有規則版本、以目前班表試算的天數
+    skipped_days: int  # 沒有規則版本也沒有班表、未列入試算的天數
+    employees: int
+    current: StatusCountsResponse
+    candidates: list[CandidateResultResponse]
+    elapsed_ms: float
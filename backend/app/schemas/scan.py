@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class ScanRequest(BaseModel):
@@ -13,6 +13,20 @@ class ScanRequest(BaseModel):
     event_time: datetime | None = None  # 如果為 None，使用當前時間
 
 
+class ScanBatchRequest(BaseModel):
+    """批次刷卡請求 schema。"""
+
+    scans: list[ScanRequest]
+
+    @field_validator("scans")
+    @classmethod
+    def validate_scans(cls, v: list[ScanRequest]) -> list[ScanRequest]:
+        """驗證批次筆數必須在 1-1000 之間。"""
+        if not 1 <= len(v) <= 1000:
+            raise ValueError("scans must contain between 1 and 1000 items")
+        return v
+
+
 class ScanResponse(BaseModel):
     """刷卡回應 schema。"""
 
@@ -20,6 +34,6 @@ class ScanResponse(BaseModel):
     message: str
     employee_name: str | None = None
     work_date: str | None = None
-    scan_type: str | None = None  # "clock_in" or "clock_out"
+    scan_type: str | None = None  # "clock_in", "clock_out" or "duplicate"
     check_in_status: int | None = None
     check_out_status: int | None = None
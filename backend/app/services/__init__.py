@@ -1,5 +1,53 @@
 """業務邏輯層。"""
 
-from app.services.scan import ScanService
+from app.services.attendance_export import stream_attendance_export
+from app.services.attendance_recompute import (
+    AttendanceRecomputeService,
+    RecomputeResult,
+)
+from app.services.config_publisher import RequiredConfigPublisher
+from app.services.dashboard import DashboardCache, dashboard_cache
+from app.services.day_close import (
+    DayCloseResult,
+    DayCloseScheduler,
+    DayCloseService,
+    day_close_scheduler,
+)
+from app.services.employee_import import EmployeeImportService, ImportResult
+from app.services.rfid_filter import KnownRfidFilter, known_rfids
+from app.services.rule_cache import RuleCache, rule_cache
+from app.services.rule_simulation import RuleSimulationService, SimulationResult
+from app.services.scan import PendingScan, ScanService
+from app.services.scan_debounce import ScanDebouncer, scan_debouncer
+from app.services.scan_retention import ArchiveResult, ScanRetentionService
+from app.services.scan_writer import ScanQueueFullError, ScanWriter, scan_writer
 
-__all__ = ["ScanService"]
+__all__ = [
+    "ScanService",
+    "AttendanceRecomputeService",
+    "RecomputeResult",
+    "stream_attendance_export",
+    "PendingScan",
+    "RequiredConfigPublisher",
+    "RuleCache",
+    "rule_cache",
+    "RuleSimulationService",
+    "SimulationResult",
+    "DashboardCache",
+    "dashboard_cache",
+    "DayCloseService",
+    "DayCloseResult",
+    "DayCloseScheduler",
+    "day_close_scheduler",
+    "EmployeeImportService",
+    "ImportResult",
+    "KnownRfidFilter",
+    "known_rfids",
+    "ScanRetentionService",
+    "ArchiveResult",
+    "ScanDebouncer",
+    "scan_debouncer",
+    "ScanWriter",
+    "ScanQueueFullError",
+    "scan_writer",
+]
@@ -0,0 +1,90 @@
+"""考勤匯出（薪資結算用）。
+
+以伺服器端游標分批讀取 JOIN 好員工與部門名稱的考勤列，每批格式化成
+CSV 或 NDJSON 後立即送出，不建立 ORM 物件、也不經過 Pydantic 驗證；
+同時只有一批資料在記憶體中，整月或整年的匯出記憶體用量相同。
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import date
+from typing import Literal
+
+from sqlalchemy import Row
+
+from app.database import read_session
+from app.repositories.attendance import AttendanceRepository
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_COLUMNS = (
+    "WorkDate",
+    "RFID_ID",
+    "EmpCode",
+    "Name",
+    "DeptCode",
+    "DeptName",
+    "FirstInTime",
+    "LastOutTime",
+    "CheckInStatus",
+    "CheckOutStatus",
+    "ExceptionFlags",
+)
+
+MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _format_csv(rows: Sequence[Row]) -> str:
+    """把一批考勤列轉成 CSV 文字。"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if hasattr(value, "isoformat") else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def _format_ndjson(rows: Sequence[Row]) -> str:
+    """把一批考勤列轉成每行一個 JSON 物件的文字。"""
+    return "".join(
+        json.dumps(
+            dict(zip(EXPORT_COLUMNS, row)),
+            ensure_ascii=False,
+            default=lambda value: value.isoformat(),
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+_FORMATTERS: dict[str, Callable[[Sequence[Row]], str]] = {
+    "csv": _format_csv,
+    "ndjson": _format_ndjson,
+}
+
+
+async def stream_attendance_export(
+    start_date: date,
+    end_date: date,
+    export_format: ExportFormat,
+    dept_guid: str | None = None,
+) -> AsyncIterator[bytes]:
+    """逐批產生匯出內容。
+
+    回應開始傳送後請求的相依 session 可能已關閉，因此自行開啟唯讀 session，
+    並在串流結束（或用戶端中斷）時關閉。CSV 開頭加上 UTF-8 BOM 與標題列，
+    讓 Excel 正確辨識中文。
+    """
+    formatter = _FORMATTERS[export_format]
+    if export_format == "csv":
+        yield ("\ufeff" + ",".join(EXPORT_COLUMNS) + "\r\n").encode()
+
+    async with read_session() as db:
+        repo = AttendanceRepository(db)
+        async for rows in repo.stream_export(start_date, end_date, dept_guid):
+            yield formatter(rows).encode()
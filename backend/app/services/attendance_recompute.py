@@ -0,0 +1,374 @@
+"""由 ScanEvents 重算 AttendanceDaily。
+
+離線的讀卡機會延遲且不依順序上傳刷卡，刷卡 API 以先到者為上班卡，
+較早的刷卡晚到時結果就會錯誤。重算依 (RFID_ID, EventTime) 串流刷卡，
+以鎖定的規則版本（尚未鎖定時取當日有效版本）算出最早／最晚刷卡與狀態，
+只批次更新有差異的記錄並補上缺少的記錄；區間內沒有刷卡的既有記錄不變動。
+沒有任何規則版本涵蓋的日期（規則版本上線前的歷史資料）與刷卡 API 相同，
+改以部門目前的班表與彈性設定計算、不鎖定規則版本，並另外計數。
+WorkDate 由刷卡當天星期的日切點決定，狀態與規則版本則與刷卡 API 相同，
+依 rule_weekdays 取 WorkDate 的星期（沒有班表時為隔天）。
+刷卡與既有記錄由唯讀 session 讀取，寫入每 WRITE_CHUNK_SIZE 筆一個交易，
+有寫入的員工在同一交易內重新彙總月彙總；交易之間釋放寫入連線，
+重算大範圍時刷卡不必等到整個重算結束。
+"""
+
+import asyncio
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import unit_of_work
+from app.models.required_config import RequiredConfig
+from app.models.schedule import Schedule
+from app.repositories.attendance import AttendanceRepository
+from app.repositories.attendance_monthly import (
+    AttendanceMonthlyRepository,
+    year_month_of,
+)
+from app.repositories.employee import EmployeeRepository
+from app.repositories.flex_setting import FlexSettingRepository
+from app.repositories.required_config import RequiredConfigRepository
+from app.repositories.scan_event import ScanEventRepository
+from app.repositories.schedule import ScheduleRepository
+from app.services.rule_cache import (
+    EMPTY_CONFIG_INDEX,
+    MICROSECONDS_PER_DAY,
+    ConfigIndex,
+    rule_weekdays,
+    time_of_day,
+)
+
+WRITE_CHUNK_SIZE = 1000
+ONE_DAY = timedelta(days=1)
+_MISSING = object()
+_VALUE_FIELDS = (
+    "RequiredConfigGUID",
+    "FirstInTime",
+    "LastOutTime",
+    "CheckInStatus",
+    "CheckOutStatus",
+)
+
+
+def _values_dict(values: tuple) -> dict:
+    """把重算結果轉成欄位對應的 dict。"""
+    return dict(zip(_VALUE_FIELDS, values))
+
+
+class _ConfigRule(NamedTuple):
+    """重算用的規則版本，時間預先編譯成當日微秒數。"""
+
+    GUID: str | None  # 以目前班表計算（沒有規則版本）時為 None
+    required_in: int
+    flex_end: int
+    required_out: int
+
+    @classmethod
+    def from_config(cls, config: RequiredConfig) -> "_ConfigRule":
+        """由規則版本建立（彈性結束時間與 DayRule 的算法相同）。"""
+        required_in = time_of_day(config.RequiredIn)
+        flex = config.FlexMinutes * 60_000_000
+        flex_end = (required_in + flex) % MICROSECONDS_PER_DAY
+        return cls(config.GUID, required_in, flex_end, time_of_day(config.RequiredOut))
+
+    @classmethod
+    def from_schedule(cls, schedule: Schedule, flex_minutes: int) -> "_ConfigRule":
+        """由目前的班表與彈性分鐘建立（與刷卡 API 的 DayRule 相同）。"""
+        required_in = time_of_day(schedule.CheckInNeedBefore)
+        flex_end = (required_in + flex_minutes * 60_000_000) % MICROSECONDS_PER_DAY
+        return cls(None, required_in, flex_end, time_of_day(schedule.CheckNeedOutAfter))
+
+    def check_in_status(self, scan_time: int) -> int:
+        """計算上班打卡狀態（0=NORMAL, 1=FLEX, 2=LATE）。"""
+        if scan_time <= self.required_in:
+            return 0
+        if scan_time <= self.flex_end:
+            return 1
+        return 2
+
+    def check_out_status(self, scan_time: int) -> int:
+        """計算下班打卡狀態（0=NORMAL, 1=EARLY）。"""
+        return 0 if scan_time >= self.required_out else 1
+
+
+@dataclass
+class RecomputeResult:
+    """重算結果統計。"""
+
+    start_date: date
+    end_date: date
+    scanned_events: int = 0
+    attendance_days: int = 0
+    updated: int = 0
+    inserted: int = 0
+    unchanged: int = 0
+    live_rule_days: int = 0  # 沒有規則版本、以目前班表計算的記錄數
+    unresolved: int = 0
+    elapsed_ms: float = 0.0
+
+
+class AttendanceRecomputeService:
+    """AttendanceDaily 重算服務。"""
+
+    def __init__(self, db: AsyncSession, read_db: AsyncSession):
+        """初始化服務。
+
+        read_db 須為另一個 session：串流刷卡期間 db 會多次提交並釋放連線。
+        """
+        self.db = db
+        self.scan_event_repo = ScanEventRepository(read_db)
+        self.attendance_repo = AttendanceRepository(db)
+        self.snapshot_repo = AttendanceRepository(read_db)
+        self.monthly_repo = AttendanceMonthlyRepository(db)
+        self.employee_repo = EmployeeRepository(read_db)
+        self.required_config_repo = RequiredConfigRepository(read_db)
+        self.schedule_repo = ScheduleRepository(read_db)
+        self.flex_setting_repo = FlexSettingRepository(read_db)
+
+    async def recompute(
+        self,
+        start_date: date,
+        end_date: date,
+        rfid_ids: Collection[str] | None = None,
+    ) -> RecomputeResult:
+        """重算指定 WorkDate 區間（含頭尾）的考勤記錄。
+
+        每批寫入各自提交，中途失敗時已提交的批次保留；重算可重複執行。
+        """
+        started = perf_counter()
+        self._result = RecomputeResult(start_date=start_date, end_date=end_date)
+        self._departments = await self.employee_repo.get_department_map(rfid_ids)
+        dept_guids = set(self._departments.values())
+        self._index_configs(
+            await self.required_config_repo.get_by_departments(dept_guids)
+        )
+        await self._index_schedules(dept_guids)
+        self._existing = {
+            (row.RFID_ID, row.WorkDate): row
+            for row in await self.snapshot_repo.get_snapshot_by_date_range(
+                start_date, end_date, rfid_ids
+            )
+        }
+        self._updates: list[dict] = []
+        self._inserts: list[dict] = []
+        self._changed_months: dict[str, set[str]] = {}
+
+        current_rfid = None
+        dept_guid = None
+        days: dict[date, list] = {}
+        # 日切點前的刷卡屬於前一天，因此多讀到 end_date 的隔天
+        events = self.scan_event_repo.stream_by_time_range(
+            datetime.combine(start_date, time.min),
+            datetime.combine(end_date + timedelta(days=2), time.min),
+            rfid_ids,
+        )
+        async for rows in events:
+            self._result.scanned_events += len(rows)
+            for rfid_id, event_time in rows:
+                if rfid_id != current_rfid:
+                    self._collect(current_rfid, days)
+                    current_rfid = rfid_id
+                    dept_guid = self._departments.get(rfid_id)
+                    days = {}
+
+                # 以刷卡當日有效規則版本的 DayCutoff 決定 WorkDate
+                event_date = event_time.date()
+                key = (dept_guid, event_date)
+                cutoff = self._cutoffs.get(key, _MISSING)
+                if cutoff is _MISSING:
+                    cutoff = self._cutoffs[key] = self._cutoff(key)
+                if cutoff is None:
+                    continue
+                work_date = event_date - ONE_DAY if event_time < cutoff else event_date
+                if not start_date <= work_date <= end_date:
+                    continue
+
+                # 串流已依時間排序：第一筆為最早、最後一筆為最晚
+                span = days.get(work_date)
+                if span is None:
+                    days[work_date] = [event_time, event_time, 1]
+                else:
+                    span[1] = event_time
+                    span[2] += 1
+            await self._write(WRITE_CHUNK_SIZE)
+
+        self._collect(current_rfid, days)
+        await self._write(1)
+
+        self._result.elapsed_ms = round((perf_counter() - started) * 1000, 3)
+        return self._result
+
+    async def _write(self, threshold: int) -> None:
+        """待寫入筆數達門檻時，以一個交易批次更新、新增並重新彙總月彙總。"""
+        if not self._updates and not self._inserts:
+            return
+        if len(self._updates) + len(self._inserts) < threshold:
+            return
+        async with unit_of_work(self.db):
+            await self.attendance_repo.bulk_update(self._updates)
+            await self.attendance_repo.bulk_insert(self._inserts)
+            await self._refresh_months()
+        self._updates = []
+        self._inserts = []
+        self._changed_months = {}
+        # 讓等待寫入連線的請求先取得連線，再處理下一批
+        await asyncio.sleep(0)
+
+    async def _refresh_months(self) -> None:
+        """重新彙總有寫入的員工月彙總，每次最多 WRITE_CHUNK_SIZE 位員工。"""
+        for year_month, rfid_ids in self._changed_months.items():
+            rfid_list = sorted(rfid_ids)
+            for offset in range(0, len(rfid_list), WRITE_CHUNK_SIZE):
+                await self.monthly_repo.refresh(
+                    year_month, rfid_list[offset : offset + WRITE_CHUNK_SIZE]
+                )
+
+    def _index_configs(self, configs: list[RequiredConfig]) -> None:
+        """建立 (部門, ActiveDay) 的有效區間索引，並預先算好每個版本的彈性結束時間。"""
+        self._rules = {
+            config.GUID: _ConfigRule.from_config(config) for config in configs
+        }
+        grouped: dict[tuple[str, int], list[RequiredConfig]] = {}
+        for config in configs:
+            grouped.setdefault((config.Dept_GUID, config.ActiveDay), []).append(config)
+        self._configs_by_day = {
+            key: ConfigIndex(values) for key, values in grouped.items()
+        }
+        self._cutoffs: dict[tuple[str | None, date], datetime | None] = {}
+
+    async def _index_schedules(self, dept_guids: set[str]) -> None:
+        """載入部門目前的班表與彈性設定，供沒有規則版本的日期使用。"""
+        flex_minutes = {
+            flex_setting.Dept_GUID: flex_setting.FlexMinutes
+            for flex_setting in await self.flex_setting_repo.get_by_departments(
+                dept_guids
+            )
+        }
+        self._schedules: dict[tuple[str, int], tuple[_ConfigRule, time]] = {
+            (schedule.Dept_GUID, schedule.ActiveDay): (
+                _ConfigRule.from_schedule(
+                    schedule, flex_minutes.get(schedule.Dept_GUID, 0)
+                ),
+                schedule.DayCutoff,
+            )
+            for schedule in await self.schedule_repo.get_active_by_departments(
+                dept_guids
+            )
+        }
+
+    def _live_rule(
+        self, dept_guid: str | None, weekday: int
+    ) -> tuple[_ConfigRule, time] | None:
+        """取得部門目前在指定星期的班表規則與日切時間（先特定星期，再全年）。"""
+        if dept_guid is None:
+            return None
+        return self._schedules.get((dept_guid, weekday)) or self._schedules.get(
+            (dept_guid, 8)
+        )
+
+    def _effective_config(
+        self, dept_guid: str | None, weekday: int, target_date: date
+    ) -> RequiredConfig | None:
+        """取得部門指定星期在指定日期有效的規則版本（先特定星期，再全年）。"""
+        if dept_guid is None:
+            return None
+        for active_day in (weekday, 8):
+            index = self._configs_by_day.get(
+                (dept_guid, active_day), EMPTY_CONFIG_INDEX
+            )
+            config = index.lookup(target_date)
+            if config is not None:
+                return config
+        return None
+
+    def _day_rule(
+        self, dept_guid: str | None, work_date: date
+    ) -> tuple[_ConfigRule | None, bool]:
+        """取得 WorkDate 的規則與是否為目前班表（與刷卡 API 相同依 rule_weekdays）。
+
+        依序嘗試的星期中，第一個有規則版本或班表的星期決定規則；
+        該星期有效的規則版本優先，沒有時用目前班表。
+        """
+        for weekday in rule_weekdays(work_date):
+            config = self._effective_config(dept_guid, weekday, work_date)
+            if config is not None:
+                return self._rules[config.GUID], False
+            live_rule = self._live_rule(dept_guid, weekday)
+            if live_rule is not None:
+                return live_rule[0], True
+        return None, False
+
+    def _cutoff(self, key: tuple[str | None, date]) -> datetime | None:
+        """取得部門在指定日期的日切時間點（規則版本與班表都沒有時為 None）。"""
+        dept_guid, event_date = key
+        weekday = event_date.weekday() + 1
+        config = self._effective_config(dept_guid, weekday, event_date)
+        if config is not None:
+            return datetime.combine(event_date, config.DayCutoff)
+        live = self._live_rule(dept_guid, weekday)
+        if live is None:
+            return None
+        return datetime.combine(event_date, live[1])
+
+    def _collect(self, rfid_id: str | None, days: dict[date, list]) -> None:
+        """把一位員工各工作日的刷卡區間轉成待更新或待新增的記錄。"""
+        if rfid_id is None:
+            return
+        now = datetime.utcnow()
+        result = self._result
+        for work_date, (first_in, last_scan, scans) in days.items():
+            result.attendance_days += 1
+            row = self._existing.get((rfid_id, work_date))
+            rule = None
+            if row is not None and row.RequiredConfigGUID is not None:
+                rule = self._rules.get(row.RequiredConfigGUID)
+            live = False
+            if rule is None:
+                rule, live = self._day_rule(self._departments.get(rfid_id), work_date)
+            if rule is None:
+                result.unresolved += 1
+                continue
+            if live:
+                result.live_rule_days += 1
+
+            last_out = last_scan if scans > 1 else None
+            check_out_status = 2  # MISSING
+            if last_out is not None:
+                check_out_status = rule.check_out_status(time_of_day(last_out))
+            values = (
+                rule.GUID,
+                first_in,
+                last_out,
+                rule.check_in_status(time_of_day(first_in)),
+                check_out_status,
+            )
+
+            if row is None:
+                self._inserts.append(
+                    {"RFID_ID": rfid_id, "WorkDate": work_date, **_values_dict(values)}
+                )
+                result.inserted += 1
+            elif values != (
+                row.RequiredConfigGUID,
+                row.FirstInTime,
+                row.LastOutTime,
+                row.CheckInStatus,
+                row.CheckOutStatus,
+            ):
+                update = {"GUID": row.GUID, **_values_dict(values), "UpdateTime": now}
+                if row.FirstInTime is None:
+                    # 日結補上的缺勤記錄補到刷卡，清除缺勤標記，其餘由下次日結推導
+                    update["ExceptionFlags"] = None
+                self._updates.append(update)
+                result.updated += 1
+            else:
+                result.unchanged += 1
+                continue
+            self._changed_months.setdefault(year_month_of(work_date), set()).add(
+                rfid_id
+            )
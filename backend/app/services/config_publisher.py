@@ -0,0 +1,94 @@
+"""規則版本（RequiredConfig）發佈。
+
+班表或彈性設定新增、更新、刪除時，在同一個交易內依部門目前的設定重新發佈
+快照：內容有變的 ActiveDay 關閉目前版本（EffectiveTo 設為生效日前一天）並
+新增自生效日起的版本，班表已刪除的只關閉。已鎖定舊版本的考勤記錄不受影響，
+同日重新發佈時舊版本成為空區間，之後的上班卡改用新版本。
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import unit_of_work
+from app.models.flex_setting import FlexSetting
+from app.models.required_config import RequiredConfig
+from app.models.schedule import Schedule
+from app.repositories.flex_setting import FlexSettingRepository
+from app.repositories.required_config import RequiredConfigRepository
+from app.repositories.schedule import ScheduleRepository
+from app.services.rule_cache import ONE_DAY
+
+
+def _snapshot(schedule: Schedule, flex_setting: FlexSetting | None) -> dict:
+    """由班表與彈性設定組成快照欄位（沒有彈性設定時彈性分鐘為 0）。"""
+    return {
+        "Schedule_GUID": schedule.GUID,
+        "FlexSetting_GUID": flex_setting.GUID if flex_setting else None,
+        "RequiredIn": schedule.CheckInNeedBefore,
+        "RequiredOut": schedule.CheckNeedOutAfter,
+        "FlexMinutes": flex_setting.FlexMinutes if flex_setting else 0,
+        "DayCutoff": schedule.DayCutoff,
+    }
+
+
+class RequiredConfigPublisher:
+    """部門規則版本發佈服務。"""
+
+    def __init__(self, db: AsyncSession):
+        """初始化服務。"""
+        self.db = db
+        self.schedule_repo = ScheduleRepository(db)
+        self.flex_setting_repo = FlexSettingRepository(db)
+        self.required_config_repo = RequiredConfigRepository(db)
+
+    async def publish(
+        self, dept_guid: str, effective_from: date | None = None
+    ) -> list[RequiredConfig]:
+        """依部門目前的班表與彈性設定發佈規則版本，回傳新發佈的版本。
+
+        effective_from 預設為 UTC 的今天（WorkDate 由 UTC 刷卡時間決定，與日結
+        相同）；在呼叫端的 unit_of_work 內執行時與班表／彈性設定的寫入一起提交，
+        內容沒有變動的 ActiveDay 不會產生新版本。
+        """
+        effective_from = effective_from or datetime.utcnow().date()
+        schedules = {
+            schedule.ActiveDay: schedule
+            for schedule in await self.schedule_repo.get_by_department(dept_guid)
+        }
+        flex_setting = await self.flex_setting_repo.get_by_department(dept_guid)
+        current: dict[int, list[RequiredConfig]] = {}
+        for config in await self.required_config_repo.get_open_by_department(dept_guid):
+            current.setdefault(config.ActiveDay, []).append(config)
+
+        published = []
+        async with unit_of_work(self.db):
+            for active_day in sorted(schedules.keys() | current.keys()):
+                schedule = schedules.get(active_day)
+                snapshot = _snapshot(schedule, flex_setting) if schedule else None
+                configs = current.get(active_day, [])
+                if (
+                    snapshot is not None
+                    and len(configs) == 1
+                    and all(
+                        getattr(configs[0], name) == value
+                        for name, value in snapshot.items()
+                    )
+                ):
+                    continue
+
+                for config in configs:
+                    await self.required_config_repo.expire_config(
+                        config, effective_from - ONE_DAY
+                    )
+                if snapshot is not None:
+                    config = RequiredConfig(
+                        Dept_GUID=dept_guid,
+                        ActiveDay=active_day,
+                        EffectiveFrom=effective_from,
+                        **snapshot,
+                    )
+                    published.append(
+                        await self.required_config_repo.create(config, refresh=False)
+                    )
+        return published
@@ -0,0 +1,260 @@
+"""部門出勤看板統計與快取（行程內）。
+
+大廳看板每幾秒輪詢一次；統計由資料庫 GROUP BY 算出後快取，同一個
+(日期, 部門) 同時只會有一個查詢在執行，其他請求等待同一個結果。
+刷卡使快取標記為過期，過期的統計在計算後滿 ttl 秒才重算，因此尖峰時
+不論有多少看板，每個 (日期, 部門) 每 ttl 秒最多一次查詢；沒有刷卡時
+統計最多保留 max_age 秒（涵蓋新增員工等不經過刷卡的變動）。
+未指定日期時的預設工作日與刷卡相同：UTC 現在時間依部門當日的 DayCutoff
+歸屬，日切點前仍屬前一天。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import read_session
+from app.repositories.attendance import AttendanceRepository
+from app.repositories.department import DepartmentRepository
+from app.services.rule_cache import rule_cache, time_of_day
+
+DashboardKey = tuple[date, str | None]  # (WorkDate, Dept_GUID；None 為全公司)
+
+_COUNT_FIELDS = ("employees", "present", "normal", "flex", "late", "early", "missing")
+
+
+@dataclass(kw_only=True)
+class AttendanceCounts:
+    """當日出勤人數。"""
+
+    employees: int = 0
+    present: int = 0
+    normal: int = 0
+    flex: int = 0
+    late: int = 0
+    early: int = 0
+    missing: int = 0
+
+    @property
+    def absent(self) -> int:
+        """尚未打上班卡的在職員工數。"""
+        return self.employees - self.present
+
+
+@dataclass(kw_only=True)
+class DepartmentCounts(AttendanceCounts):
+    """部門當日出勤人數。"""
+
+    Dept_GUID: str
+    DeptName: str
+
+
+@dataclass
+class Dashboard:
+    """看板統計；部門看板的 departments 只有該部門一筆。"""
+
+    work_date: date
+    dept_guid: str | None
+    generated_at: datetime
+    departments: list[DepartmentCounts] = field(default_factory=list)
+
+    @property
+    def totals(self) -> AttendanceCounts:
+        """各部門人數加總。"""
+        return AttendanceCounts(
+            **{
+                name: sum(getattr(counts, name) for counts in self.departments)
+                for name in _COUNT_FIELDS
+            }
+        )
+
+
+@dataclass
+class _Entry:
+    """快取項目。"""
+
+    dashboard: Dashboard
+    loaded_at: float
+    stale: bool = False
+
+
+class DashboardCache:
+    """看板統計快取。"""
+
+    def __init__(self, ttl_seconds: float, max_age_seconds: float) -> None:
+        """初始化快取。"""
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self._entries: dict[DashboardKey, _Entry] = {}
+        self._loading: dict[DashboardKey, asyncio.Task] = {}
+        self._work_dates: dict[str | None, tuple[float, date]] = {}
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get(self, work_date: date, dept_guid: str | None) -> Dashboard | None:
+        """取得看板統計；部門不存在時為 None。"""
+        key = (work_date, dept_guid)
+        entry = self._entries.get(key)
+        if entry is not None and self._is_fresh(entry):
+            self.hits += 1
+            return entry.dashboard
+
+        task = self._loading.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._loading[key] = asyncio.create_task(self._load(key))
+        else:
+            self.coalesced += 1
+        # 請求取消（用戶端中斷）不影響其他等待同一結果的請求
+        return await asyncio.shield(task)
+
+    async def current_work_date(self, dept_guid: str | None) -> date:
+        """取得目前的工作日（UTC 現在時間依 DayCutoff 歸屬，結果保留 ttl 秒）。
+
+        與刷卡相同，以現在時間的星期取部門規則；全公司取各部門中最早的工作日，
+        仍有部門未過日切點時維持前一天。沒有班表的部門以 UTC 日期計。
+        """
+        cached = self._work_dates.get(dept_guid)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        loaded_at = time.monotonic()
+        now = datetime.utcnow()
+        weekday = now.weekday() + 1
+        async with read_session() as db:
+            dept_guids = (
+                [dept_guid]
+                if dept_guid is not None
+                else await DepartmentRepository(db).get_all_guids()
+            )
+            rules = await rule_cache.get_day_rules(
+                db, {(guid, weekday) for guid in dept_guids}
+            )
+        scan_time = time_of_day(now)
+        work_date = min(
+            (rule.work_date(now, scan_time) for rule in rules.values() if rule),
+            default=now.date(),
+        )
+        # 順便移除過期的項目，查詢不存在的部門不會讓快取無限增長
+        self._work_dates = {
+            key: value
+            for key, value in self._work_dates.items()
+            if loaded_at - value[0] < self.ttl_seconds
+        }
+        self._work_dates[dept_guid] = (loaded_at, work_date)
+        return work_date
+
+    def invalidate(self, work_date: date, dept_guid: str) -> None:
+        """刷卡後標記該部門與全公司當日的統計為過期。"""
+        for key in ((work_date, dept_guid), (work_date, None)):
+            entry = self._entries.get(key)
+            if entry is not None and not entry.stale:
+                entry.stale = True
+                self.invalidations += 1
+        self.version += 1
+
+    def invalidate_date(self, work_date: date) -> None:
+        """考勤修改後標記當日所有統計為過期。"""
+        for (entry_date, _), entry in self._entries.items():
+            if entry_date == work_date and not entry.stale:
+                entry.stale = True
+                self.invalidations += 1
+        self.version += 1
+
+    def clear(self) -> None:
+        """清除所有快取。"""
+        self._entries.clear()
+        self._work_dates.clear()
+        self.version += 1
+
+    def _is_fresh(self, entry: _Entry) -> bool:
+        """過期的統計保留 ttl 秒，未過期的保留 max_age 秒。"""
+        age = time.monotonic() - entry.loaded_at
+        return age < (self.ttl_seconds if entry.stale else self.max_age_seconds)
+
+    async def _load(self, key: DashboardKey) -> Dashboard | None:
+        """以獨立的唯讀 session 查詢統計並寫入快取。
+
+        查詢期間有刷卡時，讀到的結果可能不含該筆刷卡，因此寫回時即標記為過期。
+        """
+        work_date, dept_guid = key
+        version = self.version
+        loaded_at = time.monotonic()
+        try:
+            async with read_session() as db:
+                dashboard = await self._query(db, work_date, dept_guid)
+            self._evict_expired(loaded_at)
+            # 不存在的部門不快取，新增部門後即可查詢
+            if dashboard is not None:
+                self._entries[key] = _Entry(
+                    dashboard, loaded_at, stale=version != self.version
+                )
+            return dashboard
+        finally:
+            self._loading.pop(key, None)
+
+    def _evict_expired(self, now: float) -> None:
+        """移除超過 max_age 的項目（例如前幾天的統計）。"""
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if now - entry.loaded_at >= self.max_age_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    @staticmethod
+    async def _query(
+        db: AsyncSession, work_date: date, dept_guid: str | None
+    ) -> Dashboard | None:
+        """查詢統計；部門看板在部門沒有在職員工時回傳零。"""
+        rows = await AttendanceRepository(db).get_dashboard_counts(work_date, dept_guid)
+        departments = [
+            DepartmentCounts(
+                Dept_GUID=row.Dept_GUID,
+                DeptName=row.DeptName,
+                **{name: getattr(row, name) for name in _COUNT_FIELDS},
+            )
+            for row in rows
+        ]
+        if dept_guid is not None and not departments:
+            department = await DepartmentRepository(db).get_by_id(dept_guid)
+            if department is None:
+                return None
+            departments = [
+                DepartmentCounts(
+                    Dept_GUID=department.GUID, DeptName=department.DeptName
+                )
+            ]
+        return Dashboard(
+            work_date=work_date,
+            dept_guid=dept_guid,
+            generated_at=datetime.utcnow(),
+            departments=departments,
+        )
+
+    def stats(self) -> dict:
+        """取得快取統計。"""
+        return {
+            "entries": len(self._entries),
+            "loading": len(self._loading),
+            "ttl_seconds": self.ttl_seconds,
+            "max_age_seconds": self.max_age_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+        }
+
+
+dashboard_cache = DashboardCache(
+    ttl_seconds=settings.dashboard_cache_ttl_seconds,
+    max_age_seconds=settings.dashboard_cache_max_age_seconds,
+)
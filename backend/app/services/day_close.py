@@ -0,0 +1,211 @@
+"""日結：補上缺勤記錄並標記 ExceptionFlags。
+
+WorkDate 隔天過了部門的 DayCutoff 後，不會再有刷卡歸入該日，即可日結。
+每個日期只執行兩個集合式陳述式：INSERT ... SELECT 為排班部門沒有考勤記錄的
+在職員工補上缺勤記錄，UPDATE 由考勤欄位推導 ExceptionFlags；不逐一載入員工。
+兩者都可重複執行，因此排程每次重做最近 N 天，離線讀卡機晚上傳、重算或
+考勤修改後的標記會在下一輪修正。每個交易最多日結 DEPARTMENT_CHUNK_SIZE 個
+部門，交易之間釋放寫入連線，日結期間的刷卡只需等待單一批次。
+是否已過 DayCutoff 以 UTC 判斷：刷卡 API 以 datetime.utcnow() 補上缺少的
+刷卡時間，重算與保留期限也都使用 UTC，日結須與刷卡時間使用相同的時鐘。
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session, unit_of_work
+from app.models.required_config import RequiredConfig
+from app.repositories.attendance import AttendanceRepository
+from app.repositories.attendance_monthly import (
+    AttendanceMonthlyRepository,
+    year_month_of,
+)
+from app.repositories.required_config import RequiredConfigRepository
+
+REFRESH_CHUNK_SIZE = 1000
+DEPARTMENT_CHUNK_SIZE = 50  # 每個交易日結的部門數
+ONE_DAY = timedelta(days=1)
+
+
+@dataclass
+class DayCloseResult:
+    """單日日結結果。"""
+
+    work_date: date
+    departments: int = 0
+    pending_departments: int = 0  # 當日有排班但尚未過 DayCutoff
+    absences_inserted: int = 0
+    flags_updated: int = 0
+    elapsed_ms: float = 0.0
+
+
+class DayCloseService:
+    """日結服務。"""
+
+    def __init__(self, db: AsyncSession):
+        """初始化服務。"""
+        self.db = db
+        self.attendance_repo = AttendanceRepository(db)
+        self.monthly_repo = AttendanceMonthlyRepository(db)
+        self.required_config_repo = RequiredConfigRepository(db)
+
+    async def close_pending(
+        self, now: datetime, lookback_days: int
+    ) -> list[DayCloseResult]:
+        """依序日結今天以前的最近 lookback_days 天（now 為 UTC，與刷卡時間相同）。"""
+        latest = now.date() - ONE_DAY
+        return [
+            await self.close_day(latest - timedelta(days=offset), now)
+            for offset in reversed(range(lookback_days))
+        ]
+
+    async def close_day(self, work_date: date, now: datetime) -> DayCloseResult:
+        """日結指定 WorkDate，尚未過 DayCutoff 的部門略過。
+
+        now 須與刷卡時間使用相同的時鐘（UTC），否則在非 UTC 主機上會提早或
+        延後日結，提早時會為尚未刷卡的員工補上缺勤記錄。
+        每 DEPARTMENT_CHUNK_SIZE 個部門一個交易，新增的缺勤記錄在同一交易內
+        重新彙總月彙總。
+        """
+        started = perf_counter()
+        result = DayCloseResult(work_date=work_date)
+        scheduled = self._pick_configs(
+            await self.required_config_repo.get_effective_by_date(work_date)
+        )
+        # 日切點是隔天的 DayCutoff，在此之前仍可能有刷卡歸入當日
+        dept_configs = {
+            dept_guid: config.GUID
+            for dept_guid, config in scheduled.items()
+            if now >= datetime.combine(work_date + ONE_DAY, config.DayCutoff)
+        }
+        result.departments = len(dept_configs)
+        result.pending_departments = len(scheduled) - len(dept_configs)
+
+        # 結束讀取規則版本的交易，讓等待寫入連線的請求先取得連線
+        await self.db.rollback()
+        dept_guids = sorted(dept_configs)
+        for offset in range(0, len(dept_guids), DEPARTMENT_CHUNK_SIZE):
+            await asyncio.sleep(0)
+            chunk = {
+                dept_guid: dept_configs[dept_guid]
+                for dept_guid in dept_guids[offset : offset + DEPARTMENT_CHUNK_SIZE]
+            }
+            async with unit_of_work(self.db):
+                stamp = datetime.utcnow()
+                absentees = await self.attendance_repo.insert_absences(
+                    work_date, chunk, stamp
+                )
+                result.absences_inserted += len(absentees)
+                result.flags_updated += (
+                    await self.attendance_repo.update_exception_flags(
+                        work_date, chunk, stamp
+                    )
+                )
+                await self._refresh_month(work_date, absentees)
+
+        result.elapsed_ms = round((perf_counter() - started) * 1000, 3)
+        return result
+
+    @staticmethod
+    def _pick_configs(configs: list[RequiredConfig]) -> dict[str, RequiredConfig]:
+        """每個部門取當日適用的規則版本（先特定星期，再全年；同類取最新版本）。"""
+        picked: dict[str, RequiredConfig] = {}
+        for config in sorted(
+            configs, key=lambda c: (c.ActiveDay != 8, c.EffectiveFrom)
+        ):
+            picked[config.Dept_GUID] = config
+        return picked
+
+    async def _refresh_month(self, work_date: date, rfid_ids: list[str]) -> None:
+        """重新彙總新增缺勤記錄的員工，每次最多 REFRESH_CHUNK_SIZE 位。"""
+        year_month = year_month_of(work_date)
+        rfid_ids = sorted(rfid_ids)
+        for offset in range(0, len(rfid_ids), REFRESH_CHUNK_SIZE):
+            await self.monthly_repo.refresh(
+                year_month,
+                rfid_ids[offset : offset + REFRESH_CHUNK_SIZE],
+                prune=False,
+            )
+
+
+class DayCloseScheduler:
+    """在背景定期日結最近 N 天。"""
+
+    def __init__(self, interval_seconds: float, lookback_days: int) -> None:
+        """初始化排程。"""
+        self.interval_seconds = interval_seconds
+        self.lookback_days = lookback_days
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.failures = 0
+        self.absences_inserted = 0
+        self.flags_updated = 0
+        self.last_run_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        """排程是否在執行中。"""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """啟動背景排程，啟動時即先執行一次。"""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="day-close")
+
+    async def stop(self) -> None:
+        """停止排程；執行中的日結交易會被取消並回滾。"""
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> list[DayCloseResult]:
+        """以新的 session 日結最近 lookback_days 天（以 UTC 判斷 DayCutoff）。"""
+        started = perf_counter()
+        async with async_session() as db:
+            results = await DayCloseService(db).close_pending(
+                datetime.utcnow(), self.lookback_days
+            )
+        self.runs += 1
+        self.absences_inserted += sum(result.absences_inserted for result in results)
+        self.flags_updated += sum(result.flags_updated for result in results)
+        self.last_run_ms = round((perf_counter() - started) * 1000, 3)
+        return results
+
+    async def _run(self) -> None:
+        """持續定期日結；單次失敗不中止排程，下一輪會重做。"""
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.failures += 1
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> dict:
+        """取得排程統計。"""
+        return {
+            "running": int(self.running),
+            "interval_seconds": self.interval_seconds,
+            "lookback_days": self.lookback_days,
+            "runs": self.runs,
+            "failures": self.failures,
+            "absences_inserted": self.absences_inserted,
+            "flags_updated": self.flags_updated,
+            "last_run_ms": self.last_run_ms,
+        }
+
+
+day_close_scheduler = DayCloseScheduler(
+    interval_seconds=settings.day_close_interval_seconds,
+    lookback_days=settings.day_close_lookback_days,
+)
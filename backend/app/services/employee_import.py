@@ -0,0 +1,187 @@
+"""員工批次匯入（CSV / JSON）。
+
+新據點上線一次建立數千名員工：整份檔案先驗證欄位，再以集合查詢一次檢查
+卡號是否已存在與部門是否存在，任一筆有錯就不寫入任何資料並回報每筆的錯誤；
+全部通過才以 executemany 分批新增，整份在同一個交易內提交（全有或全無）；
+驗證期間不占用寫入交易。
+dry_run 只驗證、不寫入。
+"""
+
+import csv
+import io
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Literal
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import unit_of_work
+from app.repositories.department import DepartmentRepository
+from app.repositories.employee import EmployeeRepository
+from app.schemas.employee import EmployeeCreate
+from app.services.rfid_filter import known_rfids
+from app.services.rule_cache import rule_cache
+
+ImportFormat = Literal["csv", "json"]
+
+IMPORT_CHUNK_SIZE = 1000  # 每次 IN 查詢與 executemany 的筆數
+REQUIRED_COLUMNS = ("RFID_ID", "EmpCode", "Name", "Dept_GUID")
+
+
+class EmployeeImportError(ValueError):
+    """匯入檔案無法解析（格式錯誤、缺少欄位或筆數超過上限）。"""
+
+
+@dataclass
+class ImportRowError:
+    """單筆資料的錯誤。"""
+
+    row: int
+    RFID_ID: str | None
+    errors: list[str]
+
+
+@dataclass
+class ImportResult:
+    """批次匯入結果。"""
+
+    dry_run: bool
+    total: int = 0
+    valid: int = 0
+    imported: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+
+def parse_import_file(content: bytes, import_format: ImportFormat) -> list[dict]:
+    """把上傳的檔案解析成每筆員工的欄位 dict。
+
+    CSV 須有標題列（可含 Excel 的 UTF-8 BOM），空白儲存格視為未填；
+    JSON 須為物件陣列。
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise EmployeeImportError("檔案必須是 UTF-8 編碼") from exc
+
+    if import_format == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        columns = reader.fieldnames or ()
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise EmployeeImportError(f"CSV 缺少欄位：{', '.join(missing)}")
+        rows = [
+            {
+                name: value.strip()
+                for name, value in record.items()
+                if name is not None and value is not None and value.strip()
+            }
+            for record in reader
+        ]
+    else:
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise EmployeeImportError(f"JSON 格式錯誤：{exc}") from exc
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise EmployeeImportError("JSON 必須是員工物件的陣列")
+
+    if len(rows) > settings.employee_import_max_rows:
+        raise EmployeeImportError(
+            f"單次最多匯入 {settings.employee_import_max_rows} 筆"
+        )
+    return rows
+
+
+def _validation_messages(exc: ValidationError) -> list[str]:
+    """把 pydantic 驗證錯誤轉成「欄位: 訊息」。"""
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+def _chunks(items: Sequence, size: int = IMPORT_CHUNK_SIZE):
+    """依固定筆數切分。"""
+    for offset in range(0, len(items), size):
+        yield items[offset : offset + size]
+
+
+class EmployeeImportService:
+    """員工批次匯入服務。"""
+
+    def __init__(self, db: AsyncSession):
+        """初始化服務。"""
+        self.db = db
+        self.employee_repo = EmployeeRepository(db)
+        self.department_repo = DepartmentRepository(db)
+
+    async def import_rows(self, rows: list[dict], dry_run: bool) -> ImportResult:
+        """驗證並匯入員工，任一筆有錯時不寫入。
+
+        卡號在匯入與寫入之間被其他請求搶先建立時，整批回滾並拋出 IntegrityError。
+        """
+        started = perf_counter()
+        result = ImportResult(dry_run=dry_run, total=len(rows))
+        errors: dict[int, list[str]] = {}
+        employees: dict[int, EmployeeCreate] = {}
+        first_rows: dict[str, int] = {}
+
+        # 1. 逐筆驗證欄位，並找出檔案內重複的卡號
+        for number, row in enumerate(rows, start=1):
+            try:
+                employee = EmployeeCreate.model_validate(row)
+            except ValidationError as exc:
+                errors[number] = _validation_messages(exc)
+                continue
+            first_row = first_rows.setdefault(employee.RFID_ID, number)
+            if first_row != number:
+                errors[number] = [f"RFID ID 與第 {first_row} 筆重複"]
+                continue
+            employees[number] = employee
+
+        # 2. 以集合查詢一次檢查卡號與部門
+        existing_rfids: set[str] = set()
+        for chunk in _chunks(list(first_rows)):
+            existing_rfids |= await self.employee_repo.get_existing_rfids(chunk)
+        departments: set[str] = set()
+        for chunk in _chunks(list({e.Dept_GUID for e in employees.values()})):
+            departments |= await self.department_repo.get_existing_guids(chunk)
+        # 結束檢查用的讀取交易，寫入連線只在下方新增期間占用
+        await self.db.rollback()
+        for number, employee in list(employees.items()):
+            messages = []
+            if employee.RFID_ID in existing_rfids:
+                messages.append("RFID ID 已存在")
+            if employee.Dept_GUID not in departments:
+                messages.append("部門不存在")
+            if messages:
+                errors[number] = messages
+                del employees[number]
+
+        result.valid = len(employees)
+        for number, messages in sorted(errors.items()):
+            rfid_id = rows[number - 1].get("RFID_ID")
+            result.errors.append(
+                ImportRowError(
+                    number, rfid_id if isinstance(rfid_id, str) else None, messages
+                )
+            )
+
+        # 3. 全部通過才分批新增，整份同一個交易
+        if not result.errors and not dry_run and employees:
+            valid = [employee.model_dump() for employee in employees.values()]
+            async with unit_of_work(self.db):
+                for chunk in _chunks(valid):
+                    await self.employee_repo.bulk_insert(chunk)
+            rfid_ids = [employee["RFID_ID"] for employee in valid]
+            rule_cache.invalidate_employees(rfid_ids)
+            known_rfids.update(rfid_ids)
+            result.imported = len(valid)
+
+        result.elapsed_ms = round((perf_counter() - started) * 1000, 3)
+        return result
@@ -0,0 +1,163 @@
+"""已知 RFID 卡號的負向快取（行程內）。
+
+訪客卡、其他大樓的卡與讀取錯誤整天都會打到刷卡 API；啟動時以 Employees
+建立 Bloom filter，filter 判定不存在的卡號直接拒絕，不必查詢資料庫。
+新增員工時加入卡號；刪除員工不會移除（Bloom filter 不支援刪除），只會留下
+可能存在的誤判並回到資料庫查詢，下次重建時清除。
+
+不經過員工 API 新增的員工（SQL 匯入、其他 worker、管理腳本）不在 filter 內：
+filter 判定不存在的卡號每秒仍有 recheck_per_second 次查詢資料庫的額度，
+查到員工即加入 filter；另於背景每 reload_seconds 秒自 Employees 重建一次。
+"""
+
+import asyncio
+import time
+from collections.abc import Collection
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import read_session
+from app.repositories.employee import EmployeeRepository
+from app.utils.bloom import BloomFilter
+
+
+class KnownRfidFilter:
+    """已知 RFID 卡號的 Bloom filter。"""
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        recheck_per_second: float = 0.0,
+        reload_seconds: float = 0.0,
+    ) -> None:
+        """初始化（載入前一律視為可能存在）。"""
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recheck_per_second = recheck_per_second
+        self.reload_seconds = reload_seconds
+        self._filter: BloomFilter | None = None
+        self._task: asyncio.Task | None = None
+        self._recheck_tokens = recheck_per_second
+        self._recheck_at = time.monotonic()
+        self.rejected = 0
+        self.passed = 0
+        self.stale = 0
+        self.rechecked = 0
+        self.recovered = 0
+        self.reloads = 0
+        self.reload_failures = 0
+
+    @property
+    def loaded(self) -> bool:
+        """是否已從資料庫建立。"""
+        return self._filter is not None
+
+    async def load(self, db: AsyncSession) -> None:
+        """從 Employees 重建 filter，容量至少為目前員工數的兩倍。"""
+        rfid_ids = await EmployeeRepository(db).get_all_rfids()
+        bloom = BloomFilter(max(self.capacity, len(rfid_ids) * 2), self.error_rate)
+        bloom.update(rfid_ids)
+        self._filter = bloom
+        self.stale = 0
+
+    async def start(self) -> None:
+        """啟動背景定期重建（reload_seconds 為 0 時不啟動）。"""
+        if self.reload_seconds <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="rfid-filter-reload")
+
+    async def stop(self) -> None:
+        """停止背景重建。"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """定期以新的唯讀 session 重建；單次失敗沿用目前的 filter。"""
+        while True:
+            await asyncio.sleep(self.reload_seconds)
+            try:
+                async with read_session() as db:
+                    await self.load(db)
+                self.reloads += 1
+            except Exception:
+                self.reload_failures += 1
+
+    def add(self, rfid_id: str) -> None:
+        """新增員工時加入卡號。"""
+        if self._filter is not None:
+            self._filter.add(rfid_id)
+
+    def update(self, rfid_ids: Collection[str]) -> None:
+        """批次新增員工時加入卡號。"""
+        if self._filter is not None:
+            self._filter.update(rfid_ids)
+
+    def discard(self, rfid_id: str) -> None:
+        """刪除員工時記錄殘留的卡號（filter 無法移除）。"""
+        if self._filter is not None:
+            self.stale += 1
+
+    def might_exist(self, rfid_id: str) -> bool:
+        """卡號是否可能屬於員工；False 代表 filter 建立時不存在。"""
+        if self._filter is None or rfid_id in self._filter:
+            self.passed += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def allow_recheck(self) -> bool:
+        """filter 判定不存在的卡號是否仍可查詢資料庫（token bucket 限額）。"""
+        if self.recheck_per_second <= 0:
+            return False
+        now = time.monotonic()
+        self._recheck_tokens = min(
+            self.recheck_per_second,
+            self._recheck_tokens + (now - self._recheck_at) * self.recheck_per_second,
+        )
+        self._recheck_at = now
+        if self._recheck_tokens < 1:
+            return False
+        self._recheck_tokens -= 1
+        self.rechecked += 1
+        return True
+
+    def recover(self, rfid_ids: Collection[str]) -> None:
+        """加入重新查詢後確認存在的卡號（filter 建立後由其他途徑新增的員工）。"""
+        if rfid_ids:
+            self.recovered += len(rfid_ids)
+            self.update(rfid_ids)
+
+    def stats(self) -> dict:
+        """取得 filter 大小與攔截統計。"""
+        bloom = self._filter
+        return {
+            "loaded": bloom is not None,
+            "capacity": bloom.capacity if bloom else self.capacity,
+            "error_rate": self.error_rate,
+            "keys": bloom.count if bloom else 0,
+            "hash_count": bloom.hash_count if bloom else 0,
+            "memory_bytes": bloom.memory_bytes if bloom else 0,
+            "stale": self.stale,
+            "passed": self.passed,
+            "rejected": self.rejected,
+            "rechecked": self.rechecked,
+            "recovered": self.recovered,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+        }
+
+
+known_rfids = KnownRfidFilter(
+    capacity=settings.rfid_filter_capacity,
+    error_rate=settings.rfid_filter_error_rate,
+    recheck_per_second=settings.rfid_filter_recheck_per_second,
+    reload_seconds=settings.rfid_filter_reload_seconds,
+)
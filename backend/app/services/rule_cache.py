@@ -0,0 +1,403 @@
+"""刷卡規則快取（行程內）。
+
+員工→部門、(部門, 星期)→班表／彈性設定／規則版本一個月只變動數次，
+刷卡熱路徑改由此快取提供；員工、班表、彈性設定的寫入路由負責失效。
+其他行程的異動（database.publish_configs、管理腳本、另一個 worker）由背景輪詢
+RequiredConfigs 與 Employees 的異動標記發現，每 poll_seconds 秒檢查一次，
+規則版本變動時清除規則快取，員工變動時清除員工快取。
+"""
+
+import asyncio
+from bisect import bisect_right
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Generic, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import read_session
+from app.repositories.employee import EmployeeRepository
+from app.repositories.flex_setting import FlexSettingRepository
+from app.repositories.required_config import RequiredConfigRepository
+from app.repositories.schedule import ScheduleRepository
+
+DayKey = tuple[str, int]  # (Dept_GUID, weekday 1-7)
+ConfigT = TypeVar("ConfigT")  # 具 EffectiveFrom / EffectiveTo 的規則版本
+
+MICROSECONDS_PER_DAY = 86_400_000_000
+ONE_DAY = timedelta(days=1)
+
+
+def time_of_day(value: time | datetime) -> int:
+    """取得時間（或時間點的時刻）是當日的第幾微秒。"""
+    return (
+        (value.hour * 60 + value.minute) * 60 + value.second
+    ) * 1_000_000 + value.microsecond
+
+
+def rule_weekdays(work_date: date) -> tuple[int, int]:
+    """取得決定 WorkDate 狀態與規則版本的星期（1-7），依序嘗試。
+
+    刷卡與重算共用：先取 WorkDate 當天的星期；該星期沒有班表時改用隔天，
+    日切點前歸入前一天的刷卡是由隔天的班表決定日切點的。
+    """
+    return work_date.weekday() + 1, (work_date + ONE_DAY).weekday() + 1
+
+
+@dataclass(frozen=True, slots=True)
+class CachedEmployee:
+    """快取的員工資料。"""
+
+    RFID_ID: str
+    Name: str
+    Dept_GUID: str
+    Active: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CachedConfig:
+    """快取的規則版本有效區間。"""
+
+    GUID: str
+    ActiveDay: int
+    EffectiveFrom: date
+    EffectiveTo: date | None
+
+
+class ConfigIndex(Generic[ConfigT]):
+    """單一 (部門, ActiveDay) 規則版本的有效區間索引。
+
+    發佈新版本時會先關閉舊版本，同一組的有效區間互不重疊；依 EffectiveFrom
+    排序後以二分搜尋找出指定日期前最後生效的版本，再確認尚未失效，O(log n)。
+    同日重新發佈留下的空區間（EffectiveTo 早於 EffectiveFrom）不納入。
+    """
+
+    __slots__ = ("_configs", "_starts")
+
+    def __init__(self, configs: Iterable[ConfigT] = ()) -> None:
+        """依生效日排序建立索引。"""
+        self._configs = sorted(
+            (
+                config
+                for config in configs
+                if config.EffectiveTo is None
+                or config.EffectiveTo >= config.EffectiveFrom
+            ),
+            key=lambda config: config.EffectiveFrom,
+        )
+        self._starts = [config.EffectiveFrom for config in self._configs]
+
+    def __len__(self) -> int:
+        """索引中的規則版本數。"""
+        return len(self._configs)
+
+    def lookup(self, target_date: date) -> ConfigT | None:
+        """取得指定日期有效的規則版本。"""
+        position = bisect_right(self._starts, target_date) - 1
+        if position < 0:
+            return None
+        config = self._configs[position]
+        if config.EffectiveTo is not None and config.EffectiveTo < target_date:
+            return None
+        return config
+
+
+EMPTY_CONFIG_INDEX: ConfigIndex = ConfigIndex()
+
+
+@dataclass(frozen=True, slots=True)
+class DayRule:
+    """部門在某個星期幾適用的班表、彈性分鐘與規則版本。
+
+    建立時把判斷用的時間編譯成當日微秒數，刷卡時決定 WorkDate 與狀態
+    只需整數比較，不必為每筆刷卡建立 datetime／timedelta。
+    """
+
+    Schedule_GUID: str
+    CheckInNeedBefore: time
+    CheckNeedOutAfter: time
+    DayCutoff: time
+    FlexMinutes: int
+    configs: tuple[ConfigIndex[CachedConfig], ...]  # 特定星期優先，其次全年
+    check_in_before: int = field(init=False, repr=False)
+    flex_end: int = field(init=False, repr=False)
+    check_out_after: int = field(init=False, repr=False)
+    day_cutoff: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """編譯當日微秒數（彈性結束時間跨午夜時與時鐘時間相同，繞回當日）。"""
+        check_in_before = time_of_day(self.CheckInNeedBefore)
+        object.__setattr__(self, "check_in_before", check_in_before)
+        object.__setattr__(
+            self,
+            "flex_end",
+            (check_in_before + self.FlexMinutes * 60_000_000) % MICROSECONDS_PER_DAY,
+        )
+        object.__setattr__(self, "check_out_after", time_of_day(self.CheckNeedOutAfter))
+        object.__setattr__(self, "day_cutoff", time_of_day(self.DayCutoff))
+
+    def work_date(self, event_time: datetime, scan_time: int) -> date:
+        """根據 DayCutoff 計算工作日期（scan_time 為刷卡的當日微秒數）。"""
+        if scan_time < self.day_cutoff:
+            # 刷卡時間在日切點之前，屬於前一天
+            return event_time.date() - ONE_DAY
+        return event_time.date()
+
+    def check_in_status(self, scan_time: int) -> int:
+        """計算上班打卡狀態（0=NORMAL, 1=FLEX, 2=LATE）。"""
+        if scan_time <= self.check_in_before:
+            return 0
+        if scan_time <= self.flex_end:
+            return 1
+        return 2
+
+    def check_out_status(self, scan_time: int) -> int:
+        """計算下班打卡狀態（0=NORMAL, 1=EARLY）。"""
+        return 0 if scan_time >= self.check_out_after else 1
+
+    def pick_config(self, work_date: date) -> CachedConfig | None:
+        """取得指定工作日有效的規則版本。"""
+        for index in self.configs:
+            config = index.lookup(work_date)
+            if config is not None:
+                return config
+        return None
+
+
+class RuleCache:
+    """版本化的刷卡規則快取。
+
+    每次失效都會遞增 version；載入前記下 version，載入完成時若已被失效
+    則不寫回，避免把失效前讀到的舊資料放回快取。
+    """
+
+    def __init__(self, poll_seconds: float = 0.0) -> None:
+        """初始化快取。"""
+        self.poll_seconds = poll_seconds
+        self.version = 0
+        self._employees: dict[str, CachedEmployee] = {}
+        self._day_rules: dict[DayKey, DayRule | None] = {}
+        self._config_marker: tuple | None = None
+        self._employee_marker: tuple | None = None
+        self._task: asyncio.Task | None = None
+        self.employee_hits = 0
+        self.employee_misses = 0
+        self.rule_hits = 0
+        self.rule_misses = 0
+        self.reloads = 0
+        self.employee_reloads = 0
+        self.poll_failures = 0
+
+    async def start(self) -> None:
+        """啟動規則版本異動的背景輪詢（poll_seconds 為 0 時不啟動）。"""
+        if self.poll_seconds <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="rule-cache-poll")
+
+    async def stop(self) -> None:
+        """停止背景輪詢。"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def poll_once(self) -> bool:
+        """檢查規則版本與員工是否有異動，有則清除對應快取並回傳 True。"""
+        async with read_session() as db:
+            config_marker = await RequiredConfigRepository(db).get_change_marker()
+            employee_marker = await EmployeeRepository(db).get_change_marker()
+        configs_changed = (
+            self._config_marker is not None and config_marker != self._config_marker
+        )
+        employees_changed = (
+            self._employee_marker is not None
+            and employee_marker != self._employee_marker
+        )
+        self._config_marker = config_marker
+        self._employee_marker = employee_marker
+        if configs_changed:
+            self.clear_day_rules()
+            self.reloads += 1
+        if employees_changed:
+            self.clear_employees()
+            self.employee_reloads += 1
+        return configs_changed or employees_changed
+
+    async def _run(self) -> None:
+        """持續定期輪詢；單次失敗不中止，下一輪重試。"""
+        while True:
+            try:
+                await self.poll_once()
+            except Exception:
+                self.poll_failures += 1
+            await asyncio.sleep(self.poll_seconds)
+
+    async def get_employee(
+        self, db: AsyncSession, rfid_id: str
+    ) -> CachedEmployee | None:
+        """取得員工（快取未命中時查詢資料庫）。"""
+        return (await self.get_employees(db, (rfid_id,))).get(rfid_id)
+
+    async def get_employees(
+        self, db: AsyncSession, rfid_ids: Collection[str]
+    ) -> dict[str, CachedEmployee]:
+        """一次取得多位員工，未命中的部分以單一查詢載入。"""
+        found = {}
+        missing = set()
+        for rfid_id in rfid_ids:
+            employee = self._employees.get(rfid_id)
+            if employee is None:
+                missing.add(rfid_id)
+            else:
+                found[rfid_id] = employee
+        self.employee_hits += len(found)
+        if not missing:
+            return found
+
+        self.employee_misses += len(missing)
+        version = self.version
+        loaded = {
+            employee.RFID_ID: CachedEmployee(
+                RFID_ID=employee.RFID_ID,
+                Name=employee.Name,
+                Dept_GUID=employee.Dept_GUID,
+                Active=employee.Active,
+            )
+            for employee in await EmployeeRepository(db).get_by_rfids(missing)
+        }
+        if version == self.version:
+            self._employees.update(loaded)
+        found.update(loaded)
+        return found
+
+    async def get_day_rule(
+        self, db: AsyncSession, dept_guid: str, weekday: int
+    ) -> DayRule | None:
+        """取得部門在指定星期幾的規則（找不到班表時為 None）。"""
+        key = (dept_guid, weekday)
+        return (await self.get_day_rules(db, (key,)))[key]
+
+    async def get_day_rules(
+        self, db: AsyncSession, keys: Collection[DayKey]
+    ) -> dict[DayKey, DayRule | None]:
+        """一次取得多組 (部門, 星期) 規則，未命中的部門以集合查詢載入。"""
+        found = {}
+        missing = set()
+        for key in keys:
+            if key in self._day_rules:
+                found[key] = self._day_rules[key]
+            else:
+                missing.add(key)
+        self.rule_hits += len(found)
+        if not missing:
+            return found
+
+        self.rule_misses += len(missing)
+        version = self.version
+        dept_guids = {dept_guid for dept_guid, _ in missing}
+        schedules = {
+            (schedule.Dept_GUID, schedule.ActiveDay): schedule
+            for schedule in await ScheduleRepository(db).get_active_by_departments(
+                dept_guids
+            )
+        }
+        flex_minutes = {
+            flex_setting.Dept_GUID: flex_setting.FlexMinutes
+            for flex_setting in await FlexSettingRepository(db).get_by_departments(
+                dept_guids
+            )
+        }
+        configs: dict[DayKey, list[CachedConfig]] = {}
+        for config in await RequiredConfigRepository(db).get_by_departments(dept_guids):
+            configs.setdefault((config.Dept_GUID, config.ActiveDay), []).append(
+                CachedConfig(
+                    GUID=config.GUID,
+                    ActiveDay=config.ActiveDay,
+                    EffectiveFrom=config.EffectiveFrom,
+                    EffectiveTo=config.EffectiveTo,
+                )
+            )
+        indexes = {key: ConfigIndex(values) for key, values in configs.items()}
+
+        loaded: dict[DayKey, DayRule | None] = {}
+        for dept_guid, weekday in missing:
+            # 先找特定星期幾的班表，再找全年班表 (ActiveDay = 8)
+            schedule = schedules.get((dept_guid, weekday)) or schedules.get(
+                (dept_guid, 8)
+            )
+            if schedule is None:
+                loaded[(dept_guid, weekday)] = None
+                continue
+            loaded[(dept_guid, weekday)] = DayRule(
+                Schedule_GUID=schedule.GUID,
+                CheckInNeedBefore=schedule.CheckInNeedBefore,
+                CheckNeedOutAfter=schedule.CheckNeedOutAfter,
+                DayCutoff=schedule.DayCutoff,
+                FlexMinutes=flex_minutes.get(dept_guid, 0),
+                configs=(
+                    indexes.get((dept_guid, weekday), EMPTY_CONFIG_INDEX),
+                    indexes.get((dept_guid, 8), EMPTY_CONFIG_INDEX),
+                ),
+            )
+
+        if version == self.version:
+            self._day_rules.update(loaded)
+        found.update(loaded)
+        return found
+
+    def invalidate_employee(self, rfid_id: str) -> None:
+        """員工資料異動時失效該員工。"""
+        self.version += 1
+        self._employees.pop(rfid_id, None)
+
+    def invalidate_employees(self, rfid_ids: Collection[str]) -> None:
+        """批次新增或異動員工時一次失效。"""
+        self.version += 1
+        for rfid_id in rfid_ids:
+            self._employees.pop(rfid_id, None)
+
+    def invalidate_department(self, dept_guid: str) -> None:
+        """部門班表、彈性設定或規則版本異動時失效該部門的規則。"""
+        self.version += 1
+        for key in [key for key in self._day_rules if key[0] == dept_guid]:
+            del self._day_rules[key]
+
+    def clear_day_rules(self) -> None:
+        """清除所有部門的規則（規則版本由其他行程發佈時）。"""
+        self.version += 1
+        self._day_rules.clear()
+
+    def clear_employees(self) -> None:
+        """清除所有員工（員工由其他行程異動時）。"""
+        self.version += 1
+        self._employees.clear()
+
+    def clear(self) -> None:
+        """清除所有快取。"""
+        self.version += 1
+        self._employees.clear()
+        self._day_rules.clear()
+
+    def stats(self) -> dict:
+        """取得快取命中統計。"""
+        return {
+            "version": self.version,
+            "employees": len(self._employees),
+            "day_rules": len(self._day_rules),
+            "employee_hits": self.employee_hits,
+            "employee_misses": self.employee_misses,
+            "rule_hits": self.rule_hits,
+            "rule_misses": self.rule_misses,
+            "reloads": self.reloads,
+            "employee_reloads": self.employee_reloads,
+            "poll_failures": self.poll_failures,
+        }
+
+
+rule_cache = RuleCache(poll_seconds=settings.rule_cache_poll_seconds)
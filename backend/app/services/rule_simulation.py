@@ -0,0 +1,309 @@
+"""考勤規則模擬（what-if）。
+
+HR 調整彈性分鐘或上下班時間前，以部門歷史考勤的上班／下班卡時間試算
+候選規則下的狀態分布與每位員工的差異，不寫入任何資料。
+考勤只載入一次並整批轉成 NumPy 陣列（當日微秒數），每組候選規則都是
+整個陣列的向量比較；候選規則未指定的欄位沿用每筆記錄鎖定的規則版本。
+沒有鎖定規則版本的記錄（規則版本上線前的歷史資料）與重算相同，改以部門目前
+該星期（沒有時為全年）的班表與彈性設定為準；連班表都沒有的日期不列入試算，
+另以 skipped_days 計數。
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import compress
+from time import perf_counter
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.attendance import SCAN_TIME_FIELDS, AttendanceRepository
+from app.repositories.flex_setting import FlexSettingRepository
+from app.repositories.required_config import RequiredConfigRepository
+from app.repositories.schedule import ScheduleRepository
+from app.schemas.rule_simulation import RuleCandidate
+from app.services.rule_cache import MICROSECONDS_PER_DAY, time_of_day
+
+MICROSECONDS_PER_MINUTE = 60_000_000
+
+
+@dataclass
+class StatusCounts:
+    """狀態分布（天數）。"""
+
+    normal: int = 0
+    flex: int = 0
+    late: int = 0
+    early: int = 0
+    missing: int = 0
+
+    @classmethod
+    def from_statuses(
+        cls, check_in: np.ndarray, check_out: np.ndarray
+    ) -> "StatusCounts":
+        """由上班與下班狀態陣列統計。"""
+        normal, flex, late = np.bincount(check_in, minlength=3)[:3].tolist()
+        early, missing = np.bincount(check_out, minlength=3)[1:3].tolist()
+        return cls(normal, flex, late, early, missing)
+
+
+@dataclass
+class EmployeeDelta:
+    """員工狀態天數差異（候選規則減目前）。"""
+
+    RFID_ID: str
+    flex: int
+    late: int
+    early: int
+
+
+@dataclass
+class CandidateResult:
+    """候選規則模擬結果。"""
+
+    name: str
+    counts: StatusCounts
+    changed_days: int
+    employees: list[EmployeeDelta]
+
+
+@dataclass
+class SimulationResult:
+    """規則模擬結果。"""
+
+    dept_guid: str
+    start_date: date
+    end_date: date
+    attendance_days: int = 0
+    live_rule_days: int = 0  # 沒有規則版本、以目前班表試算的天數
+    skipped_days: int = 0  # 沒有規則版本也沒有班表、未列入試算的天數
+    employees: int = 0
+    current: StatusCounts = field(default_factory=StatusCounts)
+    candidates: list[CandidateResult] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+
+def parse_time_of_day(values: Sequence[str]) -> np.ndarray:
+    """把時間字串整批轉成當日微秒數，'NaT' 為 -1。"""
+    times = np.array(values, dtype="datetime64[us]")
+    result = (times - times.astype("datetime64[D]")).astype(np.int64)
+    result[np.isnat(times)] = -1
+    return result
+
+
+def weekdays(values: Sequence[str]) -> np.ndarray:
+    """把日期字串整批轉成星期（週一為 0）。"""
+    # 1970-01-01 為週四
+    return (np.array(values, dtype="datetime64[D]").astype(np.int64) + 3) % 7
+
+
+def parse_statuses(digits: str) -> np.ndarray:
+    """把串接的狀態數字（每天一位）轉成陣列。"""
+    return np.frombuffer(digits.encode(), dtype=np.uint8) - ord("0")
+
+
+def check_in_status(
+    first_in: np.ndarray, required_in: np.ndarray, flex_end: np.ndarray
+) -> np.ndarray:
+    """計算上班打卡狀態，判斷與 DayRule 相同（0=NORMAL, 1=FLEX, 2=LATE）。"""
+    return np.where(
+        first_in <= required_in, 0, np.where(first_in <= flex_end, 1, 2)
+    ).astype(np.int8)
+
+
+def check_out_status(last_out: np.ndarray, required_out: np.ndarray) -> np.ndarray:
+    """計算下班打卡狀態（0=NORMAL, 1=EARLY, 2=MISSING）。"""
+    return np.where(last_out < 0, 2, np.where(last_out >= required_out, 0, 1)).astype(
+        np.int8
+    )
+
+
+class RuleSimulationService:
+    """考勤規則模擬服務（唯讀）。"""
+
+    def __init__(self, db: AsyncSession):
+        """初始化服務。"""
+        self.attendance_repo = AttendanceRepository(db)
+        self.required_config_repo = RequiredConfigRepository(db)
+        self.schedule_repo = ScheduleRepository(db)
+        self.flex_setting_repo = FlexSettingRepository(db)
+
+    async def simulate(
+        self,
+        dept_guid: str,
+        start_date: date,
+        end_date: date,
+        candidates: Sequence[RuleCandidate],
+    ) -> SimulationResult:
+        """以部門在日期區間（含頭尾）的考勤試算多組候選規則。"""
+        started = perf_counter()
+        result = SimulationResult(dept_guid, start_date, end_date)
+        rows = await self.attendance_repo.get_scan_times_by_department(
+            dept_guid, start_date, end_date
+        )
+        # 每組 (員工, 規則版本) 一列，Records 串接了該組每天的各欄位；沒有考勤時為空陣列
+        rfid_ids, config_guids, days, records = zip(*rows) if rows else [()] * 4
+        employees, group_employee = np.unique(rfid_ids, return_inverse=True)
+        # 沒有鎖定規則版本的組以空字串代表
+        guids, group_config = np.unique(
+            [guid or "" for guid in config_guids], return_inverse=True
+        )
+        employee_index = np.repeat(group_employee, days)
+        config_index = np.repeat(group_config, days)
+        fields = ";".join(records).split(";") if rows else []
+        stride = len(SCAN_TIME_FIELDS)
+        work_dates = fields[0::stride]
+        first_in = parse_time_of_day(fields[1::stride])
+        last_out = parse_time_of_day(fields[2::stride])
+        current_in = parse_statuses("".join(fields[3::stride]))
+        current_out = parse_statuses("".join(fields[4::stride]))
+
+        # 每筆記錄鎖定的規則版本（候選規則未指定時的預設值）
+        configs = {
+            config.GUID: config
+            for config in await self.required_config_repo.get_by_ids(
+                [guid for guid in guids.tolist() if guid]
+            )
+        }
+        locked = [configs.get(guid) for guid in guids.tolist()]
+        locked_in = np.array(
+            [time_of_day(config.RequiredIn) if config else 0 for config in locked],
+            dtype=np.int64,
+        )[config_index]
+        locked_flex = np.array(
+            [
+                config.FlexMinutes * MICROSECONDS_PER_MINUTE if config else 0
+                for config in locked
+            ],
+            dtype=np.int64,
+        )[config_index]
+        locked_out = np.array(
+            [time_of_day(config.RequiredOut) if config else 0 for config in locked],
+            dtype=np.int64,
+        )[config_index]
+
+        # 沒有規則版本的天改用部門目前該星期的班表，日期只需解析這些天
+        group_live = np.array([config is None for config in locked], dtype=bool)[
+            group_config
+        ]
+        live = np.repeat(group_live, days)
+        included = np.ones(len(live), dtype=bool)
+        if live.any():
+            weekday = weekdays(list(compress(work_dates, live.tolist())))
+            has_schedule, live_in, live_flex, live_out = await self._live_rules(
+                dept_guid
+            )
+            locked_in[live] = live_in[weekday]
+            locked_flex[live] = live_flex[weekday]
+            locked_out[live] = live_out[weekday]
+            included[live] = has_schedule[weekday]
+            result.live_rule_days = int(np.count_nonzero(included & live))
+            result.skipped_days = int(np.count_nonzero(~included))
+            employee_index = employee_index[included]
+            first_in = first_in[included]
+            last_out = last_out[included]
+            current_in = current_in[included]
+            current_out = current_out[included]
+            locked_in = locked_in[included]
+            locked_flex = locked_flex[included]
+            locked_out = locked_out[included]
+
+        size = len(employees)
+        current_days = {
+            "flex": np.bincount(employee_index[current_in == 1], minlength=size),
+            "late": np.bincount(employee_index[current_in == 2], minlength=size),
+            "early": np.bincount(employee_index[current_out == 1], minlength=size),
+        }
+        result.attendance_days = len(current_in)
+        result.employees = size
+        result.current = StatusCounts.from_statuses(current_in, current_out)
+
+        for number, candidate in enumerate(candidates, start=1):
+            required_in = locked_in
+            if candidate.CheckInNeedBefore is not None:
+                required_in = time_of_day(candidate.CheckInNeedBefore)
+            flex = locked_flex
+            if candidate.FlexMinutes is not None:
+                flex = candidate.FlexMinutes * MICROSECONDS_PER_MINUTE
+            required_out = locked_out
+            if candidate.CheckNeedOutAfter is not None:
+                required_out = time_of_day(candidate.CheckNeedOutAfter)
+
+            # 彈性結束時間跨午夜時與 DayRule 相同，繞回當日
+            flex_end = (required_in + flex) % MICROSECONDS_PER_DAY
+            simulated_in = check_in_status(first_in, required_in, flex_end)
+            simulated_out = check_out_status(last_out, required_out)
+            changed = (simulated_in != current_in) | (simulated_out != current_out)
+
+            deltas = {
+                "flex": np.bincount(employee_index[simulated_in == 1], minlength=size),
+                "late": np.bincount(employee_index[simulated_in == 2], minlength=size),
+                "early": np.bincount(
+                    employee_index[simulated_out == 1], minlength=size
+                ),
+            }
+            for name, days in current_days.items():
+                deltas[name] = deltas[name] - days
+            differs = (deltas["flex"] != 0) | (deltas["late"] != 0)
+            differs |= deltas["early"] != 0
+            result.candidates.append(
+                CandidateResult(
+                    name=candidate.name or f"candidate-{number}",
+                    counts=StatusCounts.from_statuses(simulated_in, simulated_out),
+                    changed_days=int(np.count_nonzero(changed)),
+                    employees=[
+                        EmployeeDelta(*values)
+                        for values in zip(
+                            employees[differs].tolist(),
+                            deltas["flex"][differs].tolist(),
+                            deltas["late"][differs].tolist(),
+                            deltas["early"][differs].tolist(),
+                        )
+                    ],
+                )
+            )
+
+        result.elapsed_ms = round((perf_counter() - started) * 1000, 3)
+        return result
+
+    async def _live_rules(
+        self, dept_guid: str
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """取得部門目前班表依星期（週一為 0）排列的規則陣列。
+
+        傳回是否有班表、上班時間、彈性微秒數與下班時間；特定星期的班表優先，
+        沒有時取全年班表，都沒有時取隔天的班表（與刷卡、重算的 rule_weekdays 相同）。
+        """
+        schedules = {
+            schedule.ActiveDay: schedule
+            for schedule in await self.schedule_repo.get_active_by_departments(
+                [dept_guid]
+            )
+        }
+        flex_settings = await self.flex_setting_repo.get_by_departments([dept_guid])
+        flex = flex_settings[0].FlexMinutes if flex_settings else 0
+        on_weekday = [
+            schedules.get(weekday + 1) or schedules.get(8) for weekday in range(7)
+        ]
+        by_weekday = [
+            on_weekday[weekday] or on_weekday[(weekday + 1) % 7] for weekday in range(7)
+        ]
+        return (
+            np.array([schedule is not None for schedule in by_weekday], dtype=bool),
+            np.array(
+                [
+                    time_of_day(schedule.CheckInNeedBefore) if schedule else 0
+                    for schedule in by_weekday
+                ],
+                dtype=np.int64,
+            ),
+            np.full(7, flex * MICROSECONDS_PER_MINUTE, dtype=np.int64),
+            np.array(
+                [
+                    time_of_day(schedule.CheckNeedOutAfter) if schedule else 0
+                    for schedule in by_weekday
+                ],
+                dtype=np.int64,
+            ),
+        )
@@ -1,148 +1,363 @@
 """刷卡業務邏輯服務。"""
 
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.attendance import AttendanceDaily
-from app.models.scan_event import ScanEvent
+from app.config import settings
+from app.database import UNIT_OF_WORK_KEY, unit_of_work
 from app.repositories.attendance import AttendanceRepository
-from app.repositories.employee import EmployeeRepository
-from app.repositories.flex_setting import FlexSettingRepository
-from app.repositories.required_config import RequiredConfigRepository
+from app.repositories.attendance_monthly import (
+    AttendanceMonthlyRepository,
+    year_month_of,
+)
 from app.repositories.scan_event import ScanEventRepository
-from app.repositories.schedule import ScheduleRepository
 from app.schemas.scan import ScanRequest, ScanResponse
+from app.services.dashboard import dashboard_cache
+from app.services.rfid_filter import known_rfids
+from app.services.rule_cache import (
+    CachedEmployee,
+    DayRule,
+    rule_cache,
+    rule_weekdays,
+    time_of_day,
+)
+from app.services.scan_debounce import scan_debouncer
+from app.utils.locks import StripedLock
+from app.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from app.services.scan_writer import ScanWriter
+
+# 同一張卡的寫入依序進行，不同卡可並行
+scan_locks = StripedLock(settings.scan_lock_stripes)
+
+SCAN_STAGE_SECONDS = metrics.histogram(
+    "scan_stage_seconds", "刷卡各階段耗時", ("stage",)
+)
+_stages = {
+    stage: SCAN_STAGE_SECONDS.labels(stage)
+    for stage in (
+        "debounce",
+        "employee_lookup",
+        "rule_resolution",
+        "group_commit_wait",
+        "lock_wait",
+        "scan_event_insert",
+        "attendance_upsert",
+        "monthly_refresh",
+        "commit",
+    )
+}
+SCAN_RESULTS = metrics.counter("scan_results_total", "刷卡結果數", ("result",))
+
+
+class PendingScan(NamedTuple):
+    """已通過驗證、等待寫入的刷卡事件。"""
+
+    request: ScanRequest
+    event_time: datetime
+    employee: CachedEmployee
+    rule: DayRule
+    work_date: date
 
 
 class ScanService:
     """刷卡服務，處理打卡邏輯。"""
 
-    def __init__(self, db: AsyncSession):
-        """初始化服務。"""
+    def __init__(self, db: AsyncSession, writer: "ScanWriter | None" = None):
+        """初始化服務。
+
+        傳入執行中的 ScanWriter 時，單筆刷卡只在此驗證，寫入交由背景群組提交。
+        """
         self.db = db
-        self.employee_repo = EmployeeRepository(db)
-        self.schedule_repo = ScheduleRepository(db)
-        self.flex_setting_repo = FlexSettingRepository(db)
-        self.required_config_repo = RequiredConfigRepository(db)
+        self.writer = writer
+        self.rule_cache = rule_cache
+        self.debouncer = scan_debouncer
+        self.known_rfids = known_rfids
+        self.dashboard_cache = dashboard_cache
         self.scan_event_repo = ScanEventRepository(db)
         self.attendance_repo = AttendanceRepository(db)
+        self.monthly_repo = AttendanceMonthlyRepository(db)
 
     async def process_scan(self, request: ScanRequest) -> ScanResponse:
         """處理刷卡事件。"""
         event_time = request.event_time or datetime.utcnow()
+        started = perf_counter()
+        duplicate = self.debouncer.check(request.rfid_id, request.device_id, event_time)
+        _stages["debounce"].observe(perf_counter() - started)
+        if duplicate:
+            SCAN_RESULTS.inc("duplicate")
+            return self._duplicate_response()
 
-        # 1. 驗證員工
-        employee = await self.employee_repo.get_by_rfid(request.rfid_id)
-        if not employee:
-            return ScanResponse(success=False, message="無效的 RFID 卡")
+        try:
+            response = await self._process_one(request, event_time)
+        except BaseException:
+            self.debouncer.forget(request.rfid_id, event_time)
+            SCAN_RESULTS.inc("error")
+            raise
+        if not response.success:
+            self.debouncer.forget(request.rfid_id, event_time)
+        SCAN_RESULTS.inc(response.scan_type or "rejected")
+        return response
 
-        if not employee.Active:
-            return ScanResponse(success=False, message="員工已離職")
+    async def process_batch(self, requests: list[ScanRequest]) -> list[ScanResponse]:
+        """批次處理刷卡事件，以集合查詢取得規則並於單一交易寫入。"""
+        event_times = [request.event_time or datetime.utcnow() for request in requests]
+        responses: list[ScanResponse | None] = [None] * len(requests)
 
-        # 2. 取得班表和彈性設定
-        weekday = event_time.weekday() + 1  # Python 是 0-6，我們要 1-7
-        schedule = await self.schedule_repo.get_schedule_for_date(
-            employee.Dept_GUID, weekday
-        )
-        if not schedule:
-            return ScanResponse(
-                success=False,
-                message="找不到適用的班表",
-                employee_name=employee.Name,
+        # 依刷卡時間檢查重複，讀卡機緩衝中的重複感應只保留第一筆
+        accepted = []
+        for index in sorted(range(len(requests)), key=lambda i: event_times[i]):
+            request = requests[index]
+            if self.debouncer.check(
+                request.rfid_id, request.device_id, event_times[index]
+            ):
+                responses[index] = self._duplicate_response()
+            else:
+                accepted.append(index)
+
+        try:
+            resolved = await self._resolve(
+                [requests[index] for index in accepted],
+                [event_times[index] for index in accepted],
             )
+            pending = [
+                (position, item)
+                for position, item in enumerate(resolved)
+                if isinstance(item, PendingScan)
+            ]
+            if pending:
+                written = await self.write_scans([item for _, item in pending])
+                for (position, _), response in zip(pending, written):
+                    resolved[position] = response
+        except BaseException:
+            for index in accepted:
+                self.debouncer.forget(requests[index].rfid_id, event_times[index])
+            raise
 
-        flex_setting = await self.flex_setting_repo.get_by_department(
-            employee.Dept_GUID
-        )
-        flex_minutes = flex_setting.FlexMinutes if flex_setting else 0
+        for index, response in zip(accepted, resolved):
+            responses[index] = response
+            if not response.success:
+                self.debouncer.forget(requests[index].rfid_id, event_times[index])
+        for response in responses:
+            SCAN_RESULTS.inc(response.scan_type or "rejected")
+        return responses
 
-        # 3. 使用 DayCutoff 決定 WorkDate
-        work_date = self._calculate_work_date(event_time, schedule.DayCutoff)
+    async def _process_one(
+        self, request: ScanRequest, event_time: datetime
+    ) -> ScanResponse:
+        """驗證並寫入單筆刷卡，群組提交模式下交由背景寫入者。"""
+        resolved = (await self._resolve([request], [event_time]))[0]
+        if isinstance(resolved, ScanResponse):
+            return resolved
 
-        # 4. 建立 ScanEvent
-        scan_event = ScanEvent(
-            RFID_ID=request.rfid_id,
-            Device_ID=request.device_id,
-            EventTime=event_time,
-        )
-        await self.scan_event_repo.create(scan_event)
+        if self.writer is not None and self.writer.running:
+            # 釋放驗證查詢佔用的連線，背景寫入者需要取得寫入連線
+            await self.db.rollback()
+            started = perf_counter()
+            response = await self.writer.submit(resolved)
+            _stages["group_commit_wait"].observe(perf_counter() - started)
+            return response
 
-        # 5. Upsert AttendanceDaily
-        attendance = await self.attendance_repo.get_by_employee_and_date(
-            request.rfid_id, work_date
-        )
+        return (await self.write_scans([resolved]))[0]
+
+    async def write_scans(self, scans: list[PendingScan]) -> list[ScanResponse]:
+        """以單一交易寫入已驗證的刷卡事件，回應順序與傳入順序相同。"""
+        responses: list[ScanResponse | None] = [None] * len(scans)
+
+        # 一律先取鎖再取連線：先釋放驗證查詢佔用的連線，避免與持鎖者互等
+        if self.db.in_transaction() and not self.db.info.get(UNIT_OF_WORK_KEY):
+            await self.db.rollback()
+
+        started = perf_counter()
+        async with (
+            scan_locks.acquire_many(scan.request.rfid_id for scan in scans),
+            unit_of_work(self.db),
+        ):
+            locked = perf_counter()
+            _stages["lock_wait"].observe(locked - started)
+
+            # 1. 批次寫入 ScanEvent
+            await self.scan_event_repo.bulk_insert(
+                [
+                    {
+                        "RFID_ID": scan.request.rfid_id,
+                        "Device_ID": scan.request.device_id,
+                        "EventTime": scan.event_time,
+                    }
+                    for scan in scans
+                ]
+            )
+            inserted = perf_counter()
+            _stages["scan_event_insert"].observe(inserted - locked)
 
-        if attendance is None:
-            # 第一次打卡 - 鎖定規則
-            required_config = (
-                await self.required_config_repo.get_current_config_for_department(
-                    employee.Dept_GUID, weekday, work_date
+            # 2. 依刷卡時間順序 Upsert AttendanceDaily，同卡同日以第一筆為上班卡
+            clock_ins: list[tuple[str, str, int]] = []
+            months: dict[str, set[str]] = {}
+            for index in sorted(range(len(scans)), key=lambda i: scans[i].event_time):
+                scan = scans[index]
+                response, created = await self._upsert_attendance(
+                    scan.request.rfid_id,
+                    scan.event_time,
+                    scan.employee,
+                    scan.rule,
+                    scan.work_date,
                 )
+                responses[index] = response
+                year_month = year_month_of(scan.work_date)
+                if created:
+                    clock_ins.append(
+                        (scan.request.rfid_id, year_month, response.check_in_status)
+                    )
+                else:
+                    months.setdefault(year_month, set()).add(scan.request.rfid_id)
+            upserted = perf_counter()
+            _stages["attendance_upsert"].observe(upserted - inserted)
+
+            # 3. 在同一交易內更新月彙總：新增的上班卡以增量計入，
+            # 下班卡（與補到缺勤記錄的上班卡）才重新彙總該員工當月
+            await self.monthly_repo.add_clock_ins(
+                clock_in
+                for clock_in in clock_ins
+                if clock_in[0] not in months.get(clock_in[1], ())
             )
+            for year_month, rfid_ids in months.items():
+                await self.monthly_repo.refresh(year_month, rfid_ids, prune=False)
+            refreshed = perf_counter()
+            _stages["monthly_refresh"].observe(refreshed - upserted)
+        _stages["commit"].observe(perf_counter() - refreshed)
+
+        for scan in scans:
+            self.dashboard_cache.invalidate(scan.work_date, scan.employee.Dept_GUID)
+        return responses
+
+    async def _resolve(
+        self, requests: list[ScanRequest], event_times: list[datetime]
+    ) -> list[ScanResponse | PendingScan]:
+        """驗證員工並決定班表與 WorkDate，未通過者直接回傳失敗回應。"""
+        # 1. 一次取得所有員工與 (部門, 星期) 規則，filter 判定不存在的卡號原則上不查詢
+        started = perf_counter()
+        rfid_ids = {request.rfid_id for request in requests}
+        known = {
+            rfid_id for rfid_id in rfid_ids if self.known_rfids.might_exist(rfid_id)
+        }
+        # filter 外的卡號可能是未經員工 API 新增的員工，限額內仍查詢資料庫
+        rechecked = {
+            rfid_id for rfid_id in rfid_ids - known if self.known_rfids.allow_recheck()
+        }
+        employees = await self.rule_cache.get_employees(self.db, known | rechecked)
+        if rechecked:
+            self.known_rfids.recover(rechecked & employees.keys())
+        looked_up = perf_counter()
+        _stages["employee_lookup"].observe(looked_up - started)
+        # 日切點由刷卡當天星期的班表決定
+        cutoff_rules = await self.rule_cache.get_day_rules(
+            self.db,
+            {
+                # Python 是 0-6，我們要 1-7
+                (employees[request.rfid_id].Dept_GUID, event_time.weekday() + 1)
+                for request, event_time in zip(requests, event_times)
+                if request.rfid_id in employees
+            },
+        )
+
+        # 2. 驗證員工、取得班表並使用 DayCutoff 決定 WorkDate
+        resolved: list[ScanResponse | PendingScan | None] = []
+        work_dates: list[date | None] = []
+        for request, event_time in zip(requests, event_times):
+            work_dates.append(None)
+            employee = employees.get(request.rfid_id)
+            if not employee:
+                resolved.append(ScanResponse(success=False, message="無效的 RFID 卡"))
+                continue
+
+            if not employee.Active:
+                resolved.append(ScanResponse(success=False, message="員工已離職"))
+                continue
+
+            rule = cutoff_rules[(employee.Dept_GUID, event_time.weekday() + 1)]
+            if not rule:
+                resolved.append(
+                    ScanResponse(
+                        success=False,
+                        message="找不到適用的班表",
+                        employee_name=employee.Name,
+                    )
+                )
+                continue
 
-            attendance = AttendanceDaily(
-                RFID_ID=request.rfid_id,
-                WorkDate=work_date,
-                RequiredConfigGUID=required_config.GUID if required_config else None,
-                FirstInTime=event_time,
-                CheckInStatus=self._calculate_check_in_status(
-                    event_time.time(),
-                    schedule.CheckInNeedBefore,
-                    flex_minutes,
-                ),
-                CheckOutStatus=2,  # MISSING
+            work_dates[-1] = rule.work_date(event_time, time_of_day(event_time))
+            resolved.append(None)
+
+        # 3. 狀態與規則版本由 WorkDate 的星期決定（與重算相同，見 rule_weekdays）
+        rules = await self.rule_cache.get_day_rules(
+            self.db,
+            {
+                (employees[request.rfid_id].Dept_GUID, weekday)
+                for request, work_date in zip(requests, work_dates)
+                if work_date is not None
+                for weekday in rule_weekdays(work_date)
+            },
+        )
+        _stages["rule_resolution"].observe(perf_counter() - looked_up)
+        for position, (request, event_time, work_date) in enumerate(
+            zip(requests, event_times, work_dates)
+        ):
+            if work_date is None:
+                continue
+            employee = employees[request.rfid_id]
+            rule = next(
+                rule
+                for weekday in rule_weekdays(work_date)
+                if (rule := rules[(employee.Dept_GUID, weekday)]) is not None
             )
-            await self.attendance_repo.create(attendance)
-            scan_type = "clock_in"
-        else:
-            # 後續打卡 - 更新 LastOutTime
-            attendance.LastOutTime = event_time
-            attendance.CheckOutStatus = self._calculate_check_out_status(
-                event_time.time(),
-                schedule.CheckNeedOutAfter,
+            resolved[position] = PendingScan(
+                request, event_time, employee, rule, work_date
             )
-            await self.attendance_repo.update(attendance)
-            scan_type = "clock_out"
+        return resolved
 
+    @staticmethod
+    def _duplicate_response() -> ScanResponse:
+        """去彈跳視窗內的重複刷卡回應（不寫入資料庫）。"""
         return ScanResponse(
+            success=True, message="重複刷卡，已忽略", scan_type="duplicate"
+        )
+
+    async def _upsert_attendance(
+        self,
+        rfid_id: str,
+        event_time: datetime,
+        employee: CachedEmployee,
+        rule: DayRule,
+        work_date: date,
+    ) -> tuple[ScanResponse, bool]:
+        """原子 Upsert AttendanceDaily 並組成刷卡回應。
+
+        上班卡狀態與鎖定的規則版本只在新增時寫入，下班卡狀態只在已存在時更新，
+        由資料庫的 (RFID_ID, WorkDate) 唯一索引決定本次屬於哪一種。
+        另回傳本次是否新增了每日記錄。
+        """
+        required_config = rule.pick_config(work_date)
+        scan_time = time_of_day(event_time)
+        attendance = await self.attendance_repo.upsert_scan(
+            rfid_id=rfid_id,
+            work_date=work_date,
+            event_time=event_time,
+            required_config_guid=required_config.GUID if required_config else None,
+            check_in_status=rule.check_in_status(scan_time),
+            check_out_status=rule.check_out_status(scan_time),
+        )
+
+        response = ScanResponse(
             success=True,
             message="打卡成功",
             employee_name=employee.Name,
             work_date=work_date.isoformat(),
-            scan_type=scan_type,
+            scan_type="clock_in" if attendance.LastOutTime is None else "clock_out",
             check_in_status=attendance.CheckInStatus,
             check_out_status=attendance.CheckOutStatus,
         )
-
-    def _calculate_work_date(self, event_time: datetime, day_cutoff: time) -> date:
-        """根據 DayCutoff 計算工作日期。"""
-        cutoff_datetime = datetime.combine(event_time.date(), day_cutoff)
-
-        if event_time < cutoff_datetime:
-            # 刷卡時間在日切點之前，屬於前一天
-            return event_time.date() - timedelta(days=1)
-        return event_time.date()
-
-    def _calculate_check_in_status(
-        self, scan_time: time, required_in: time, flex_minutes: int
-    ) -> int:
-        """計算上班打卡狀態。"""
-        # 計算彈性結束時間
-        required_in_dt = datetime.combine(date.today(), required_in)
-        flex_end_dt = required_in_dt + timedelta(minutes=flex_minutes)
-        flex_end_time = flex_end_dt.time()
-
-        if scan_time <= required_in:
-            return 0  # NORMAL
-        elif scan_time <= flex_end_time:
-            return 1  # FLEX
-        else:
-            return 2  # LATE
-
-    def _calculate_check_out_status(self, scan_time: time, required_out: time) -> int:
-        """計算下班打卡狀態。"""
-        if scan_time >= required_out:
-            return 0  # NORMAL
-        else:
-            return 1  # EARLY
+        return response, bool(attendance.Inserted)
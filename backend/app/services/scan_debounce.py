@@ -0,0 +1,84 @@
+"""同卡重複刷卡的去彈跳視窗（行程內）。
+
+讀卡機常把一次實體感應回報 2-5 次，相隔僅數百毫秒；同一張卡在視窗內的
+後續刷卡視為重複，不寫入資料庫。紀錄依加入時間排序並有筆數上限，
+過期項目在每次檢查時從最舊的一端清除。
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from app.config import settings
+
+
+class ScanDebouncer:
+    """以刷卡時間判斷同卡重複刷卡。"""
+
+    def __init__(self, window_ms: int, max_entries: int) -> None:
+        """初始化視窗長度與筆數上限（window_ms 為 0 表示停用）。"""
+        self.window_ms = window_ms
+        self.max_entries = max_entries
+        # RFID_ID -> (最後接受的刷卡時間, 過期的 monotonic 時間)
+        self._entries: OrderedDict[str, tuple[datetime, float]] = OrderedDict()
+        self.accepted = 0
+        self.suppressed_by_device: dict[str, int] = {}
+
+    def check(self, rfid_id: str, device_id: str, event_time: datetime) -> bool:
+        """檢查是否為重複刷卡；非重複時先保留此卡的視窗。"""
+        if self.window_ms <= 0:
+            return False
+
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._entries.get(rfid_id)
+        if entry is not None:
+            elapsed_ms = abs((event_time - entry[0]).total_seconds()) * 1000
+            if elapsed_ms < self.window_ms:
+                self.suppressed_by_device[device_id] = (
+                    self.suppressed_by_device.get(device_id, 0) + 1
+                )
+                return True
+
+        self._entries[rfid_id] = (event_time, now + self.window_ms / 1000)
+        self._entries.move_to_end(rfid_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.accepted += 1
+        return False
+
+    def forget(self, rfid_id: str, event_time: datetime) -> None:
+        """刷卡未成功寫入時釋放保留，讓讀卡機重送不被視為重複。"""
+        entry = self._entries.get(rfid_id)
+        if entry is not None and entry[0] == event_time:
+            del self._entries[rfid_id]
+
+    def _expire(self, now: float) -> None:
+        """從最舊的一端清除已過期的紀錄。"""
+        while self._entries:
+            _, expires_at = next(iter(self._entries.values()))
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清除所有紀錄與統計。"""
+        self._entries.clear()
+        self.accepted = 0
+        self.suppressed_by_device.clear()
+
+    def stats(self) -> dict:
+        """取得去彈跳統計，重複次數依讀卡機分列。"""
+        return {
+            "window_ms": self.window_ms,
+            "entries": len(self._entries),
+            "accepted": self.accepted,
+            "suppressed": sum(self.suppressed_by_device.values()),
+            "suppressed_by_device": dict(self.suppressed_by_device),
+        }
+
+
+scan_debouncer = ScanDebouncer(
+    window_ms=settings.scan_debounce_ms,
+    max_entries=settings.scan_debounce_max_entries,
+)
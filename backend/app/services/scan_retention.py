@@ -0,0 +1,133 @@
+"""刷卡事件保留與封存。
+
+ScanEvents 一年成長數千萬筆，超過保留月數的事件依月份封存為本機的欄式
+區段檔（格式見 app.repositories.scan_archive），再自線上資料表刪除：
+
+1. 依 (RFID_ID, EventTime, GUID) 串流該月的線上事件，與既有區段（前次中斷
+   或晚到的事件）合併去除重複，寫成新的區段檔後才原子地取代
+2. 依員工分批刪除已寫入區段的線上事件，每批各自提交，刷卡寫入只需等待單批
+
+任何一步中斷都可重新執行；刪除完成前查詢會以 GUID 去除兩邊的重複。
+重算只讀取線上事件，已封存月份的考勤不會被重算改動。
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import unit_of_work
+from app.repositories.attendance_monthly import month_bounds, year_month_of
+from app.repositories.scan_archive import ArchivedScan, ScanArchive
+from app.repositories.scan_event import ScanEventRepository
+
+# 晚於「開始封存前此時間」寫入的事件可能尚未提交而沒被讀到，留在線上待下次封存
+CREATED_MARGIN = timedelta(minutes=5)
+
+
+@dataclass
+class ArchiveResult:
+    """單月封存結果。"""
+
+    year_month: str
+    archived: int = 0  # 區段檔的總列數（含先前已封存的）
+    deleted: int = 0
+    segment_bytes: int = 0
+    elapsed_ms: float = 0.0
+
+
+def retention_cutoff(today: date, retention_months: int) -> date:
+    """取得保留期限：此日期（月初）之前的月份都要封存。"""
+    months = today.year * 12 + today.month - 1 - retention_months
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _sort_key(scan: ArchivedScan) -> tuple:
+    """區段檔的排序鍵。"""
+    return scan.RFID_ID, scan.EventTime, scan.GUID
+
+
+class ScanRetentionService:
+    """刷卡事件封存服務。"""
+
+    def __init__(self, db: AsyncSession, archive: ScanArchive | None = None):
+        """初始化服務。"""
+        self.db = db
+        self.scan_event_repo = ScanEventRepository(db)
+        self.archive = archive or self.scan_event_repo.archive
+        self.row_group_size = settings.scan_archive_row_group_size
+        self.delete_batch_size = settings.scan_archive_delete_batch_size
+
+    async def archive_expired(
+        self, today: date, retention_months: int
+    ) -> list[ArchiveResult]:
+        """依序封存保留期限之前的月份，回傳有線上事件的月份的結果。"""
+        cutoff = retention_cutoff(today, retention_months)
+        oldest = await self.scan_event_repo.get_oldest_event_time(
+            datetime.combine(cutoff, time.min)
+        )
+        await self.db.rollback()
+        if oldest is None:
+            return []
+
+        results = []
+        year_month = year_month_of(oldest)
+        while month_bounds(year_month)[0] < cutoff:
+            result = await self.archive_month(year_month)
+            if result.archived:
+                results.append(result)
+            year_month = year_month_of(month_bounds(year_month)[1])
+        return results
+
+    async def archive_month(self, year_month: str) -> ArchiveResult:
+        """封存指定月份；沒有線上事件時不改動既有區段。"""
+        started = perf_counter()
+        result = ArchiveResult(year_month=year_month)
+        first_day, next_month = month_bounds(year_month)
+        start = datetime.combine(first_day, time.min)
+        end = datetime.combine(next_month, time.min)
+        created_before = datetime.utcnow() - CREATED_MARGIN
+
+        existing = self.archive.iter_month(year_month)
+        head = next(existing, None)
+        writer = self.archive.writer(year_month, self.row_group_size)
+        live = 0
+        try:
+            async for rows in self.scan_event_repo.stream_for_archive(start, end):
+                for row in rows:
+                    scan = ArchivedScan(*row)
+                    key = _sort_key(scan)
+                    while head is not None and _sort_key(head) < key:
+                        writer.append(head)
+                        head = next(existing, None)
+                    if head is not None and _sort_key(head) == key:
+                        head = next(existing, None)
+                    writer.append(scan)
+                    live += 1
+            while head is not None:
+                writer.append(head)
+                head = next(existing, None)
+            if live == 0:
+                writer.abort()
+            else:
+                result.segment_bytes = writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+        # 結束串流的讀取交易，之後的刪除各自開啟寫入交易
+        await self.db.rollback()
+
+        if live:
+            result.archived = writer.rows
+            for offset in range(0, len(writer.rfids), self.delete_batch_size):
+                async with unit_of_work(self.db):
+                    result.deleted += await self.scan_event_repo.delete_archived(
+                        writer.rfids[offset : offset + self.delete_batch_size],
+                        start,
+                        end,
+                        created_before,
+                    )
+        result.elapsed_ms = round((perf_counter() - started) * 1000, 3)
+        return result
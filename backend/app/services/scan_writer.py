@@ -0,0 +1,182 @@
+"""刷卡群組提交寫入者。
+
+group_commit 模式下，刷卡請求驗證完成後把寫入交給背景寫入者；寫入者從有界
+佇列收集最多 N 筆或等待最多 M 毫秒，以單一交易寫入後才讓各請求回應，
+因此回應成功即代表已提交。佇列滿時拒絕新刷卡，由路由回應 503。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from app.config import settings
+from app.database import async_session
+from app.schemas.scan import ScanResponse
+from app.services.scan import PendingScan, ScanService
+
+
+class ScanQueueFullError(Exception):
+    """寫入佇列已滿。"""
+
+
+@dataclass(slots=True)
+class _QueuedScan:
+    """佇列中的刷卡事件與等待回應的 future。"""
+
+    scan: PendingScan
+    future: asyncio.Future = field(repr=False)
+
+
+class ScanWriter:
+    """以有界 asyncio 佇列實作的群組提交寫入者。"""
+
+    def __init__(
+        self, max_batch_size: int, max_delay_ms: int, max_queue_size: int
+    ) -> None:
+        """初始化寫入者。"""
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue[_QueuedScan] | None = None
+        self._task: asyncio.Task | None = None
+        self.commits = 0
+        self.committed_scans = 0
+        self.rejected = 0
+        self.failures = 0
+        self.last_batch_size = 0
+        self.max_batch_seen = 0
+        self.last_commit_ms = 0.0
+        self.total_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        """寫入者是否在執行中。"""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """啟動背景寫入工作。"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run(), name="scan-writer")
+
+    async def stop(self) -> None:
+        """寫完佇列中剩餘的刷卡後停止。"""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, scan: PendingScan) -> ScanResponse:
+        """排入刷卡事件並等待群組提交完成。"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_QueuedScan(scan, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ScanQueueFullError from None
+        return await future
+
+    async def _run(self) -> None:
+        """持續收集批次並提交。"""
+        while True:
+            batch = await self._collect()
+            try:
+                await self._commit(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _collect(self) -> list[_QueuedScan]:
+        """等待第一筆後，收集至批次上限或等待逾時為止。"""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _commit(self, batch: list[_QueuedScan]) -> None:
+        """以單一交易寫入批次；失敗時逐筆重試，只讓出錯的刷卡收到例外。"""
+        started = time.perf_counter()
+        try:
+            responses = await self._write([item.scan for item in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                self.failures += 1
+                self._resolve(batch[0], exc)
+                return
+            for item in batch:
+                await self._commit([item])
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.commits += 1
+        self.committed_scans += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.last_commit_ms = elapsed_ms
+        self.total_commit_ms += elapsed_ms
+        self.max_commit_ms = max(self.max_commit_ms, elapsed_ms)
+        for item, response in zip(batch, responses):
+            self._resolve(item, response)
+
+    async def _write(self, scans: list[PendingScan]) -> list[ScanResponse]:
+        """開啟寫入 session 並寫入刷卡事件。"""
+        async with async_session() as db:
+            return await ScanService(db).write_scans(scans)
+
+    @staticmethod
+    def _resolve(item: _QueuedScan, result: ScanResponse | Exception) -> None:
+        """設定等待中請求的結果（請求已取消時略過）。"""
+        if item.future.done():
+            return
+        if isinstance(result, Exception):
+            item.future.set_exception(result)
+        else:
+            item.future.set_result(result)
+
+    def stats(self) -> dict:
+        """取得佇列深度、批次大小與提交延遲統計。"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "commits": self.commits,
+            "committed_scans": self.committed_scans,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_seen,
+            "avg_batch_size": (
+                self.committed_scans / self.commits if self.commits else 0.0
+            ),
+            "last_commit_ms": round(self.last_commit_ms, 3),
+            "avg_commit_ms": (
+                round(self.total_commit_ms / self.commits, 3) if self.commits else 0.0
+            ),
+            "max_commit_ms": round(self.max_commit_ms, 3),
+        }
+
+
+scan_writer = ScanWriter(
+    max_batch_size=settings.scan_group_commit_max_events,
+    max_delay_ms=settings.scan_group_commit_max_delay_ms,
+    max_queue_size=settings.scan_group_commit_queue_size,
+)
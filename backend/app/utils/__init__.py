@@ -1 +1,13 @@
 """工具函數。"""
+
+from app.utils.bloom import BloomFilter
+from app.utils.locks import StripedLock
+from app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+__all__ = [
+    "BloomFilter",
+    "StripedLock",
+    "InvalidCursorError",
+    "decode_cursor",
+    "encode_cursor",
+]
@@ -0,0 +1,54 @@
+"""Bloom filter。"""
+
+import math
+from collections.abc import Iterable
+from hashlib import blake2b
+
+
+class BloomFilter:
+    """以 bytearray 實作的 Bloom filter。
+
+    只會誤判「可能存在」，不會把已加入的 key 判為不存在；不支援刪除。
+    以 blake2b 產生兩個 64 位元雜湊，再以 double hashing 推出 k 個位置。
+    100,000 個 key、誤判率 0.001 時為 1,437,759 位元（約 176 KiB）、k = 10。
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """依預期數量與誤判率決定位元數與雜湊次數。"""
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        """計算 key 對應的位元位置。"""
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        """加入 key。"""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        """加入多個 key。"""
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        """判斷 key 是否可能存在。"""
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    @property
+    def memory_bytes(self) -> int:
+        """位元陣列佔用的位元組數。"""
+        return len(self._bits)
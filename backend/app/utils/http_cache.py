@@ -0,0 +1,241 @@
+"""參考資料路由的 HTTP 快取（行程內）。
+
+部門、員工、班表、彈性設定很少變動，讀卡機與管理介面卻不斷輪詢。每個資料表
+有一個版本號，由寫入路由在提交後遞增；GET 回應帶有由版本號產生的強 ETag，
+If-None-Match 相符時直接回 304，不查詢也不序列化。版本未變時再以
+(路徑, 查詢參數) 快取序列化好的回應本文，沒有帶 ETag 的輪詢也不必查詢。
+
+其他行程（另一個 worker、database/*.py 腳本）的寫入由背景輪詢各資料表的
+異動標記（Repository.get_change_marker）發現，每 poll_seconds 秒檢查一次，
+變動時遞增該表的版本。
+
+版本號每次啟動時重新計數，ETag 另含啟動時產生的識別碼，重啟後舊的 ETag
+不會誤判為相符。
+"""
+
+import asyncio
+import secrets
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from urllib.parse import parse_qsl
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.config import settings
+from app.database import read_session
+from app.repositories.base import BaseRepository
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]  # (路徑, 排序後的查詢參數)
+
+CACHE_CONTROL = "no-cache"  # 可以快取，但每次使用前須以 ETag 重新驗證
+_SKIPPED_HEADERS = {"content-length", "etag", "cache-control"}
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    """快取的回應。"""
+
+    table: str
+    version: int
+    body: bytes
+    headers: dict[str, str]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """判斷 If-None-Match 是否與 ETag 相符（弱比較，可為多個值）。
+
+    * 須確認資源存在才算相符，由呼叫端在取得回應後判斷。
+    """
+    if not if_none_match:
+        return False
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class ResponseCache:
+    """資料表版本號與序列化回應快取（LRU）。"""
+
+    def __init__(self, max_entries: int, poll_seconds: float = 0.0) -> None:
+        """初始化快取。"""
+        self.max_entries = max_entries
+        self.poll_seconds = poll_seconds
+        self._instance = secrets.token_hex(4)
+        self._versions: dict[str, int] = {}
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._sources: dict[str, type[BaseRepository]] = {}
+        self._markers: dict[str, tuple] = {}
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.reloads = 0
+        self.poll_failures = 0
+
+    def watch(self, table: str, source: type[BaseRepository]) -> None:
+        """登記資料表的異動標記來源，輪詢時比對。"""
+        self._sources[table] = source
+
+    async def start(self) -> None:
+        """啟動異動標記的背景輪詢（poll_seconds 為 0 時不啟動）。"""
+        if self.poll_seconds <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="http-cache-poll")
+
+    async def stop(self) -> None:
+        """停止背景輪詢。"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def poll_once(self) -> list[str]:
+        """比對各資料表的異動標記，遞增有異動的資料表版本並回傳其名稱。"""
+        async with read_session() as db:
+            markers = {
+                table: await source(db).get_change_marker()
+                for table, source in self._sources.items()
+            }
+        changed = [
+            table
+            for table, marker in markers.items()
+            if table in self._markers and marker != self._markers[table]
+        ]
+        self._markers.update(markers)
+        for table in changed:
+            self.bump(table)
+            self.reloads += 1
+        return changed
+
+    async def _run(self) -> None:
+        """持續定期輪詢；單次失敗不中止，下一輪重試。"""
+        while True:
+            try:
+                await self.poll_once()
+            except Exception:
+                self.poll_failures += 1
+            await asyncio.sleep(self.poll_seconds)
+
+    def etag(self, table: str) -> str:
+        """取得資料表目前版本的 ETag。"""
+        return f'"{table}-{self._instance}-{self._versions.get(table, 0)}"'
+
+    def bump(self, table: str) -> None:
+        """資料表異動（已提交）後遞增版本並移除該表的快取回應。"""
+        self._versions[table] = self._versions.get(table, 0) + 1
+        self.invalidations += 1
+        for key in [key for key, e in self._entries.items() if e.table == table]:
+            del self._entries[key]
+
+    async def respond(
+        self,
+        table: str,
+        request: Request,
+        handler: Callable[[Request], Awaitable[Response]],
+    ) -> Response:
+        """以 304、快取的本文或路由處理函式回應 GET 請求。"""
+        version = self._versions.get(table, 0)
+        etag = self.etag(table)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        # If-None-Match: * 只在資源存在（快取或處理函式回 200）時回 304
+        any_match = if_none_match is not None and if_none_match.strip() == "*"
+
+        key = (
+            request.url.path,
+            tuple(sorted(parse_qsl(request.url.query, keep_blank_values=True))),
+        )
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            if any_match:
+                self.not_modified += 1
+                return Response(status_code=304, headers=headers)
+            return Response(content=entry.body, headers={**entry.headers, **headers})
+
+        self.misses += 1
+        response = await handler(request)
+        body = getattr(response, "body", None)
+        if response.status_code != 200 or body is None:
+            return response
+        # 處理期間資料表已異動時不寫回，避免把異動前讀到的資料放進快取
+        if version == self._versions.get(table, 0):
+            self._entries[key] = _Entry(
+                table=table,
+                version=version,
+                body=body,
+                headers={
+                    name: value
+                    for name, value in response.headers.items()
+                    if name not in _SKIPPED_HEADERS
+                },
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if any_match:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return response
+
+    def clear(self) -> None:
+        """清除所有快取並使所有 ETag 失效。"""
+        self._instance = secrets.token_hex(4)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """取得快取命中統計。"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "reloads": self.reloads,
+            "poll_failures": self.poll_failures,
+        }
+
+
+response_cache = ResponseCache(
+    settings.http_cache_max_entries, poll_seconds=settings.http_cache_poll_seconds
+)
+
+
+def cached_route(table: str, source: type[BaseRepository]) -> type[APIRoute]:
+    """建立 GET 回應經由 response_cache 的路由類別，用於 APIRouter(route_class=...)。
+
+    快取在相依注入之前判斷，命中時不取得資料庫 session；source 為該資料表的
+    Repository 類別，以其異動標記發現其他行程的寫入。
+    """
+    response_cache.watch(table, source)
+
+    class CachedRoute(APIRoute):
+        """GET 回應以資料表版本快取的路由。"""
+
+        def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+            """包裝 GET 的處理函式。"""
+            handler = super().get_route_handler()
+            if "GET" not in self.methods:
+                return handler
+
+            async def cached_handler(request: Request) -> Response:
+                if not settings.http_cache_enabled:
+                    return await handler(request)
+                return await response_cache.respond(table, request, handler)
+
+            return cached_handler
+
+    return CachedRoute
@@ -0,0 +1,55 @@
+"""行程內的分段 asyncio 鎖。"""
+
+import asyncio
+from collections.abc import AsyncIterator, Hashable, Iterable
+from contextlib import asynccontextmanager
+
+
+class StripedLock:
+    """以 hash(key) 分段的 asyncio 鎖。
+
+    同一個 key 永遠落在同一段而依序執行，不同 key 大多落在不同段而可並行；
+    一次取得多段時依段號排序，避免兩個批次互相等待。
+    """
+
+    def __init__(self, stripes: int = 256) -> None:
+        """初始化指定段數的鎖。"""
+        self._locks = [asyncio.Lock() for _ in range(stripes)]
+        self.acquisitions = 0
+        self.contended = 0
+
+    def stripe(self, key: Hashable) -> int:
+        """取得 key 所屬的段號。"""
+        return hash(key) % len(self._locks)
+
+    @asynccontextmanager
+    async def acquire(self, key: Hashable) -> AsyncIterator[None]:
+        """取得單一 key 的鎖。"""
+        async with self.acquire_many((key,)):
+            yield
+
+    @asynccontextmanager
+    async def acquire_many(self, keys: Iterable[Hashable]) -> AsyncIterator[None]:
+        """依段號順序取得多個 key 的鎖，離開時反向釋放。"""
+        acquired: list[asyncio.Lock] = []
+        try:
+            for stripe in sorted({self.stripe(key) for key in keys}):
+                lock = self._locks[stripe]
+                self.acquisitions += 1
+                if lock.locked():
+                    self.contended += 1
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    def stats(self) -> dict:
+        """取得鎖的使用統計。"""
+        return {
+            "stripes": len(self._locks),
+            "held": sum(lock.locked() for lock in self._locks),
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+        }
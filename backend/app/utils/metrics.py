@@ -0,0 +1,286 @@
+"""行程內的低開銷指標與 Prometheus 文字格式輸出。
+
+直方圖以固定 bucket 加 bisect 記錄，預先以 labels() 取得序列後一次 observe 約 0.3 微秒；
+各服務的 stats() 以 collector 形式在輸出時才讀取，熱路徑不需額外成本。
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 秒：100 微秒到 5 秒
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+def _escape(value: object) -> str:
+    """跳脫標籤值中的反斜線、雙引號與換行。"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """組成 Prometheus 標籤字串。"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """格式化數值。"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """只增不減的計數器。"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        """初始化計數器。"""
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """遞增計數。"""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        """輸出 Prometheus 文字格式。"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in self._values.items():
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class HistogramSeries:
+    """直方圖中一組標籤值的計數；熱路徑可先以 labels() 取得再重複使用。"""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        """初始化各 bucket 計數（最後一格為 +Inf）。"""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """記錄一次觀測值。"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Histogram:
+    """固定 bucket 的直方圖。"""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """初始化直方圖。"""
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, HistogramSeries] = {}
+
+    def labels(self, *label_values: str) -> HistogramSeries:
+        """取得指定標籤值的序列。"""
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = HistogramSeries(self.buckets)
+        return series
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """記錄一次觀測值。"""
+        self.labels(*label_values).observe(value)
+
+    def render(self) -> list[str]:
+        """輸出 Prometheus 文字格式（bucket 為累計值）。"""
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_values, series in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), series.counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.label_names, label_values, f'le="{_format_value(bound)}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.total)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指標註冊表。"""
+
+    def __init__(self, namespace: str) -> None:
+        """初始化註冊表，所有指標名稱加上 namespace 前綴。"""
+        self.namespace = namespace
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[tuple[str, Callable[[], dict]]] = []
+
+    def counter(
+        self, name: str, help_text: str, label_names: Sequence[str] = ()
+    ) -> Counter:
+        """建立並註冊計數器。"""
+        metric = Counter(f"{self.namespace}_{name}", help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """建立並註冊直方圖。"""
+        metric = Histogram(f"{self.namespace}_{name}", help_text, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, prefix: str, collect: Callable[[], dict]) -> None:
+        """註冊輸出時才讀取的 stats()，數值欄位輸出為 gauge。"""
+        self._collectors.append((prefix, collect))
+
+    def render(self) -> str:
+        """輸出所有指標的 Prometheus 文字格式。"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, collect in self._collectors:
+            for key, value in collect().items():
+                name = f"{self.namespace}_{prefix}_{key}"
+                if isinstance(value, dict):
+                    samples = [
+                        f"{name}{_format_labels(('key',), (label,))} {_format_value(v)}"
+                        for label, v in value.items()
+                        if isinstance(v, int | float)
+                    ]
+                elif isinstance(value, int | float):
+                    samples = [f"{name} {_format_value(float(value))}"]
+                else:
+                    continue
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry("attendance")
+
+SQL_STATEMENTS = metrics.counter(
+    "sql_statements_total", "送出的 SQL 陳述式數量", ("engine", "verb")
+)
+SQL_SECONDS = metrics.histogram(
+    "sql_statement_seconds", "SQL 陳述式執行時間", ("engine", "verb")
+)
+REPOSITORY_SECONDS = metrics.histogram(
+    "repository_operation_seconds", "Repository 操作耗時", ("operation",)
+)
+HTTP_REQUESTS = metrics.counter(
+    "http_requests_total", "HTTP 請求數", ("method", "route", "status")
+)
+HTTP_SECONDS = metrics.histogram(
+    "http_request_seconds", "HTTP 請求處理時間", ("method", "route")
+)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """在引擎上記錄每個 SQL 陳述式的數量與執行時間。"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        """記下開始時間。"""
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        """記錄陳述式類型與耗時。"""
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        verb = statement.split(None, 1)[0].upper()
+        SQL_STATEMENTS.inc(name, verb)
+        SQL_SECONDS.observe(elapsed, name, verb)
+
+
+def timed_operation(func: Callable) -> Callable:
+    """記錄 Repository 非同步方法的耗時，標籤為「類別.方法」。"""
+    method_name = func.__name__
+    series_by_class: dict[type, HistogramSeries] = {}
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            series = series_by_class.get(type(self))
+            if series is None:
+                series = series_by_class[type(self)] = REPOSITORY_SECONDS.labels(
+                    f"{type(self).__name__}.{method_name}"
+                )
+            series.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class RequestMetricsMiddleware:
+    """記錄每個 HTTP 請求的次數與處理時間（純 ASGI middleware）。"""
+
+    def __init__(self, app) -> None:
+        """包裝 ASGI 應用程式。"""
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        """處理請求並記錄指標，標籤使用路由樣板避免高基數。"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_SECONDS.observe(time.perf_counter() - started, scope["method"], path)
+            HTTP_REQUESTS.inc(scope["method"], path, str(status_code))
@@ -0,0 +1,66 @@
+"""Keyset（cursor）分頁。
+
+cursor 是上一頁最後一筆排序鍵的值，以 JSON 陣列經 URL-safe base64 編碼，
+對用戶端為不透明字串。下一頁以 WHERE (排序鍵) > (cursor) 取得，
+走排序鍵的索引直接定位，不像 OFFSET 需要先讀過前面所有列；
+翻頁期間新增或刪除的記錄也不會讓其他記錄在頁與頁之間重複或遺漏。
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from fastapi import Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """cursor 格式錯誤或與排序鍵不符。"""
+
+
+def _encode_value(value: object) -> object:
+    """日期時間轉成 ISO 字串，其餘原樣保留。"""
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(value: object, python_type: type) -> object:
+    """依排序鍵欄位型別還原值。"""
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if not isinstance(value, python_type):
+        raise TypeError(f"預期 {python_type.__name__}，取得 {type(value).__name__}")
+    return value
+
+
+def encode_cursor(values: Sequence[object]) -> str:
+    """把排序鍵的值編碼成 cursor。"""
+    payload = json.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, python_types: Sequence[type]) -> tuple:
+    """把 cursor 解碼成排序鍵的值。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(python_types):
+            raise ValueError("排序鍵數量不符")
+        return tuple(
+            _decode_value(value, python_type)
+            for value, python_type in zip(values, python_types)
+        )
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise InvalidCursorError("無效的分頁 cursor") from exc
+
+
+def set_next_cursor(response: Response, cursor: str | None) -> None:
+    """有下一頁時在回應加上 X-Next-Cursor 標頭。"""
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
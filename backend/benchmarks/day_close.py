@@ -0,0 +1,172 @@
+"""
+日結基準測試
+執行方式：python -m benchmarks.day_close [--departments 50] [--employees 50000]
+          [--absent-rate 0.05] [--single-scan-rate 0.03] [--output day_close.json]
+
+在暫存 SQLite 資料庫灌入 N 個部門、M 位員工（含班表、彈性設定與規則版本），
+依比例產生當日缺勤、單次刷卡與正常上下班的 AttendanceDaily，
+量測第一次日結（補缺勤記錄、標記 ExceptionFlags、重新彙總月彙總）與
+重複日結（沒有任何變動）的耗時，結果寫成 JSON 方便跨 commit 比較。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import uuid
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from benchmarks.scan_load import (
+    CLOCK_IN_PEAK,
+    CLOCK_OUT_PEAK,
+    PEAK_STDDEV_MINUTES,
+    WORK_DATE,
+    git_revision,
+    seed,
+)
+
+# 隔天過了 DayCutoff（04:00）即可日結
+CLOSE_TIME = datetime.combine(WORK_DATE + timedelta(days=1), time(5, 0))
+
+
+def seed_attendance(
+    db_path: str, rfid_ids: list[str], args: argparse.Namespace
+) -> dict[str, int]:
+    """灌入當日考勤記錄（缺勤者沒有記錄），回傳各類人數"""
+    rng = random.Random(args.seed)
+    counts = {"absent": 0, "single_scan": 0, "complete": 0}
+    rows = []
+    for rfid_id in rfid_ids:
+        draw = rng.random()
+        if draw < args.absent_rate:
+            counts["absent"] += 1
+            continue
+        first_in = CLOCK_IN_PEAK + timedelta(minutes=rng.gauss(0, PEAK_STDDEV_MINUTES))
+        last_out = None
+        if draw < args.absent_rate + args.single_scan_rate:
+            counts["single_scan"] += 1
+        else:
+            counts["complete"] += 1
+            last_out = CLOCK_OUT_PEAK + timedelta(
+                minutes=rng.gauss(0, PEAK_STDDEV_MINUTES)
+            )
+        check_in = 0 if first_in.time() <= time(9, 0) else 2
+        check_out = 2 if last_out is None else int(last_out.time() < time(18, 0))
+        rows.append(
+            (
+                str(uuid.uuid4()),
+                rfid_id,
+                WORK_DATE,
+                first_in,
+                last_out,
+                check_in,
+                check_out,
+                first_in,
+                last_out or first_in,
+            )
+        )
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO AttendanceDaily (GUID, RFID_ID, WorkDate, FirstInTime, "
+        "LastOutTime, CheckInStatus, CheckOutStatus, CreateTime, UpdateTime) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return counts
+
+
+def flag_counts(db_path: str) -> dict[str, int]:
+    """統計日結後各 ExceptionFlags 的筆數"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT COALESCE(ExceptionFlags, ''), COUNT(*) FROM AttendanceDaily "
+        "WHERE WorkDate = ? GROUP BY 1 ORDER BY 1",
+        (WORK_DATE.isoformat(),),
+    ).fetchall()
+    conn.close()
+    return {flags or "(none)": count for flags, count in rows}
+
+
+async def run(db_path: str, args: argparse.Namespace) -> dict:
+    """建立結構、灌入資料並執行兩次日結"""
+    from app.database import async_session, close_db, init_db
+    from app.services.day_close import DayCloseService
+
+    await init_db()
+    rfid_ids = seed(db_path, args.departments, args.employees)
+    seeded = seed_attendance(db_path, rfid_ids, args)
+
+    passes = []
+    try:
+        for _ in range(2):
+            async with async_session() as db:
+                result = await DayCloseService(db).close_day(WORK_DATE, CLOSE_TIME)
+            passes.append(
+                {
+                    "departments": result.departments,
+                    "absences_inserted": result.absences_inserted,
+                    "flags_updated": result.flags_updated,
+                    "elapsed_ms": result.elapsed_ms,
+                }
+            )
+    finally:
+        await close_db()
+
+    return {
+        "seeded": seeded,
+        "first_close": passes[0],
+        "repeat_close": passes[1],
+        "flags": flag_counts(db_path),
+    }
+
+
+def main() -> int:
+    """解析參數、執行基準測試並輸出 JSON"""
+    parser = argparse.ArgumentParser(description="日結基準測試")
+    parser.add_argument("--departments", type=int, default=50)
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--absent-rate", type=float, default=0.05)
+    parser.add_argument("--single-scan-rate", type=float, default=0.03)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 結果輸出路徑（預設只印出）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "day_close.db")
+        # 設定須在匯入 app 之前完成
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+        os.environ["DEBUG"] = "false"
+        result = asyncio.run(run(db_path, args))
+
+    report = {
+        "benchmark": "day_close",
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {
+            "departments": args.departments,
+            "employees": args.employees,
+            "absent_rate": args.absent_rate,
+            "single_scan_rate": args.single_scan_rate,
+            "seed": args.seed,
+        },
+        **result,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"結果已寫入 {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+列表回應序列化基準測試
+執行方式：python -m benchmarks.list_serialization [--sizes 1000,10000,100000]
+          [--repeat 5] [--output list_serialization.json]
+
+在暫存 SQLite 資料庫灌入 max(sizes) 位員工與每人一天的考勤，以 httpx
+ASGITransport 在同一行程內呼叫 GET /api/attendance-daily?limit=N 與
+GET /api/employees?limit=N，比較一般路徑（Pydantic from_attributes）與
+FAST_LIST_RESPONSES 快速路徑（欄位值列 + orjson）的耗時，並確認兩者輸出的
+JSON 內容相同。關閉參考資料 HTTP 快取以量測每次實際的查詢與序列化。
+結果寫成 JSON 方便跨 commit 比較。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import uuid
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.scan_load import git_revision, seed
+
+WORK_DATE = date(2026, 3, 2)
+ROUTES = {
+    "attendance": "/api/attendance-daily",
+    "employees": "/api/employees",
+}
+
+
+def seed_attendance(db_path: str, rfid_ids: list[str]) -> None:
+    """每位員工灌入一天的考勤（09:00 規則，08:30～09:30 上班、18:00 後下班）"""
+    midnight = datetime.combine(WORK_DATE, time.min)
+    rows = []
+    for number, rfid_id in enumerate(rfid_ids):
+        first_in = midnight + timedelta(hours=8, minutes=30 + number % 60)
+        last_out = midnight + timedelta(hours=18, seconds=number % 3600)
+        rows.append(
+            (
+                str(uuid.uuid4()),
+                rfid_id,
+                WORK_DATE,
+                "load-config-0",
+                first_in,
+                last_out,
+                0 if first_in.time() <= time(9) else 2,
+                0,
+                first_in,
+                last_out,
+            )
+        )
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO AttendanceDaily (GUID, RFID_ID, WorkDate, "
+        "RequiredConfigGUID, FirstInTime, LastOutTime, CheckInStatus, "
+        "CheckOutStatus, CreateTime, UpdateTime) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def measure(client, path: str, repeat: int) -> tuple[list[float], bytes]:
+    """呼叫 repeat 次，回傳每次耗時（ms）與最後一次的回應本文"""
+    passes = []
+    for _ in range(repeat):
+        started = perf_counter()
+        response = await client.get(path)
+        passes.append(round((perf_counter() - started) * 1000, 3))
+        response.raise_for_status()
+    return passes, response.content
+
+
+async def run(db_path: str, args: argparse.Namespace) -> dict:
+    """建立結構、灌入資料並比較兩種序列化路徑"""
+    import httpx
+
+    from app.config import settings
+    from app.main import app
+
+    settings.http_cache_enabled = False
+    results: dict[str, dict] = {}
+    async with app.router.lifespan_context(app):
+        rfid_ids = seed(db_path, 1, max(args.sizes))
+        seed_attendance(db_path, rfid_ids)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            for name, route in ROUTES.items():
+                for size in args.sizes:
+                    path = f"{route}?limit={size}"
+                    timings = {}
+                    bodies = {}
+                    for mode, fast in (("pydantic", False), ("orjson", True)):
+                        settings.fast_list_responses = fast
+                        passes, bodies[mode] = await measure(c, path, args.repeat)
+                        timings[mode] = {
+                            "elapsed_ms": passes,
+                            "median_ms": statistics.median(passes),
+                        }
+                    rows = json.loads(bodies["pydantic"])
+                    if len(rows) != size or rows != json.loads(bodies["orjson"]):
+                        raise RuntimeError(f"{path} 兩種路徑的輸出不一致")
+                    timings["speedup"] = round(
+                        timings["pydantic"]["median_ms"]
+                        / timings["orjson"]["median_ms"],
+                        2,
+                    )
+                    timings["identical_bytes"] = bodies["pydantic"] == bodies["orjson"]
+                    results.setdefault(name, {})[str(size)] = timings
+    return results
+
+
+def main() -> int:
+    """解析參數、執行基準測試並輸出 JSON"""
+    parser = argparse.ArgumentParser(description="列表回應序列化基準測試")
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[1000, 10000, 100000],
+        help="以逗號分隔的每次回應筆數",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="JSON 結果輸出路徑（預設只印出）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "list_serialization.db")
+        # 設定須在匯入 app 之前完成
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+        os.environ["DEBUG"] = "false"
+        os.environ["DAY_CLOSE_ENABLED"] = "false"
+        result = asyncio.run(run(db_path, args))
+
+    report = {
+        "benchmark": "list_serialization",
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {"sizes": args.sizes, "repeat": args.repeat},
+        "routes": result,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"結果已寫入 {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+規則模擬基準測試
+執行方式：python -m benchmarks.rule_simulation [--employees 10000]
+          [--start 2026-01-01] [--end 2026-03-31] [--output rule_simulation.json]
+
+在暫存 SQLite 資料庫灌入單一部門 M 位員工在區間內每個平日的考勤
+（上下班時間依尖峰常態分布），量測以三組候選規則呼叫
+RuleSimulationService 的耗時（含載入考勤），結果寫成 JSON 方便跨 commit 比較。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import uuid
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.scan_load import PEAK_STDDEV_MINUTES, git_revision, seed
+
+DEPT_GUID = "load-dept-0"
+CONFIG_GUID = "load-config-0"
+CANDIDATES = [
+    {"name": "flex-15", "FlexMinutes": 15},
+    {"name": "flex-30", "FlexMinutes": 30},
+    {"name": "nine-thirty", "CheckInNeedBefore": time(9, 30), "FlexMinutes": 0},
+]
+
+
+def seed_attendance(
+    db_path: str, rfid_ids: list[str], start: date, end: date, rng: random.Random
+) -> int:
+    """灌入區間內每個平日的考勤（規則為 09:00 上班、無彈性、18:00 下班）"""
+    conn = sqlite3.connect(db_path)
+    total = 0
+    work_date = start
+    while work_date <= end:
+        if work_date.weekday() < 5:
+            midnight = datetime.combine(work_date, time.min)
+            rows = []
+            for rfid_id in rfid_ids:
+                first_in = midnight + timedelta(
+                    hours=8, minutes=50 + rng.gauss(0, PEAK_STDDEV_MINUTES)
+                )
+                last_out = None
+                if rng.random() > 0.03:
+                    last_out = midnight + timedelta(
+                        hours=18, minutes=10 + rng.gauss(0, PEAK_STDDEV_MINUTES)
+                    )
+                rows.append(
+                    (
+                        str(uuid.uuid4()),
+                        rfid_id,
+                        work_date,
+                        CONFIG_GUID,
+                        first_in,
+                        last_out,
+                        0 if first_in.time() <= time(9, 0) else 2,
+                        2 if last_out is None else int(last_out.time() < time(18)),
+                        first_in,
+                        last_out or first_in,
+                    )
+                )
+            conn.executemany(
+                "INSERT INTO AttendanceDaily (GUID, RFID_ID, WorkDate, "
+                "RequiredConfigGUID, FirstInTime, LastOutTime, CheckInStatus, "
+                "CheckOutStatus, CreateTime, UpdateTime) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            total += len(rows)
+        work_date += timedelta(days=1)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return total
+
+
+async def run(db_path: str, args: argparse.Namespace) -> dict:
+    """建立結構、灌入資料並執行模擬"""
+    from app.database import async_session, close_db, init_db
+    from app.schemas.rule_simulation import RuleCandidate
+    from app.services.rule_simulation import RuleSimulationService
+
+    await init_db()
+    rfid_ids = seed(db_path, 1, args.employees)
+    attendance_days = seed_attendance(
+        db_path, rfid_ids, args.start, args.end, random.Random(args.seed)
+    )
+    candidates = [RuleCandidate(**candidate) for candidate in CANDIDATES]
+
+    passes = []
+    try:
+        for _ in range(args.repeat):
+            async with async_session() as db:
+                started = perf_counter()
+                result = await RuleSimulationService(db).simulate(
+                    DEPT_GUID, args.start, args.end, candidates
+                )
+                passes.append(round((perf_counter() - started) * 1000, 3))
+    finally:
+        await close_db()
+
+    return {
+        "attendance_days": attendance_days,
+        "elapsed_ms": passes,
+        "best_ms": min(passes),
+        "current_late": result.current.late,
+        "candidates": {
+            candidate.name: {
+                "late": candidate.counts.late,
+                "changed_days": candidate.changed_days,
+                "employees_changed": len(candidate.employees),
+            }
+            for candidate in result.candidates
+        },
+    }
+
+
+def main() -> int:
+    """解析參數、執行基準測試並輸出 JSON"""
+    parser = argparse.ArgumentParser(description="規則模擬基準測試")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2026, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2026, 3, 31))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 結果輸出路徑（預設只印出）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "rule_simulation.db")
+        # 設定須在匯入 app 之前完成
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+        os.environ["DEBUG"] = "false"
+        result = asyncio.run(run(db_path, args))
+
+    report = {
+        "benchmark": "rule_simulation",
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {
+            "employees": args.employees,
+            "start": args.start.isoformat(),
+            "end": args.end.isoformat(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        **result,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"結果已寫入 {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+刷卡規則判斷微基準測試
+執行方式：python -m benchmarks.rule_table [--scans 200000] [--repeat 5]
+          [--output rule_table.json]
+
+比較每筆刷卡決定 WorkDate 與上下班狀態的 CPU 時間：
+舊作法每筆以 datetime.combine／timedelta 比較 time 物件，
+DayRule 把規則預先編譯成當日微秒數後只做整數比較。
+兩者先以相同的隨機刷卡核對結果一致，再各取 --repeat 次中最快的一次，
+結果寫成 JSON 方便跨 commit 比較。
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.scan_load import WORK_DATE, git_revision
+
+RULE_PARAMETERS = {
+    "Schedule_GUID": "schedule-1",
+    "CheckInNeedBefore": time(9, 0),
+    "CheckNeedOutAfter": time(18, 0),
+    "DayCutoff": time(4, 0),
+    "FlexMinutes": 30,
+    "configs": (),
+}
+
+
+def legacy_work_date(event_time: datetime, day_cutoff: time) -> date:
+    """舊作法：組出當日的日切時間點再比較"""
+    if event_time < datetime.combine(event_time.date(), day_cutoff):
+        return event_time.date() - timedelta(days=1)
+    return event_time.date()
+
+
+def legacy_check_in_status(
+    scan_time: time, required_in: time, flex_minutes: int
+) -> int:
+    """舊作法：每筆刷卡重新計算彈性結束時間"""
+    flex_end = datetime.combine(date.today(), required_in) + timedelta(
+        minutes=flex_minutes
+    )
+    if scan_time <= required_in:
+        return 0
+    if scan_time <= flex_end.time():
+        return 1
+    return 2
+
+
+def legacy_check_out_status(scan_time: time, required_out: time) -> int:
+    """舊作法：比較 time 物件"""
+    return 0 if scan_time >= required_out else 1
+
+
+def legacy(rule, event_times: list[datetime]) -> list[tuple]:
+    """以舊作法判斷每筆刷卡"""
+    return [
+        (
+            legacy_work_date(event_time, rule.DayCutoff),
+            legacy_check_in_status(
+                event_time.time(), rule.CheckInNeedBefore, rule.FlexMinutes
+            ),
+            legacy_check_out_status(event_time.time(), rule.CheckNeedOutAfter),
+        )
+        for event_time in event_times
+    ]
+
+
+def compiled(rule, event_times: list[datetime]) -> list[tuple]:
+    """以編譯後的 DayRule 判斷每筆刷卡（與 ScanService 相同的呼叫方式）"""
+    from app.services.rule_cache import time_of_day
+
+    results = []
+    for event_time in event_times:
+        work_date = rule.work_date(event_time, time_of_day(event_time))
+        scan_time = time_of_day(event_time)
+        results.append(
+            (
+                work_date,
+                rule.check_in_status(scan_time),
+                rule.check_out_status(scan_time),
+            )
+        )
+    return results
+
+
+def best_of(function, rule, event_times: list[datetime], repeat: int) -> float:
+    """取 repeat 次中最快的一次耗時（秒）"""
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        function(rule, event_times)
+        timings.append(perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    """解析參數、執行微基準測試並輸出 JSON"""
+    parser = argparse.ArgumentParser(description="刷卡規則判斷微基準測試")
+    parser.add_argument("--scans", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 結果輸出路徑（預設只印出）")
+    args = parser.parse_args()
+
+    from app.services.rule_cache import DayRule
+
+    rule = DayRule(**RULE_PARAMETERS)
+    rng = random.Random(args.seed)
+    start = datetime.combine(WORK_DATE, time.min)
+    # 整天的隨機刷卡，涵蓋日切點前、彈性區間與下班前後
+    event_times = [
+        start + timedelta(microseconds=rng.randrange(86_400_000_000))
+        for _ in range(args.scans)
+    ]
+    if legacy(rule, event_times) != compiled(rule, event_times):
+        print("編譯後的規則與舊作法的判斷結果不一致", file=sys.stderr)
+        return 1
+
+    legacy_seconds = best_of(legacy, rule, event_times, args.repeat)
+    compiled_seconds = best_of(compiled, rule, event_times, args.repeat)
+    legacy_ns = legacy_seconds / args.scans * 1e9
+    compiled_ns = compiled_seconds / args.scans * 1e9
+    report = {
+        "benchmark": "rule_table",
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {"scans": args.scans, "repeat": args.repeat, "seed": args.seed},
+        "legacy_ns_per_scan": round(legacy_ns, 1),
+        "compiled_ns_per_scan": round(compiled_ns, 1),
+        "saved_ns_per_scan": round(legacy_ns - compiled_ns, 1),
+        "speedup": round(legacy_ns / compiled_ns, 2),
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"結果已寫入 {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
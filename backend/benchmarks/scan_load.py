@@ -0,0 +1,277 @@
+"""
+刷卡 API 負載與延遲基準測試
+執行方式：python -m benchmarks.scan_load [--departments 20] [--employees 2000]
+          [--concurrency 64] [--peak-seconds 10] [--mode direct|group_commit]
+          [--output scan_load.json]
+
+在暫存 SQLite 資料庫灌入 N 個部門、M 位員工（含班表、彈性設定與規則版本），
+以 httpx ASGITransport 在同一行程內驅動 app.main:app。每位員工的上班卡與下班卡
+時間取自以 08:50、18:10 為中心的常態分布，依刷卡時間把早晚尖峰壓縮到
+--peak-seconds 秒內送出，並以 --concurrency 限制同時進行的請求數。
+輸出吞吐量與依上班卡／下班卡分列的 p50/p95/p99 延遲，結果寫成 JSON 方便跨 commit 比較。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+WORK_DATE = date(2026, 3, 5)
+CLOCK_IN_PEAK = datetime.combine(WORK_DATE, datetime.min.time()) + timedelta(
+    hours=8, minutes=50
+)
+CLOCK_OUT_PEAK = CLOCK_IN_PEAK + timedelta(hours=9, minutes=20)
+PEAK_STDDEV_MINUTES = 15
+
+
+def seed(db_path: str, departments: int, employees: int) -> list[str]:
+    """灌入部門、員工、班表、彈性設定與規則版本，回傳卡號"""
+    now = datetime(2026, 1, 1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO Departments VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"load-dept-{d}", f"L{d}", f"負載部門{d}", now, now)
+            for d in range(departments)
+        ],
+    )
+    rfid_ids = [f"LOAD{e:06d}" for e in range(employees)]
+    conn.executemany(
+        "INSERT INTO Employees VALUES (?, ?, ?, ?, 1, ?, ?)",
+        [
+            (rfid_id, f"L{e}", f"員工{e}", f"load-dept-{e % departments}", now, now)
+            for e, rfid_id in enumerate(rfid_ids)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO Schedules VALUES "
+        "(?, ?, '標準班', 8, '09:00:00', '18:00:00', '04:00:00', 0, NULL, NULL, ?, ?)",
+        [
+            (f"load-schedule-{d}", f"load-dept-{d}", now, now)
+            for d in range(departments)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO FlexSettings VALUES (?, ?, ?, 0, NULL, NULL, ?, ?)",
+        [
+            (f"load-flex-{d}", f"load-dept-{d}", (0, 15, 30)[d % 3], now, now)
+            for d in range(departments)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO RequiredConfigs VALUES "
+        "(?, ?, ?, ?, 8, '09:00:00', '18:00:00', ?, '04:00:00', '2026-01-01', NULL, ?)",
+        [
+            (
+                f"load-config-{d}",
+                f"load-dept-{d}",
+                f"load-schedule-{d}",
+                f"load-flex-{d}",
+                (0, 15, 30)[d % 3],
+                now,
+            )
+            for d in range(departments)
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return rfid_ids
+
+
+def arrivals(rfid_ids: list[str], peak: datetime, rng: random.Random) -> list:
+    """依尖峰常態分布產生 (刷卡時間, 卡號)，依時間排序"""
+    events = [
+        (
+            peak + timedelta(minutes=rng.gauss(0, PEAK_STDDEV_MINUTES)),
+            rfid_id,
+        )
+        for rfid_id in rfid_ids
+    ]
+    events.sort()
+    return events
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """取最近秩百分位數"""
+    if not sorted_values:
+        return 0.0
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float]) -> dict:
+    """整理延遲分布（毫秒）"""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p95_ms": round(percentile(values, 0.95), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+    }
+
+
+async def drive_phase(client, events: list, concurrency: int, peak_seconds: float):
+    """依刷卡時間把尖峰壓縮到 peak_seconds 秒內送出，回傳 (類型, 延遲毫秒)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    first = events[0][0]
+    span = max((events[-1][0] - first).total_seconds(), 1.0)
+    loop_started = time.perf_counter()
+    results: list[tuple[str, float]] = []
+
+    async def send(event_time: datetime, rfid_id: str) -> None:
+        offset = (event_time - first).total_seconds() / span * peak_seconds
+        delay = loop_started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/scan",
+                json={
+                    "rfid_id": rfid_id,
+                    "device_id": f"GATE-{hash(rfid_id) % 8}",
+                    "event_time": event_time.isoformat(),
+                },
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            kind = f"http_{response.status_code}"
+        elif not response.json()["success"]:
+            kind = "failed"
+        else:
+            kind = response.json()["scan_type"]
+        results.append((kind, elapsed_ms))
+
+    await asyncio.gather(*[send(event_time, rfid_id) for event_time, rfid_id in events])
+    return results
+
+
+async def run(db_path: str, args: argparse.Namespace) -> dict:
+    """啟動應用程式並依序跑上班與下班尖峰"""
+    import httpx
+
+    from app.database import read_session
+    from app.main import app
+    from app.services.rfid_filter import known_rfids
+
+    rng = random.Random(args.seed)
+    async with app.router.lifespan_context(app):
+        rfid_ids = seed(db_path, args.departments, args.employees)
+        # 員工在啟動後才灌入，需重建已知卡號 filter
+        async with read_session() as db:
+            await known_rfids.load(db)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            started = time.perf_counter()
+            results = []
+            for peak in (CLOCK_IN_PEAK, CLOCK_OUT_PEAK):
+                results += await drive_phase(
+                    c,
+                    arrivals(rfid_ids, peak, rng),
+                    args.concurrency,
+                    args.peak_seconds,
+                )
+            elapsed = time.perf_counter() - started
+            scan_stats = (await c.get("/api/scan/stats")).json()
+
+    by_kind: dict[str, list[float]] = {}
+    for kind, elapsed_ms in results:
+        by_kind.setdefault(kind, []).append(elapsed_ms)
+    return {
+        "requests": len(results),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 1),
+        "latency": {
+            "all": summarize([elapsed_ms for _, elapsed_ms in results]),
+            **{kind: summarize(values) for kind, values in sorted(by_kind.items())},
+        },
+        "scan_stats": scan_stats,
+    }
+
+
+def git_revision() -> str | None:
+    """取得目前的 commit（非 git 工作目錄時為 None）"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    """解析參數、執行基準測試並輸出 JSON"""
+    parser = argparse.ArgumentParser(description="刷卡 API 負載與延遲基準測試")
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--peak-seconds",
+        type=float,
+        default=10.0,
+        help="每個尖峰壓縮後的送出時間（0 表示盡快送出）",
+    )
+    parser.add_argument("--mode", choices=["direct", "group_commit"], default="direct")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 結果輸出路徑（預設只印出）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "scan_load.db")
+        # 設定須在匯入 app 之前完成
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+        os.environ["DEBUG"] = "false"
+        os.environ["SCAN_INGEST_MODE"] = args.mode
+        # 背景日結會為前幾天補上缺勤記錄，與量測無關
+        os.environ["DAY_CLOSE_ENABLED"] = "false"
+        result = asyncio.run(run(db_path, args))
+
+    report = {
+        "benchmark": "scan_load",
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {
+            "departments": args.departments,
+            "employees": args.employees,
+            "concurrency": args.concurrency,
+            "peak_seconds": args.peak_seconds,
+            "mode": args.mode,
+            "seed": args.seed,
+        },
+        **result,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"結果已寫入 {args.output}")
+
+    print(f"請求：{report['requests']} 筆，耗時 {report['elapsed_seconds']} 秒")
+    print(f"吞吐量：{report['throughput_rps']} 筆/秒")
+    for kind, stats in report["latency"].items():
+        print(
+            f"  {kind:10} n={stats['count']:6} p50={stats['p50_ms']:8.2f}ms "
+            f"p95={stats['p95_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms"
+        )
+    if not args.output:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+同卡併發刷卡壓力測試
+執行方式：python -m benchmarks.scan_stress [--scans 1000] [--cards 50]
+          [--mode direct|group_commit]
+
+在暫存 SQLite 資料庫啟動應用程式，同時送出大量刷卡（多張卡重複刷），
+檢查每張卡每個工作日恰好一筆 AttendanceDaily，並輸出吞吐量；
+不符合時以非零狀態結束。
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DEPT_GUID = "stress-dept-guid"
+WORK_DATE = "2026-03-05"
+
+
+def seed(db_path: str, cards: int) -> list[str]:
+    """建立單一部門、班表、彈性設定與規則版本，回傳卡號"""
+    now = datetime(2026, 1, 1)
+    rfid_ids = [f"STRESS{card:04d}" for card in range(cards)]
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO Departments VALUES (?, 'STRESS', '壓力測試', ?, ?)",
+        (DEPT_GUID, now, now),
+    )
+    conn.executemany(
+        "INSERT INTO Employees VALUES (?, ?, ?, ?, 1, ?, ?)",
+        [
+            (rfid_id, f"S{index}", f"員工{index}", DEPT_GUID, now, now)
+            for index, rfid_id in enumerate(rfid_ids)
+        ],
+    )
+    conn.execute(
+        "INSERT INTO Schedules VALUES "
+        "('stress-schedule', ?, '標準班', 8, '09:00:00', '18:00:00', '04:00:00', "
+        "0, NULL, NULL, ?, ?)",
+        (DEPT_GUID, now, now),
+    )
+    conn.execute(
+        "INSERT INTO FlexSettings VALUES ('stress-flex', ?, 30, 0, NULL, NULL, ?, ?)",
+        (DEPT_GUID, now, now),
+    )
+    conn.execute(
+        "INSERT INTO RequiredConfigs VALUES "
+        "('stress-config', ?, 'stress-schedule', 'stress-flex', 8, "
+        "'09:00:00', '18:00:00', 30, '04:00:00', '2026-01-01', NULL, ?)",
+        (DEPT_GUID, now),
+    )
+    conn.commit()
+    conn.close()
+    return rfid_ids
+
+
+def check(db_path: str, cards: int, scans: int) -> list[str]:
+    """檢查刷卡事件與每日出勤筆數，回傳失敗訊息"""
+    conn = sqlite3.connect(db_path)
+    failures = []
+    (events,) = conn.execute("SELECT COUNT(*) FROM ScanEvents").fetchone()
+    if events != scans:
+        failures.append(f"ScanEvents 應為 {scans} 筆，實際 {events} 筆")
+    duplicates = conn.execute(
+        "SELECT RFID_ID, WorkDate, COUNT(*) FROM AttendanceDaily "
+        "GROUP BY RFID_ID, WorkDate HAVING COUNT(*) > 1"
+    ).fetchall()
+    for rfid_id, work_date, count in duplicates:
+        failures.append(f"{rfid_id} {work_date} 有 {count} 筆 AttendanceDaily")
+    (days,) = conn.execute(
+        "SELECT COUNT(*) FROM AttendanceDaily WHERE WorkDate = ?", (WORK_DATE,)
+    ).fetchone()
+    if days != cards:
+        failures.append(f"{WORK_DATE} 應有 {cards} 筆 AttendanceDaily，實際 {days} 筆")
+    conn.close()
+    return failures
+
+
+async def run(db_path: str, scans: int, cards: int) -> tuple[float, dict]:
+    """啟動應用程式並同時送出所有刷卡，回傳耗時與狀態碼統計"""
+    import httpx
+
+    from app.database import read_session
+    from app.main import app
+    from app.services.rfid_filter import known_rfids
+
+    async with app.router.lifespan_context(app):
+        rfid_ids = seed(db_path, cards)
+        # 員工在啟動後才灌入，需重建已知卡號 filter
+        async with read_session() as db:
+            await known_rfids.load(db)
+        start = datetime.fromisoformat(f"{WORK_DATE}T08:00:00")
+        payloads = [
+            {
+                "rfid_id": rfid_ids[index % cards],
+                "device_id": f"GATE-{index % 4}",
+                "event_time": (start + timedelta(seconds=index)).isoformat(),
+            }
+            for index in range(scans)
+        ]
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *[c.post("/api/scan", json=payload) for payload in payloads]
+            )
+            elapsed = time.perf_counter() - started
+
+    status_counts: dict = {}
+    for response in responses:
+        status_counts[response.status_code] = (
+            status_counts.get(response.status_code, 0) + 1
+        )
+    return elapsed, status_counts
+
+
+def main() -> int:
+    """解析參數並執行壓力測試"""
+    parser = argparse.ArgumentParser(description="同卡併發刷卡壓力測試")
+    parser.add_argument("--scans", type=int, default=1000)
+    parser.add_argument("--cards", type=int, default=50)
+    parser.add_argument("--mode", choices=["direct", "group_commit"], default="direct")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "scan_stress.db")
+        # 設定須在匯入 app 之前完成
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+        os.environ["DEBUG"] = "false"
+        os.environ["SCAN_INGEST_MODE"] = args.mode
+        # 背景日結會為前幾天補上缺勤記錄，與量測無關
+        os.environ["DAY_CLOSE_ENABLED"] = "false"
+
+        elapsed, status_counts = asyncio.run(run(db_path, args.scans, args.cards))
+        failures = check(db_path, args.cards, args.scans)
+        if status_counts != {200: args.scans}:
+            failures.append(f"回應狀態碼不全為 200：{status_counts}")
+
+    print(f"模式：{args.mode}")
+    print(f"刷卡：{args.scans} 筆（{args.cards} 張卡）")
+    print(f"耗時：{elapsed:.3f} 秒")
+    print(f"吞吐量：{args.scans / elapsed:.1f} 筆/秒")
+
+    if failures:
+        print(f"\n{len(failures)} 項檢查失敗：")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\n每張卡每個工作日恰好一筆 AttendanceDaily")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+封存超過保留期限的刷卡事件
+執行方式：python -m database.archive_scans [--months N] [--month YYYY-MM] [--vacuum]
+
+把超過 N 個月（預設為 SCAN_RETENTION_MONTHS）的 ScanEvents 依月份寫成
+SCAN_ARCHIVE_DIR 下的欄式區段檔，再分批自線上資料表刪除；
+查詢員工刷卡時會一併讀取區段檔。可重複執行，中斷後重新執行即可。
+--vacuum 在刪除後整理 SQLite 檔案，釋放刪除的空間（期間會鎖定資料庫）。
+使用應用程式設定的 DATABASE_URL。
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+from datetime import date
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import async_session, close_db, engine, init_db
+from app.repositories.attendance_monthly import YEAR_MONTH_PATTERN, month_bounds
+from app.services.scan_retention import (
+    ArchiveResult,
+    ScanRetentionService,
+    retention_cutoff,
+)
+
+
+async def archive(
+    year_month: str | None, retention_months: int, vacuum: bool
+) -> list[ArchiveResult]:
+    """封存指定月份或所有超過保留期限的月份"""
+    await init_db()
+    try:
+        async with async_session() as db:
+            service = ScanRetentionService(db)
+            if year_month is not None:
+                results = [await service.archive_month(year_month)]
+            else:
+                results = await service.archive_expired(date.today(), retention_months)
+        if vacuum and engine.dialect.name == "sqlite":
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("VACUUM"))
+    finally:
+        await close_db()
+    return results
+
+
+def main() -> int:
+    """解析參數並執行封存"""
+    parser = argparse.ArgumentParser(description="封存超過保留期限的刷卡事件")
+    parser.add_argument(
+        "--months",
+        type=int,
+        default=settings.scan_retention_months,
+        help="線上保留的月數（不含本月）",
+    )
+    parser.add_argument("--month", help="只封存指定月份（YYYY-MM）")
+    parser.add_argument("--vacuum", action="store_true", help="封存後整理資料庫檔案")
+    args = parser.parse_args()
+    if args.months < 1:
+        parser.error("--months 須為正整數")
+    cutoff = retention_cutoff(date.today(), args.months)
+    if args.month is not None:
+        if not re.match(YEAR_MONTH_PATTERN, args.month):
+            parser.error("--month 格式須為 YYYY-MM")
+        if month_bounds(args.month)[0] >= cutoff:
+            parser.error(f"--month 須早於保留期限 {cutoff:%Y-%m}")
+
+    results = asyncio.run(archive(args.month, args.months, args.vacuum))
+    if not results:
+        print(f"{cutoff:%Y-%m} 之前沒有線上刷卡事件，不需封存")
+    for result in results:
+        print(
+            f"{result.year_month}：區段 {result.archived} 筆"
+            f"（{result.segment_bytes / 1024:.0f} KiB），"
+            f"刪除線上 {result.deleted} 筆（{result.elapsed_ms:.0f} ms）"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
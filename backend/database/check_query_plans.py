@@ -0,0 +1,481 @@
+"""
+查詢計畫回歸檢查
+執行方式：python -m database.check_query_plans
+
+在暫存 SQLite 資料庫建立結構並灌入範例規模的資料（ANALYZE 後），
+逐一呼叫 Repository 查詢並擷取實際送出的 SQL，以 EXPLAIN QUERY PLAN 檢查；
+任何帶條件的查詢退化成整表掃描（SCAN <table>）即以非零狀態結束。
+"""
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.repositories import (
+    AttendanceMonthlyRepository,
+    AttendanceRepository,
+    DepartmentRepository,
+    EmployeeRepository,
+    FlexSettingRepository,
+    RequiredConfigRepository,
+    ScanEventRepository,
+    ScheduleRepository,
+)
+from app.utils.pagination import encode_cursor
+
+DEPARTMENTS = 20
+EMPLOYEES = 2000
+DAYS = 10
+
+QueryCheck = tuple[str, Callable[[AsyncSession], Awaitable[object]], bool]
+
+
+def seed(db_path: str) -> None:
+    """灌入範例規模的資料並更新統計資訊"""
+    now = datetime(2026, 1, 1)
+    first_day = date(2026, 3, 2)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO Departments VALUES (?, ?, ?, ?, ?)",
+        [(f"dept-{d}", f"D{d}", f"部門{d}", now, now) for d in range(DEPARTMENTS)],
+    )
+    conn.executemany(
+        "INSERT INTO Employees VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                f"RFID{e:06d}",
+                f"EMP{e}",
+                f"員工{e}",
+                f"dept-{e % DEPARTMENTS}",
+                1,
+                now,
+                now,
+            )
+            for e in range(EMPLOYEES)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO Schedules VALUES (?, ?, ?, ?, ?, ?, ?, 0, NULL, NULL, ?, ?)",
+        [
+            (
+                f"schedule-{d}",
+                f"dept-{d}",
+                "標準班",
+                8,
+                time(9, 0).isoformat(),
+                time(18, 0).isoformat(),
+                time(4, 0).isoformat(),
+                now,
+                now,
+            )
+            for d in range(DEPARTMENTS)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO FlexSettings VALUES (?, ?, 30, 0, NULL, NULL, ?, ?)",
+        [(f"flex-{d}", f"dept-{d}", now, now) for d in range(DEPARTMENTS)],
+    )
+    conn.executemany(
+        "INSERT INTO RequiredConfigs VALUES "
+        "(?, ?, ?, ?, 8, '09:00:00', '18:00:00', 30, '04:00:00', ?, NULL, ?)",
+        [
+            (f"config-{d}", f"dept-{d}", f"schedule-{d}", f"flex-{d}", first_day, now)
+            for d in range(DEPARTMENTS)
+        ],
+    )
+    scans = []
+    attendance = []
+    for day in range(DAYS):
+        work_date = first_day + timedelta(days=day)
+        check_in = datetime.combine(work_date, time(8, 50))
+        check_out = datetime.combine(work_date, time(18, 5))
+        for e in range(EMPLOYEES):
+            rfid_id = f"RFID{e:06d}"
+            scans.append((str(uuid.uuid4()), rfid_id, "DEVICE-01", check_in, now))
+            scans.append((str(uuid.uuid4()), rfid_id, "DEVICE-01", check_out, now))
+            attendance.append(
+                (
+                    str(uuid.uuid4()),
+                    rfid_id,
+                    work_date,
+                    f"config-{e % DEPARTMENTS}",
+                    check_in,
+                    check_out,
+                    0,
+                    0,
+                    None,
+                    now,
+                    now,
+                )
+            )
+    conn.executemany("INSERT INTO ScanEvents VALUES (?, ?, ?, ?, ?)", scans)
+    conn.executemany(
+        "INSERT INTO AttendanceDaily VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        attendance,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def _drain(rows: AsyncIterator) -> list:
+    """讀完串流查詢的結果"""
+    return [row async for row in rows]
+
+
+def build_checks() -> list[QueryCheck]:
+    """列出要檢查的 Repository 查詢：(名稱, 呼叫, 是否允許整表掃描)"""
+    work_date = date(2026, 3, 5)
+    start = datetime(2026, 3, 5)
+    end = datetime(2026, 3, 6)
+    rfid_ids = ["RFID000001", "RFID000002"]
+    dept_guids = ["dept-1", "dept-2"]
+    return [
+        # 列表與計數本來就需要走訪整表
+        ("Department.get_all", lambda db: DepartmentRepository(db).get_all(), True),
+        ("Attendance.count", lambda db: AttendanceRepository(db).count_active(), True),
+        (
+            "Employee.get_all_rfids",
+            lambda db: EmployeeRepository(db).get_all_rfids(),
+            True,
+        ),
+        (
+            "Employee.get_active_employees",
+            lambda db: EmployeeRepository(db).get_active_employees(),
+            True,
+        ),
+        (
+            "Attendance.get_dashboard_counts",
+            lambda db: AttendanceRepository(db).get_dashboard_counts(work_date),
+            True,
+        ),
+        (
+            "RequiredConfig.get_effective_by_date",
+            lambda db: RequiredConfigRepository(db).get_effective_by_date(work_date),
+            True,
+        ),
+        (
+            "Schedule.get_all_active",
+            lambda db: ScheduleRepository(db).get_all_active(),
+            True,
+        ),
+        (
+            "FlexSetting.get_all_active",
+            lambda db: FlexSettingRepository(db).get_all_active(),
+            True,
+        ),
+        # 帶條件的查詢必須走索引
+        (
+            "Department.get_by_id",
+            lambda db: DepartmentRepository(db).get_by_id("dept-1"),
+            False,
+        ),
+        (
+            "Department.get_by_code",
+            lambda db: DepartmentRepository(db).get_by_code("D1"),
+            False,
+        ),
+        (
+            "Employee.get_by_rfid",
+            lambda db: EmployeeRepository(db).get_by_rfid(rfid_ids[0]),
+            False,
+        ),
+        (
+            "Employee.get_by_rfids",
+            lambda db: EmployeeRepository(db).get_by_rfids(rfid_ids),
+            False,
+        ),
+        (
+            "Employee.get_by_department",
+            lambda db: EmployeeRepository(db).get_by_department("dept-1"),
+            False,
+        ),
+        (
+            "Schedule.get_by_department",
+            lambda db: ScheduleRepository(db).get_by_department("dept-1"),
+            False,
+        ),
+        (
+            "Schedule.get_by_department(active_only=False)",
+            lambda db: ScheduleRepository(db).get_by_department("dept-1", False),
+            False,
+        ),
+        (
+            "Schedule.get_active_by_departments",
+            lambda db: ScheduleRepository(db).get_active_by_departments(dept_guids),
+            False,
+        ),
+        (
+            "Schedule.get_schedule_for_date",
+            lambda db: ScheduleRepository(db).get_schedule_for_date("dept-1", 3),
+            False,
+        ),
+        (
+            "FlexSetting.get_by_department",
+            lambda db: FlexSettingRepository(db).get_by_department("dept-1"),
+            False,
+        ),
+        (
+            "FlexSetting.get_by_departments",
+            lambda db: FlexSettingRepository(db).get_by_departments(dept_guids),
+            False,
+        ),
+        (
+            "RequiredConfig.get_current_config_for_department",
+            lambda db: RequiredConfigRepository(db).get_current_config_for_department(
+                "dept-1", 3, work_date
+            ),
+            False,
+        ),
+        (
+            "RequiredConfig.get_by_departments",
+            lambda db: RequiredConfigRepository(db).get_by_departments(dept_guids),
+            False,
+        ),
+        (
+            "RequiredConfig.get_open_by_department",
+            lambda db: RequiredConfigRepository(db).get_open_by_department("dept-1"),
+            False,
+        ),
+        (
+            "ScanEvent.get_by_employee_and_date_range",
+            lambda db: ScanEventRepository(db).get_by_employee_and_date_range(
+                rfid_ids[0], start, end
+            ),
+            False,
+        ),
+        (
+            "Attendance.get_by_employee_and_date",
+            lambda db: AttendanceRepository(db).get_by_employee_and_date(
+                rfid_ids[0], work_date
+            ),
+            False,
+        ),
+        (
+            "Attendance.get_by_employee_date_range",
+            lambda db: AttendanceRepository(db).get_by_employee_date_range(
+                rfid_ids[0], work_date, work_date + timedelta(days=3)
+            ),
+            False,
+        ),
+        (
+            "Attendance.get_by_date",
+            lambda db: AttendanceRepository(db).get_by_date(work_date),
+            False,
+        ),
+        (
+            "Attendance.get_snapshot_by_date_range",
+            lambda db: AttendanceRepository(db).get_snapshot_by_date_range(
+                work_date, work_date + timedelta(days=3), rfid_ids
+            ),
+            False,
+        ),
+        (
+            "ScanEvent.stream_by_time_range",
+            lambda db: _drain(
+                ScanEventRepository(db).stream_by_time_range(start, end, rfid_ids)
+            ),
+            False,
+        ),
+        # 封存整個月份本來就要讀過範圍內所有刷卡
+        (
+            "ScanEvent.stream_for_archive",
+            lambda db: _drain(ScanEventRepository(db).stream_for_archive(start, end)),
+            True,
+        ),
+        (
+            "ScanEvent.get_oldest_event_time",
+            lambda db: ScanEventRepository(db).get_oldest_event_time(end),
+            False,
+        ),
+        (
+            "ScanEvent.delete_archived",
+            lambda db: ScanEventRepository(db).delete_archived(
+                rfid_ids, start, end, end
+            ),
+            False,
+        ),
+        # keyset 分頁從 cursor 直接定位，不可退化為整表掃描
+        (
+            "Attendance.get_all (cursor)",
+            lambda db: AttendanceRepository(db).get_all(
+                cursor=encode_cursor(["RFID001000", work_date])
+            ),
+            False,
+        ),
+        (
+            "Employee.get_active_employees (cursor)",
+            lambda db: EmployeeRepository(db).get_active_employees(
+                cursor=encode_cursor(["RFID001000"])
+            ),
+            False,
+        ),
+        (
+            "Department.get_all (cursor)",
+            lambda db: DepartmentRepository(db).get_all(
+                cursor=encode_cursor(["D001", "dept-1"])
+            ),
+            False,
+        ),
+        (
+            "Schedule.get_all_active (cursor)",
+            lambda db: ScheduleRepository(db).get_all_active(
+                cursor=encode_cursor(["dept-1", 8, "schedule-1"])
+            ),
+            False,
+        ),
+        (
+            "FlexSetting.get_all_active (cursor)",
+            lambda db: FlexSettingRepository(db).get_all_active(
+                cursor=encode_cursor(["dept-1", "flex-1"])
+            ),
+            False,
+        ),
+        (
+            "Attendance.stream_export",
+            lambda db: _drain(
+                AttendanceRepository(db).stream_export(
+                    work_date, work_date + timedelta(days=3), "dept-1"
+                )
+            ),
+            False,
+        ),
+        (
+            "AttendanceMonthly.get_by_employee_and_month",
+            lambda db: AttendanceMonthlyRepository(db).get_by_employee_and_month(
+                rfid_ids[0], "2026-03"
+            ),
+            False,
+        ),
+        (
+            "AttendanceMonthly.get_by_month",
+            lambda db: AttendanceMonthlyRepository(db).get_by_month("2026-03"),
+            False,
+        ),
+        (
+            "AttendanceMonthly.refresh",
+            lambda db: AttendanceMonthlyRepository(db).refresh("2026-03", rfid_ids),
+            False,
+        ),
+        (
+            "AttendanceMonthly.add_clock_ins",
+            lambda db: AttendanceMonthlyRepository(db).add_clock_ins(
+                [(rfid_ids[0], "2026-03", 0)]
+            ),
+            False,
+        ),
+        (
+            "Attendance.get_dashboard_counts (department)",
+            lambda db: AttendanceRepository(db).get_dashboard_counts(
+                work_date, "dept-1"
+            ),
+            False,
+        ),
+        (
+            "Attendance.insert_absences",
+            lambda db: AttendanceRepository(db).insert_absences(
+                work_date, {dept_guid: "config-1" for dept_guid in dept_guids}, start
+            ),
+            False,
+        ),
+        (
+            "Attendance.update_exception_flags",
+            lambda db: AttendanceRepository(db).update_exception_flags(
+                work_date, dept_guids, start
+            ),
+            False,
+        ),
+        (
+            "Attendance.get_scan_times_by_department",
+            lambda db: AttendanceRepository(db).get_scan_times_by_department(
+                dept_guids[0], work_date, work_date + timedelta(days=3)
+            ),
+            False,
+        ),
+        (
+            "Employee.get_department_map",
+            lambda db: EmployeeRepository(db).get_department_map(rfid_ids),
+            False,
+        ),
+        (
+            "Attendance.upsert_scan",
+            lambda db: AttendanceRepository(db).upsert_scan(
+                rfid_ids[0], work_date, start, "config-1", 0, 0
+            ),
+            False,
+        ),
+    ]
+
+
+def full_scans(conn: sqlite3.Connection, statement: str, parameters) -> list[str]:
+    """回傳查詢計畫中的整表掃描步驟"""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[3] for row in plan if row[3].startswith("SCAN ")]
+
+
+async def run_checks(db_path: str) -> list[str]:
+    """執行所有檢查，回傳失敗訊息"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    captured: list[tuple[str, object]] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    plan_conn = sqlite3.connect(db_path)
+    failures = []
+    for name, call, allow_scan in build_checks():
+        captured.clear()
+        async with session_factory() as db:
+            await call(db)
+            await db.rollback()
+
+        for statement, parameters in captured:
+            scans = full_scans(plan_conn, statement, parameters)
+            status = "SCAN" if scans else "OK"
+            if scans and not allow_scan:
+                status = "FAIL"
+                failures.append(f"{name}: {'; '.join(scans)}")
+            print(f"[{status:4}] {name}")
+            for detail in scans:
+                print(f"         {detail}")
+
+    plan_conn.close()
+    await engine.dispose()
+    return failures
+
+
+async def main() -> int:
+    """建立暫存資料庫並執行檢查"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "query_plans.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+        seed(db_path)
+        failures = await run_checks(db_path)
+
+    if failures:
+        print(f"\n{len(failures)} 個查詢退化為整表掃描：")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\n所有帶條件的查詢皆使用索引")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,66 @@
+"""
+日結：補上缺勤記錄並標記 ExceptionFlags
+執行方式：python -m database.day_close [--date YYYY-MM-DD] [--days N]
+
+未指定 --date 時日結今天以前的最近 N 天（預設為 DAY_CLOSE_LOOKBACK_DAYS），
+與應用程式的背景排程相同；指定 --date 可補做較早的日期。
+尚未過 DayCutoff 的部門不會日結（與刷卡時間相同以 UTC 判斷），
+每個日期每批部門各自一個交易，可重複執行。
+使用應用程式設定的 DATABASE_URL。
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date, datetime
+
+from app.config import settings
+from app.database import async_session, close_db, init_db
+from app.services.day_close import DayCloseResult, DayCloseService
+
+
+async def close(work_date: date | None, days: int) -> list[DayCloseResult]:
+    """日結指定日期或最近 days 天"""
+    await init_db()
+    try:
+        async with async_session() as db:
+            service = DayCloseService(db)
+            now = datetime.utcnow()
+            if work_date is not None:
+                return [await service.close_day(work_date, now)]
+            return await service.close_pending(now, days)
+    finally:
+        await close_db()
+
+
+def main() -> int:
+    """解析參數並執行日結"""
+    parser = argparse.ArgumentParser(description="日結：補上缺勤記錄並標記例外")
+    parser.add_argument("--date", type=date.fromisoformat, help="只日結指定日期")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=settings.day_close_lookback_days,
+        help="日結今天以前的最近幾天",
+    )
+    args = parser.parse_args()
+    if args.days < 1:
+        parser.error("--days 須為正整數")
+
+    for result in asyncio.run(close(args.date, args.days)):
+        print(
+            f"{result.work_date}：{result.departments} 個部門，"
+            f"新增缺勤 {result.absences_inserted} 筆，"
+            f"更新標記 {result.flags_updated} 筆"
+            + (
+                f"，{result.pending_departments} 個部門尚未過日切點"
+                if result.pending_departments
+                else ""
+            )
+            + f"（{result.elapsed_ms:.0f} ms）"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+資料庫遷移腳本
+執行方式：python -m database.migrate [db_path]
+
+依檔名順序執行 migrations/*.sql，已執行的版本記錄於 SchemaMigrations。
+適用於應用程式啟動（create_all）後已存在的 SQLite 資料庫；
+全新資料庫由模型直接建立最新結構，遷移只會是 no-op。
+"""
+
+import sqlite3
+from pathlib import Path
+
+
+def get_migrations_dir() -> Path:
+    """取得遷移檔目錄"""
+    return Path(__file__).parent / "migrations"
+
+
+def migrate(db_path: str = "attendance.db") -> list[str]:
+    """執行尚未套用的遷移，回傳本次套用的版本"""
+    conn = sqlite3.connect(db_path)
+    newly_applied = []
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS SchemaMigrations ("
+            "Version TEXT PRIMARY KEY, AppliedTime DATETIME NOT NULL)"
+        )
+        applied = {
+            row[0] for row in conn.execute("SELECT Version FROM SchemaMigrations")
+        }
+
+        for path in sorted(get_migrations_dir().glob("*.sql")):
+            version = path.stem
+            if version in applied:
+                continue
+
+            sql = path.read_text(encoding="utf-8")
+            # 每個遷移檔與版本記錄在同一個交易內完成
+            conn.executescript(
+                "BEGIN;\n"
+                f"{sql}\n"
+                "INSERT INTO SchemaMigrations (Version, AppliedTime) "
+                f"VALUES ('{version}', datetime('now'));\n"
+                "COMMIT;"
+            )
+            newly_applied.append(version)
+            print(f"已套用遷移：{version}")
+    finally:
+        conn.close()
+    return newly_applied
+
+
+if __name__ == "__main__":
+    import sys
+
+    db_file = sys.argv[1] if len(sys.argv) > 1 else "attendance.db"
+    if not migrate(db_file):
+        print("資料庫已是最新版本")
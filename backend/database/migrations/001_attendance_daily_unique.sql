@@ -0,0 +1,59 @@
+-- ============================================
+-- 001: AttendanceDaily (RFID_ID, WorkDate) 唯一索引
+-- 同卡同日的重複記錄先合併：保留最早上班卡那筆，
+-- LastOutTime / CheckOutStatus 取整組最晚的下班卡，其餘刪除。
+-- ============================================
+
+CREATE TEMP TABLE _AttendanceDedup AS
+SELECT
+    a.RFID_ID,
+    a.WorkDate,
+    (
+        SELECT k.GUID
+        FROM AttendanceDaily k
+        WHERE k.RFID_ID = a.RFID_ID AND k.WorkDate = a.WorkDate
+        ORDER BY k.FirstInTime IS NULL, k.FirstInTime, k.CreateTime, k.GUID
+        LIMIT 1
+    ) AS KeepGUID,
+    (
+        SELECT o.GUID
+        FROM AttendanceDaily o
+        WHERE o.RFID_ID = a.RFID_ID
+          AND o.WorkDate = a.WorkDate
+          AND o.LastOutTime IS NOT NULL
+        ORDER BY o.LastOutTime DESC, o.GUID
+        LIMIT 1
+    ) AS OutGUID
+FROM AttendanceDaily a
+GROUP BY a.RFID_ID, a.WorkDate
+HAVING COUNT(*) > 1;
+
+UPDATE AttendanceDaily
+SET
+    LastOutTime = (
+        SELECT o.LastOutTime
+        FROM _AttendanceDedup d
+        JOIN AttendanceDaily o ON o.GUID = d.OutGUID
+        WHERE d.KeepGUID = AttendanceDaily.GUID
+    ),
+    CheckOutStatus = (
+        SELECT o.CheckOutStatus
+        FROM _AttendanceDedup d
+        JOIN AttendanceDaily o ON o.GUID = d.OutGUID
+        WHERE d.KeepGUID = AttendanceDaily.GUID
+    )
+WHERE GUID IN (SELECT KeepGUID FROM _AttendanceDedup WHERE OutGUID IS NOT NULL);
+
+DELETE FROM AttendanceDaily
+WHERE GUID NOT IN (SELECT KeepGUID FROM _AttendanceDedup)
+  AND EXISTS (
+      SELECT 1
+      FROM _AttendanceDedup d
+      WHERE d.RFID_ID = AttendanceDaily.RFID_ID
+        AND d.WorkDate = AttendanceDaily.WorkDate
+  );
+
+DROP TABLE _AttendanceDedup;
+
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_AttendanceDaily_RFID_WorkDate
+    ON AttendanceDaily (RFID_ID, WorkDate);
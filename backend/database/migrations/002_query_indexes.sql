@@ -0,0 +1,24 @@
+-- ============================================
+-- 002: Repository 查詢條件所需的索引
+-- AttendanceDaily (RFID_ID, WorkDate) 已由 001 的唯一索引涵蓋
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS IX_ScanEvents_RFID_EventTime
+    ON ScanEvents (RFID_ID, EventTime);
+
+CREATE INDEX IF NOT EXISTS IX_AttendanceDaily_WorkDate
+    ON AttendanceDaily (WorkDate);
+
+CREATE INDEX IF NOT EXISTS IX_RequiredConfigs_Dept_ActiveDay_EffectiveFrom
+    ON RequiredConfigs (Dept_GUID, ActiveDay, EffectiveFrom);
+
+CREATE INDEX IF NOT EXISTS IX_Employees_Dept_GUID
+    ON Employees (Dept_GUID);
+
+CREATE INDEX IF NOT EXISTS IX_Departments_DeptCode
+    ON Departments (DeptCode);
+
+CREATE INDEX IF NOT EXISTS IX_Schedules_Dept_GUID
+    ON Schedules (Dept_GUID);
+
+ANALYZE;
@@ -0,0 +1,48 @@
+-- ============================================
+-- 003: AttendanceMonthly 每月考勤彙總
+-- 由 AttendanceDaily 以 (RFID_ID, YYYY-MM) 彙總，之後由應用程式增量維護；
+-- 與現有每日記錄不一致時可執行 python -m database.rebuild_monthly 重建。
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS AttendanceMonthly (
+    RFID_ID VARCHAR NOT NULL,
+    YearMonth VARCHAR NOT NULL,
+    WorkedDays INTEGER NOT NULL,
+    NormalInCount INTEGER NOT NULL,
+    FlexInCount INTEGER NOT NULL,
+    LateInCount INTEGER NOT NULL,
+    NormalOutCount INTEGER NOT NULL,
+    EarlyOutCount INTEGER NOT NULL,
+    MissingOutCount INTEGER NOT NULL,
+    WorkedMinutes INTEGER NOT NULL,
+    UpdateTime DATETIME NOT NULL,
+    PRIMARY KEY (RFID_ID, YearMonth),
+    FOREIGN KEY (RFID_ID) REFERENCES Employees (RFID_ID)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_AttendanceMonthly_YearMonth_RFID
+    ON AttendanceMonthly (YearMonth, RFID_ID);
+
+INSERT OR REPLACE INTO AttendanceMonthly (
+    RFID_ID, YearMonth, WorkedDays,
+    NormalInCount, FlexInCount, LateInCount,
+    NormalOutCount, EarlyOutCount, MissingOutCount,
+    WorkedMinutes, UpdateTime
+)
+SELECT
+    RFID_ID,
+    substr(WorkDate, 1, 7),
+    COUNT(FirstInTime),
+    SUM(CheckInStatus = 0),
+    SUM(CheckInStatus = 1),
+    SUM(CheckInStatus = 2),
+    SUM(CheckOutStatus = 0),
+    SUM(CheckOutStatus = 1),
+    SUM(CheckOutStatus = 2),
+    COALESCE(
+        SUM(CAST(round((julianday(LastOutTime) - julianday(FirstInTime)) * 1440) AS INTEGER)),
+        0
+    ),
+    datetime('now')
+FROM AttendanceDaily
+GROUP BY RFID_ID, substr(WorkDate, 1, 7);
@@ -0,0 +1,54 @@
+-- ============================================
+-- 004: AttendanceMonthly 加入 AbsentDays
+-- 日結（python -m database.day_close）補上的缺勤記錄沒有 FirstInTime，
+-- 只計入 AbsentDays，各狀態天數改為只計有上班卡的日子。
+-- 以新結構重建資料表並由 AttendanceDaily 重新彙總（由模型建立、已有
+-- AbsentDays 欄位的資料庫也適用）。
+-- ============================================
+
+DROP TABLE IF EXISTS AttendanceMonthly;
+
+CREATE TABLE AttendanceMonthly (
+    RFID_ID VARCHAR NOT NULL,
+    YearMonth VARCHAR NOT NULL,
+    WorkedDays INTEGER NOT NULL,
+    AbsentDays INTEGER NOT NULL DEFAULT 0,
+    NormalInCount INTEGER NOT NULL,
+    FlexInCount INTEGER NOT NULL,
+    LateInCount INTEGER NOT NULL,
+    NormalOutCount INTEGER NOT NULL,
+    EarlyOutCount INTEGER NOT NULL,
+    MissingOutCount INTEGER NOT NULL,
+    WorkedMinutes INTEGER NOT NULL,
+    UpdateTime DATETIME NOT NULL,
+    PRIMARY KEY (RFID_ID, YearMonth),
+    FOREIGN KEY (RFID_ID) REFERENCES Employees (RFID_ID)
+);
+
+CREATE UNIQUE INDEX UQ_AttendanceMonthly_YearMonth_RFID
+    ON AttendanceMonthly (YearMonth, RFID_ID);
+
+INSERT INTO AttendanceMonthly (
+    RFID_ID, YearMonth, WorkedDays, AbsentDays,
+    NormalInCount, FlexInCount, LateInCount,
+    NormalOutCount, EarlyOutCount, MissingOutCount,
+    WorkedMinutes, UpdateTime
+)
+SELECT
+    RFID_ID,
+    substr(WorkDate, 1, 7),
+    COUNT(FirstInTime),
+    SUM(FirstInTime IS NULL),
+    SUM(FirstInTime IS NOT NULL AND CheckInStatus = 0),
+    SUM(FirstInTime IS NOT NULL AND CheckInStatus = 1),
+    SUM(FirstInTime IS NOT NULL AND CheckInStatus = 2),
+    SUM(FirstInTime IS NOT NULL AND CheckOutStatus = 0),
+    SUM(FirstInTime IS NOT NULL AND CheckOutStatus = 1),
+    SUM(FirstInTime IS NOT NULL AND CheckOutStatus = 2),
+    COALESCE(
+        SUM(CAST(round((julianday(LastOutTime) - julianday(FirstInTime)) * 1440) AS INTEGER)),
+        0
+    ),
+    datetime('now')
+FROM AttendanceDaily
+GROUP BY RFID_ID, substr(WorkDate, 1, 7);
@@ -0,0 +1,43 @@
+-- ============================================
+-- 005: RequiredConfigs.FlexSetting_GUID 允許 NULL
+-- 班表與彈性設定異動時自動發佈規則版本，沒有彈性設定的部門
+-- 發佈 FlexMinutes = 0、FlexSetting_GUID 為 NULL 的版本。
+-- SQLite 無法修改欄位限制，以新結構重建資料表並搬移既有版本。
+-- ============================================
+
+CREATE TABLE RequiredConfigs_new (
+    GUID VARCHAR NOT NULL,
+    Dept_GUID VARCHAR NOT NULL,
+    Schedule_GUID VARCHAR NOT NULL,
+    FlexSetting_GUID VARCHAR,
+    ActiveDay INTEGER NOT NULL,
+    RequiredIn TIME NOT NULL,
+    RequiredOut TIME NOT NULL,
+    FlexMinutes INTEGER NOT NULL,
+    DayCutoff TIME NOT NULL,
+    EffectiveFrom DATE NOT NULL,
+    EffectiveTo DATE,
+    CreateTime DATETIME NOT NULL,
+    PRIMARY KEY (GUID),
+    FOREIGN KEY (Dept_GUID) REFERENCES Departments (GUID),
+    FOREIGN KEY (Schedule_GUID) REFERENCES Schedules (GUID),
+    FOREIGN KEY (FlexSetting_GUID) REFERENCES FlexSettings (GUID)
+);
+
+INSERT INTO RequiredConfigs_new (
+    GUID, Dept_GUID, Schedule_GUID, FlexSetting_GUID, ActiveDay, RequiredIn,
+    RequiredOut, FlexMinutes, DayCutoff, EffectiveFrom, EffectiveTo, CreateTime
+)
+SELECT
+    GUID, Dept_GUID, Schedule_GUID, FlexSetting_GUID, ActiveDay, RequiredIn,
+    RequiredOut, FlexMinutes, DayCutoff, EffectiveFrom, EffectiveTo, CreateTime
+FROM RequiredConfigs;
+
+DROP TABLE RequiredConfigs;
+
+ALTER TABLE RequiredConfigs_new RENAME TO RequiredConfigs;
+
+CREATE INDEX IX_RequiredConfigs_Dept_ActiveDay_EffectiveFrom
+    ON RequiredConfigs (Dept_GUID, ActiveDay, EffectiveFrom);
+
+ANALYZE;
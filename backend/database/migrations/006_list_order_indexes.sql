@@ -0,0 +1,19 @@
+-- ============================================
+-- 006: 參考資料列表的排序索引
+-- 部門依 (DeptCode, GUID)、班表依 (Dept_GUID, ActiveDay, GUID)、
+-- 彈性設定依 (Dept_GUID, GUID) 排序分頁，取代依隨機 UUID 主鍵的順序。
+-- 新索引以原本的單欄索引為前綴，原索引不再需要。
+-- ============================================
+
+DROP INDEX IF EXISTS IX_Departments_DeptCode;
+CREATE INDEX IF NOT EXISTS IX_Departments_DeptCode_GUID
+    ON Departments (DeptCode, GUID);
+
+DROP INDEX IF EXISTS IX_Schedules_Dept_GUID;
+CREATE INDEX IF NOT EXISTS IX_Schedules_Dept_ActiveDay_GUID
+    ON Schedules (Dept_GUID, ActiveDay, GUID);
+
+CREATE INDEX IF NOT EXISTS IX_FlexSettings_Dept_GUID_GUID
+    ON FlexSettings (Dept_GUID, GUID);
+
+ANALYZE;
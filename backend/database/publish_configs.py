@@ -0,0 +1,65 @@
+"""
+發佈規則版本（RequiredConfigs）
+執行方式：python -m database.publish_configs [--date YYYY-MM-DD] [--dept GUID]
+
+班表與彈性設定的 API 異動時會自動發佈；此腳本用於補上既有資料庫中
+尚未發佈（或與目前設定不一致）的部門，內容已一致的不會產生新版本，可重複執行。
+新版本自 --date（預設為 UTC 的今天，與刷卡的 WorkDate 相同）起生效，
+每個部門各自一個交易。
+執行中的伺服器每 RULE_CACHE_POLL_SECONDS 秒檢查規則版本異動並重新載入規則；
+設為 0 時須重啟伺服器才會套用。
+使用應用程式設定的 DATABASE_URL。
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date, datetime
+
+from app.database import async_session, close_db, init_db
+from app.repositories.department import DepartmentRepository
+from app.services.config_publisher import RequiredConfigPublisher
+
+
+async def publish(effective_from: date, dept_guids: list[str]) -> dict[str, int]:
+    """發佈指定部門（預設全部）的規則版本，回傳各部門新發佈的版本數"""
+    await init_db()
+    try:
+        async with async_session() as db:
+            dept_guids = dept_guids or await DepartmentRepository(db).get_all_guids()
+            publisher = RequiredConfigPublisher(db)
+            return {
+                dept_guid: len(await publisher.publish(dept_guid, effective_from))
+                for dept_guid in dept_guids
+            }
+    finally:
+        await close_db()
+
+
+def main() -> int:
+    """解析參數並發佈規則版本"""
+    parser = argparse.ArgumentParser(description="發佈部門規則版本")
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=datetime.utcnow().date(),
+        help="生效日",
+    )
+    parser.add_argument(
+        "--dept", action="append", default=[], help="只發佈指定部門（可重複）"
+    )
+    args = parser.parse_args()
+
+    published = asyncio.run(publish(args.date, args.dept))
+    for dept_guid, count in published.items():
+        if count:
+            print(f"{dept_guid}：發佈 {count} 個規則版本")
+    print(
+        f"共 {len(published)} 個部門，發佈 {sum(published.values())} 個規則版本"
+        f"（生效日 {args.date}）"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+重建每月考勤彙總
+執行方式：python -m database.rebuild_monthly [--month YYYY-MM]
+
+AttendanceMonthly 平時由刷卡、考勤修改與重算在同一交易內增量維護；
+直接以 SQL 修改 AttendanceDaily（例如匯入範例資料）後可執行本指令重建。
+未指定 --month 時重建所有月份並刪除沒有每日記錄的月份。每個月份各自一個
+交易（月份內仍一致），重建期間應用程式的寫入只需等待單一月份。
+使用應用程式設定的 DATABASE_URL。
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+from datetime import date
+
+from app.database import async_session, close_db, init_db, unit_of_work
+from app.repositories.attendance import AttendanceRepository
+from app.repositories.attendance_monthly import (
+    YEAR_MONTH_PATTERN,
+    AttendanceMonthlyRepository,
+    month_bounds,
+    year_month_of,
+)
+
+
+def months_between(first: date, last: date) -> list[str]:
+    """列出兩個日期之間（含）的所有年月"""
+    months = []
+    current = year_month_of(first)
+    while current <= year_month_of(last):
+        months.append(current)
+        current = year_month_of(month_bounds(current)[1])
+    return months
+
+
+async def rebuild(year_month: str | None) -> list[str]:
+    """重建指定月份或所有月份，回傳重建的年月"""
+    await init_db()
+    try:
+        async with async_session() as db:
+            monthly_repo = AttendanceMonthlyRepository(db)
+            if year_month is not None:
+                months = [year_month]
+            else:
+                first, last = await AttendanceRepository(db).get_work_date_range()
+                months = months_between(first, last) if first else []
+                async with unit_of_work(db):
+                    if months:
+                        await monthly_repo.delete_outside(months[0], months[-1])
+                    else:
+                        await monthly_repo.delete_all()
+            for month in months:
+                async with unit_of_work(db):
+                    await monthly_repo.refresh(month)
+    finally:
+        await close_db()
+    return months
+
+
+def main() -> int:
+    """解析參數並執行重建"""
+    parser = argparse.ArgumentParser(description="重建每月考勤彙總")
+    parser.add_argument("--month", help="只重建指定月份（YYYY-MM）")
+    args = parser.parse_args()
+    if args.month is not None and not re.match(YEAR_MONTH_PATTERN, args.month):
+        parser.error("--month 格式須為 YYYY-MM")
+
+    months = asyncio.run(rebuild(args.month))
+    if not months:
+        print("沒有考勤記錄，不需重建")
+    else:
+        print(f"已重建 {len(months)} 個月份：{months[0]} ~ {months[-1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())